@@ -1,7 +1,41 @@
+import time
+
+avvio_rerun = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
+import os
+import threading
+from contextlib import nullcontext
 from datetime import datetime
 
+from pagine import calcolo_inverso, confronto_regimi, file_paghe, montecarlo, sensibilita
+from pagine.compatta import dettaglio_html
+from pagine.prestazioni import MisuraRerun, mostra_strumentazione, ripristina_invio, ultima_misura
+from simulatore.addizionali import aliquote_effettive, tabella_addizionali
+from simulatore.calcolo import (
+    ANNI_DISPONIBILI,
+    ANNO_DEFAULT,
+    REGOLE,
+    calcola_cococo_sportivo,
+    formatta_euro,
+    formatta_percentuale,
+)
+from simulatore.formato import formatta_euro_array
+from simulatore.ritenute import CODICE_F24_CONTRIBUTI, CODICE_F24_RITENUTE, piano_mensile
+from simulatore.strumentazione import ATTIVA as STRUMENTAZIONE_ATTIVA, REGISTRO, cronometra, tappe
+
+# Tempi delle sezioni dello script (SIMULATORE_STRUMENTAZIONE=1 o [strumentazione] in config.toml);
+# il pannello con i percentili è visibile solo con ?admin=1
+tappe_app = tappe("app", avvio=avvio_rerun)
+tappe_app.tappa("import")
+
+# Byte inviati al browser e tempo di esecuzione di questo rerun (solo con ?debug=1);
+# un rerun precedente interrotto prima di termina() può aver lasciato la misura installata
+ripristina_invio()
+debug = st.query_params.get("debug") == "1"
+misura_rerun = MisuraRerun("misura_rerun", attiva=debug).avvia()
+
 # =====================================================================
 # META TAG PER CACHE (aiuta Chrome / mobile)
 # =====================================================================
@@ -45,419 +79,46 @@ st.markdown("""
     }
     </style>
 """, unsafe_allow_html=True)
+tappe_app.tappa("configurazione")
 
 # =====================================================================
-# FUNZIONI DI UTILITÀ
+# CACHE DEI RISULTATI (condivisa tra sessioni e rerun)
 # =====================================================================
-def formatta_euro(valore):
-    """Formatta un numero in euro con separatori italiani."""
-    return f"€ {valore:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-def formatta_percentuale(valore, decimali=2):
-    """Formatta una percentuale con virgola italiana."""
-    return f"{valore:.{decimali}f}%".replace(".", ",")
-
-def calcola_irpef(reddito_imponibile):
-    """
-    Calcola IRPEF con scaglioni 2025.
-    - 0-28.000€: 23%
-    - 28.001-50.000€: 35%
-    - oltre 50.000€: 43%
-    """
-    if reddito_imponibile <= 0:
-        return 0.0
-    elif reddito_imponibile <= 28000:
-        return reddito_imponibile * 0.23
-    elif reddito_imponibile <= 50000:
-        return 28000 * 0.23 + (reddito_imponibile - 28000) * 0.35
-    else:
-        return 28000 * 0.23 + 22000 * 0.35 + (reddito_imponibile - 50000) * 0.43
-
-def calcola_cococo_sportivo(compenso_lordo, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0):
+CACHE_MAX_VOCI = 10_000       # voci massime prima dell'evizione LRU
+CACHE_TTL_SECONDI = 3600      # scadenza di ogni voce
+
+@st.cache_resource
+def statistiche_cache():
+    """Contatori di richieste e miss della cache, condivisi tra tutte le sessioni del processo."""
+    return {"richieste": 0, "miss": 0, "lock": threading.Lock()}
+
+@st.cache_data(max_entries=CACHE_MAX_VOCI, ttl=CACHE_TTL_SECONDI, show_spinner=False)
+def _calcola_cococo_sportivo_in_cache(compenso_lordo, altra_previdenza, addizionali_reg, addizionali_com, anno):
+    statistiche = statistiche_cache()
+    with statistiche["lock"]:
+        statistiche["miss"] += 1
+    return calcola_cococo_sportivo(compenso_lordo, altra_previdenza, addizionali_reg, addizionali_com, anno)
+
+@cronometra("app.calcolo_in_cache")
+def calcola_cococo_sportivo_cached(compenso_lordo, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0,
+                                   anno=ANNO_DEFAULT):
     """
-    Calcola imposte, contributi e costi per collaboratore sportivo in Co.Co.Co.
-    
-    D.Lgs. 36/2021 - Riforma dello Sport
-    - Esenzione fiscale: 15.000€
-    - Esenzione contributiva: 5.000€
-    - Dimezzamento base contributiva eccedenza: 50% fino al 31/12/2027
-    - Ripartizione contributi: 1/3 lavoratore, 2/3 società
+    calcola_cococo_sportivo memorizzato sulla tupla degli input con st.cache_data
+    (max CACHE_MAX_VOCI voci, scadenza CACHE_TTL_SECONDI), condiviso tra le sessioni.
     """
-
-    # Caso patologico: compenso nullo o negativo → tutto a zero
-    if compenso_lordo <= 0:
-        return {
-            "compenso_lordo": 0.0,
-            "franchigia_fiscale": 0.0,
-            "franchigia_contributiva": 0.0,
-            "base_contrib_grezza": 0.0,
-            "base_contrib_ridotta": 0.0,
-            "aliquota_ivs": 24.0 if altra_previdenza else 25.0,
-            "aliquota_aggiuntiva": 2.03,
-            "contributi_ivs": 0.0,
-            "contributi_aggiuntivi": 0.0,
-            "totale_contributi": 0.0,
-            "contributi_lavoratore": 0.0,
-            "contributi_societa": 0.0,
-            "reddito_imponibile": 0.0,
-            "reddito_imponibile_netto": 0.0,
-            "irpef": 0.0,
-            "addizionale_regionale": 0.0,
-            "addizionale_comunale": 0.0,
-            "totale_imposte": 0.0,
-            "totale_trattenute_lavoratore": 0.0,
-            "netto_lavoratore": 0.0,
-            "costo_totale_societa": 0.0,
-            "tax_rate": 0.0,
-        }
-    
-    # FRANCHIGIE
-    franchigia_fiscale = min(compenso_lordo, 15000.0)
-    franchigia_contributiva = min(compenso_lordo, 5000.0)
-    
-    # BASE CONTRIBUTIVA
-    base_contrib_grezza = max(0.0, compenso_lordo - franchigia_contributiva)
-    base_contrib_ridotta = base_contrib_grezza * 0.50  # Dimezzamento 50%
-    
-    # ALIQUOTE INPS GESTIONE SEPARATA
-    if altra_previdenza:
-        aliquota_ivs = 24.0
-    else:
-        aliquota_ivs = 25.0
-    aliquota_aggiuntiva = 2.03  # maternità, malattia, ANF, DIS-COLL
-    
-    # CALCOLO CONTRIBUTI
-    contributi_ivs = base_contrib_ridotta * (aliquota_ivs / 100.0)
-    contributi_aggiuntivi = base_contrib_grezza * (aliquota_aggiuntiva / 100.0)
-    totale_contributi_inps = contributi_ivs + contributi_aggiuntivi
-    
-    contributi_lavoratore = totale_contributi_inps / 3.0
-    contributi_societa = totale_contributi_inps * 2.0 / 3.0
-    
-    # BASE FISCALE
-    reddito_imponibile = max(0.0, compenso_lordo - franchigia_fiscale)
-    reddito_imponibile_netto = max(0.0, reddito_imponibile - contributi_lavoratore)
-    
-    # CALCOLO IMPOSTE
-    irpef = calcola_irpef(reddito_imponibile_netto)
-    addizionale_regionale = reddito_imponibile_netto * (addizionali_reg / 100.0)
-    addizionale_comunale = reddito_imponibile_netto * (addizionali_com / 100.0)
-    totale_imposte = irpef + addizionale_regionale + addizionale_comunale
-    
-    # RISULTATI FINALI
-    totale_trattenute_lavoratore = contributi_lavoratore + totale_imposte
-    netto_lavoratore = compenso_lordo - totale_trattenute_lavoratore
-    costo_totale_societa = compenso_lordo + contributi_societa
-    
-    # Tax rate effettivo (bloccato tra 0 e 100)
-    if compenso_lordo > 0:
-        tax_rate_raw = (totale_trattenute_lavoratore / compenso_lordo * 100.0)
-        tax_rate = max(0.0, min(100.0, tax_rate_raw))
-    else:
-        tax_rate = 0.0
-    
-    return {
-        "compenso_lordo": compenso_lordo,
-        "franchigia_fiscale": franchigia_fiscale,
-        "franchigia_contributiva": franchigia_contributiva,
-        "base_contrib_grezza": base_contrib_grezza,
-        "base_contrib_ridotta": base_contrib_ridotta,
-        "aliquota_ivs": aliquota_ivs,
-        "aliquota_aggiuntiva": aliquota_aggiuntiva,
-        "contributi_ivs": contributi_ivs,
-        "contributi_aggiuntivi": contributi_aggiuntivi,
-        "totale_contributi": totale_contributi_inps,
-        "contributi_lavoratore": contributi_lavoratore,
-        "contributi_societa": contributi_societa,
-        "reddito_imponibile": reddito_imponibile,
-        "reddito_imponibile_netto": reddito_imponibile_netto,
-        "irpef": irpef,
-        "addizionale_regionale": addizionale_regionale,
-        "addizionale_comunale": addizionale_comunale,
-        "totale_imposte": totale_imposte,
-        "totale_trattenute_lavoratore": totale_trattenute_lavoratore,
-        "netto_lavoratore": netto_lavoratore,
-        "costo_totale_societa": costo_totale_societa,
-        "tax_rate": tax_rate,
-    }
-
-# =====================================================================
-# HEADER
-# =====================================================================
-st.markdown("""
-    <div style="text-align: center; margin-bottom: 30px;">
-        <h1 style="color: #1f77b4; margin-bottom: 5px;">⚽ Simulatore Co.Co.Co</h1>
-        <h2 style="color: #555; font-size: 1.5em; margin-bottom: 10px;">Collaboratori Sportivi 2025</h2>
-        <p style="color: #888; font-size: 1.1em;"><strong>by Fisco Chiaro Consulting</strong></p>
-    </div>
-""", unsafe_allow_html=True)
-
-# Info box
-st.info(
-    "**ℹ️ Collaborazioni Sportive (Co.Co.Co) – Riforma dello Sport (D.Lgs. 36/2021)**\n\n"
-    "🎯 **Esenzione fiscale:** fino a 15.000€ sui compensi da ASD/SSD\n"
-    "💰 **Esenzione contributiva:** fino a 5.000€ sui compensi da ASD/SSD\n"
-    "📉 **Dimezzamento 50%** della base contributiva sull'eccedenza fino al 31/12/2027\n"
-    "⚖️ **Contributi ripartiti:** 1/3 collaboratore – 2/3 ASD/SSD\n"
-    "🧾 **La società sportiva è sostituto d'imposta:** ritenute, versamenti e Certificazione Unica"
-)
-
-st.markdown("---")
-
-# =====================================================================
-# LAYOUT A DUE COLONNE
-# =====================================================================
-col_input, col_risultati = st.columns(2)
-
-# =====================================================================
-# COLONNA SINISTRA - INPUT
-# =====================================================================
-with col_input:
-    st.header("📝 Dati di Input")
-    
-    st.subheader("Tipo di collaborazione sportiva")
-    tipo_attivita = st.selectbox(
-        "Seleziona la tua attività",
-        [
-            "Collaboratore sportivo (istruttore/allenatore)",
-            "Collaboratore amministrativo-gestionale",
-            "Preparatore atletico",
-            "Maestro di sport",
-            "Altro collaboratore sportivo",
-        ],
-        key="tipo_attivita"
-    )
-    
-    st.markdown("---")
-    
-    st.subheader("💰 Compensi annui")
-    
-    compenso_lordo = st.number_input(
-        "Compenso lordo annuo Co.Co.Co (€)",
-        min_value=0,
-        max_value=200000,
-        value=18000,
-        step=500,
-        key="compenso_cococo",
-        help="Totale compensi annui corrisposti da ASD/SSD con contratto di collaborazione coordinata e continuativa."
+    statistiche = statistiche_cache()
+    with statistiche["lock"]:
+        statistiche["richieste"] += 1
+    return _calcola_cococo_sportivo_in_cache(
+        compenso_lordo, bool(altra_previdenza), addizionali_reg, addizionali_com, int(anno)
     )
-    
-    if compenso_lordo == 0:
-        st.warning("Inserisci un compenso lordo annuo maggiore di zero per ottenere il calcolo completo.")
-    
-    st.markdown("---")
-    
-    st.subheader("📊 Situazione previdenziale")
-    altra_prev = st.checkbox(
-        "Ho già altra pensione o previdenza obbligatoria",
-        value=False,
-        key="altra_prev",
-        help="Se sei pensionato o iscritto ad altra forma previdenziale obbligatoria, l'aliquota IVS è ridotta al 24%."
-    )
-    
-    st.markdown("---")
-    
-    st.subheader("🏛️ Addizionali IRPEF (opzionale)")
-    
-    col_add1, col_add2 = st.columns(2)
-    with col_add1:
-        addizionale_reg = st.number_input(
-            "Addizionale regionale (%)",
-            min_value=0.0,
-            max_value=3.33,
-            value=1.23,
-            step=0.05,
-            key="addizionale_reg",
-            help="Aliquota addizionale regionale IRPEF (es. Puglia 1,23%)"
-        )
-    
-    with col_add2:
-        addizionale_com = st.number_input(
-            "Addizionale comunale (%)",
-            min_value=0.0,
-            max_value=0.8,
-            value=0.5,
-            step=0.05,
-            key="addizionale_com",
-            help="Aliquota addizionale comunale IRPEF (0–0,8%)"
-        )
-    
-    st.markdown("---")
-    
-    st.info("ℹ️ I calcoli si aggiornano automaticamente mentre digiti")
 
 # =====================================================================
-# COLONNA DESTRA - RISULTATI
+# TESTI STATICI
 # =====================================================================
-with col_risultati:
-    st.header("📊 Risultati Calcolo")
-    
-    # Eseguire il calcolo
-    risultato = calcola_cococo_sportivo(
-        compenso_lordo=compenso_lordo,
-        altra_previdenza=altra_prev,
-        addizionali_reg=addizionale_reg,
-        addizionali_com=addizionale_com
-    )
-    
-    # ===== PANORAMICA GENERALE =====
-    st.subheader("💼 Panoramica Generale")
-    
-    col_m1, col_m2, col_m3 = st.columns(3)
-    
-    with col_m1:
-        st.metric(
-            label="Compenso Lordo",
-            value=formatta_euro(risultato["compenso_lordo"]),
-            help="Compenso lordo annuo pattuito"
-        )
-    
-    with col_m2:
-        st.metric(
-            label="Netto Lavoratore",
-            value=formatta_euro(risultato["netto_lavoratore"]),
-            help="Quanto arriva al collaboratore"
-        )
-    
-    with col_m3:
-        st.metric(
-            label="Costo Società",
-            value=formatta_euro(risultato["costo_totale_societa"]),
-            help="Costo complessivo per ASD/SSD"
-        )
-    
-    col_m4, col_m5 = st.columns(2)
-    
-    with col_m4:
-        netto_mensile = max(0.0, risultato["netto_lavoratore"] / 12.0)
-        st.metric(
-            label="Netto Mensile",
-            value=formatta_euro(netto_mensile),
-            help="Media su 12 mensilità"
-        )
-    
-    with col_m5:
-        st.metric(
-            label="Tax Rate Effettivo",
-            value=formatta_percentuale(risultato["tax_rate"]),
-            help="Incidenza di contributi e imposte"
-        )
-    
-    # ===== DETTAGLIO CONTRIBUTIVO =====
-    st.markdown("---")
-    st.subheader("💼 Dettaglio Calcolo Contributivo")
-    
-    st.write(f"**Compenso lordo:** {formatta_euro(compenso_lordo)}")
-    
-    if risultato["franchigia_contributiva"] > 0:
-        st.success(
-            f"✅ **Esenzione contributiva (5.000€):** "
-            f"-{formatta_euro(risultato['franchigia_contributiva'])}"
-        )
-    
-    if risultato["base_contrib_grezza"] > 0:
-        st.write(f"**Eccedenza contributiva:** {formatta_euro(risultato['base_contrib_grezza'])}")
-        st.info(
-            f"💡 **Dimezzamento 50% (agevolazione fino al 31/12/2027):** "
-            f"{formatta_euro(risultato['base_contrib_grezza'])} × 50% = "
-            f"{formatta_euro(risultato['base_contrib_ridotta'])}"
-        )
-    
-    st.write(
-        f"**Aliquota IVS:** {formatta_percentuale(risultato['aliquota_ivs'], 0)} "
-        f"(applicata sulla base dimezzata)"
-    )
-    
-    if altra_prev:
-        st.info("✅ Aliquota IVS ridotta (24%) per altra previdenza/pensione")
-    
-    st.write(f"**Contributi IVS:** {formatta_euro(risultato['contributi_ivs'])}")
-    st.write(
-        f"**Aliquota aggiuntiva:** {formatta_percentuale(risultato['aliquota_aggiuntiva'])} "
-        f"(applicata sulla base piena)"
-    )
-    st.write(f"**Contributi aggiuntivi:** {formatta_euro(risultato['contributi_aggiuntivi'])}")
-    
-    st.write(f"**Totale contributi INPS:** {formatta_euro(risultato['totale_contributi'])}")
-    
-    # Ripartizione
-    st.markdown("---")
-    st.subheader("⚖️ Ripartizione Contributi")
-    
-    col_r1, col_r2 = st.columns(2)
-    with col_r1:
-        st.metric(
-            "Quota lavoratore (1/3)",
-            formatta_euro(risultato["contributi_lavoratore"]),
-            help="Trattenuti al collaboratore"
-        )
-    with col_r2:
-        st.metric(
-            "Quota società (2/3)",
-            formatta_euro(risultato["contributi_societa"]),
-            help="A carico di ASD/SSD"
-        )
-    
-    # ===== DETTAGLIO FISCALE =====
-    st.markdown("---")
-    st.subheader("🧮 Dettaglio Calcolo Fiscale (IRPEF)")
-    
-    if risultato["franchigia_fiscale"] > 0:
-        st.success(
-            f"✅ **Esenzione fiscale (15.000€):** "
-            f"-{formatta_euro(risultato['franchigia_fiscale'])}"
-        )
-    
-    st.write(f"**Reddito imponibile lordo:** {formatta_euro(risultato['reddito_imponibile'])}")
-    st.write(
-        f"**Contributi deducibili (1/3):** -{formatta_euro(risultato['contributi_lavoratore'])}"
-    )
-    st.write(
-        f"**Reddito imponibile netto IRPEF:** {formatta_euro(risultato['reddito_imponibile_netto'])}"
-    )
-    
-    st.write(f"**IRPEF (scaglioni 23-35-43%):** {formatta_euro(risultato['irpef'])}")
-    
-    if risultato["addizionale_regionale"] > 0:
-        st.write(
-            f"**Addizionale regionale ({formatta_percentuale(addizionale_reg)}):** "
-            f"{formatta_euro(risultato['addizionale_regionale'])}"
-        )
-    
-    if risultato["addizionale_comunale"] > 0:
-        st.write(
-            f"**Addizionale comunale ({formatta_percentuale(addizionale_com)}):** "
-            f"{formatta_euro(risultato['addizionale_comunale'])}"
-        )
-    
-    st.write(f"**Totale imposte:** {formatta_euro(risultato['totale_imposte'])}")
-    
-    # ===== RIEPILOGO FINALE =====
-    st.markdown("---")
-    st.subheader("📋 Riepilogo Finale Completo")
-    
-    st.write(f"**Compenso lordo annuo:** {formatta_euro(risultato['compenso_lordo'])}")
-    st.write(f"├─ Contributi INPS lavoratore: -{formatta_euro(risultato['contributi_lavoratore'])}")
-    st.write(f"└─ Imposte (IRPEF + addizionali): -{formatta_euro(risultato['totale_imposte'])}")
-    
-    st.success(f"**= NETTO LAVORATORE ANNUALE:** {formatta_euro(risultato['netto_lavoratore'])}")
-    st.success(f"**= NETTO LAVORATORE MENSILE:** {formatta_euro(netto_mensile)}")
-    
-    st.markdown("---")
-    st.write("**Costo complessivo per la società sportiva (ASD/SSD):**")
-    st.write(f"├─ Compenso lordo: {formatta_euro(risultato['compenso_lordo'])}")
-    st.write(f"└─ Contributi INPS società (2/3): +{formatta_euro(risultato['contributi_societa'])}")
-    
-    st.warning(f"**= COSTO TOTALE SOCIETÀ:** {formatta_euro(risultato['costo_totale_societa'])}")
-
-# =====================================================================
-# SEZIONE INFO AGGIUNTIVE
-# =====================================================================
-st.markdown("---")
-st.subheader("📚 Informazioni Utili")
-
-with st.expander("🎯 Chi rientra tra i collaboratori sportivi Co.Co.Co?"):
-    st.markdown("""
+# Testi delle sezioni informative (titolo, contenuto markdown)
+SEZIONI_INFO = (
+    ("🎯 Chi rientra tra i collaboratori sportivi Co.Co.Co?", """
 Sono inquadrati come **collaboratori sportivi** (Co.Co.Co) ai sensi della riforma dello sport:
 
 - **Istruttori e allenatori** di discipline sportive dilettantistiche
@@ -466,10 +127,8 @@ Sono inquadrati come **collaboratori sportivi** (Co.Co.Co) ai sensi della riform
 - **Maestri di sport** e altri collaboratori con mansioni sportive dilettantistiche
 
 Il rapporto deve essere **coordinato e continuativo**, senza vincolo di subordinazione.
-    """)
-
-with st.expander("💰 Esenzioni fiscali e contributive – riepilogo completo"):
-    st.markdown("""
+    """),
+    ("💰 Esenzioni fiscali e contributive – riepilogo completo", """
 **Esenzione fiscale 15.000€**
 - I primi **15.000€** di compensi annui da ASD/SSD **non concorrono al reddito IRPEF**
 - L'IRPEF si calcola solo sulla parte eccedente
@@ -485,10 +144,8 @@ with st.expander("💰 Esenzioni fiscali e contributive – riepilogo completo")
 - Effettuata dalla società sportiva (sostituto d'imposta)
 - Aliquota: 20% sui compensi lordi
 - Versamento: entro il 16 del mese successivo
-    """)
-
-with st.expander("⚖️ Co.Co.Co sportivo vs Partita IVA forfettaria"):
-    st.markdown("""
+    """),
+    ("⚖️ Co.Co.Co sportivo vs Partita IVA forfettaria", """
 | Aspetto | Co.Co.Co Sportivo | Partita IVA Forfettaria |
 |---------|------------------|------------------------|
 | **Esenzione IRPEF** | Sì, fino a 15.000€ | No |
@@ -500,10 +157,8 @@ with st.expander("⚖️ Co.Co.Co sportivo vs Partita IVA forfettaria"):
 | **Sostituto d'imposta** | ASD/SSD | Collaboratore |
 | **Contabilità** | Semplificata | Ordinaria o semplificata |
 | **Complessità** | Bassa | Alta |
-    """)
-
-with st.expander("📋 Obblighi fiscali e scadenze 2025"):
-    st.markdown("""
+    """),
+    ("📋 Obblighi fiscali e scadenze 2025", """
 **Obblighi della Società Sportiva (ASD/SSD):**
 - ✅ **Comunicazione RASD:** Entro 30 giorni dalla stipula del contratto
 - ✅ **Versamento ritenute IRPEF:** Entro il 16 del mese seguente (F24 con codice tributo 1040)
@@ -520,7 +175,467 @@ with st.expander("📋 Obblighi fiscali e scadenze 2025"):
 - **Versamenti:** Entro il 16 del mese seguente
 - **Certificazione Unica:** 31 gennaio anno successivo
 - **Conservazione:** 5 anni
-    """)
+    """),
+)
+
+# =====================================================================
+# HEADER
+# =====================================================================
+st.markdown("""
+    <div style="text-align: center; margin-bottom: 30px;">
+        <h1 style="color: #1f77b4; margin-bottom: 5px;">⚽ Simulatore Co.Co.Co</h1>
+        <h2 style="color: #555; font-size: 1.5em; margin-bottom: 10px;">Collaboratori Sportivi 2025</h2>
+        <p style="color: #888; font-size: 1.1em;"><strong>by Fisco Chiaro Consulting</strong></p>
+    </div>
+""", unsafe_allow_html=True)
+
+# Info box
+st.info(
+    "**ℹ️ Collaborazioni Sportive (Co.Co.Co) – Riforma dello Sport (D.Lgs. 36/2021)**\n\n"
+    "🎯 **Esenzione fiscale:** fino a 15.000€ sui compensi da ASD/SSD\n"
+    "💰 **Esenzione contributiva:** fino a 5.000€ sui compensi da ASD/SSD\n"
+    "📉 **Dimezzamento 50%** della base contributiva sull'eccedenza fino al 31/12/2027\n"
+    "⚖️ **Contributi ripartiti:** 1/3 collaboratore – 2/3 ASD/SSD\n"
+    "🧾 **La società sportiva è sostituto d'imposta:** ritenute, versamenti e Certificazione Unica"
+)
+
+st.markdown("---")
+tappe_app.tappa("intestazione")
+
+# =====================================================================
+# MODALITÀ
+# =====================================================================
+MODALITA_SINGOLA = "🧮 Simulazione singola"
+MODALITA_FILE = "📂 Elaborazione file paghe"
+MODALITA_SENSIBILITA = "📈 Analisi di sensibilità"
+MODALITA_INVERSO = "🎯 Calcolo inverso"
+MODALITA_REGIMI = "⚖️ Confronto regimi"
+MODALITA_STAGIONE = "🎲 Pianificazione stagione"
+
+modalita = st.sidebar.radio(
+    "Modalità",
+    [MODALITA_SINGOLA, MODALITA_INVERSO, MODALITA_REGIMI, MODALITA_STAGIONE, MODALITA_SENSIBILITA, MODALITA_FILE],
+    key="modalita",
+)
+anno = st.sidebar.selectbox(
+    "Anno d'imposta",
+    ANNI_DISPONIBILI,
+    index=ANNI_DISPONIBILI.index(ANNO_DEFAULT),
+    key="anno",
+    help="Franchigie, aliquote INPS e scaglioni IRPEF dell'anno scelto (config.toml)",
+)
+compatta = st.sidebar.toggle(
+    "⚡ Visualizzazione compatta",
+    value=st.query_params.get("compatta") == "1",
+    key="compatta",
+    help="Meno elementi per aggiornamento: il calcolo si rigenera da solo senza ridisegnare "
+         "il resto della pagina, le sezioni informative si caricano solo se aperte.",
+)
+# Default per i deployment molto carichi: SIMULATORE_AGGIORNAMENTO=pulsante o ?aggiornamento=pulsante
+con_pulsante = st.sidebar.toggle(
+    "🧮 Calcola con pulsante",
+    value=st.query_params.get("aggiornamento", os.environ.get("SIMULATORE_AGGIORNAMENTO")) == "pulsante",
+    key="con_pulsante",
+    help="Le modifiche agli input (anche i clic ripetuti su +/-) vengono inviate tutte insieme "
+         "alla pressione di \"Calcola\", invece di ricalcolare la pagina a ogni passo.",
+)
+tappe_app.tappa("barra_laterale")
+
+@st.cache_resource
+def opzioni_comuni(anno):
+    """Codici dei comuni in ordine alfabetico ed etichette per il selettore, compilati una volta per anno."""
+    codici, etichette = tabella_addizionali(anno).comuni()
+    return codici, dict(zip(codici, etichette))
+
+
+@cronometra("app.piano_mensile")
+def mostra_piano_mensile(compenso_lordo, altra_prev, addizionale_reg, addizionale_com, anno):
+    """Ritenute progressive mese per mese e versamenti F24 del compenso indicato."""
+    st.caption(
+        "Compenso pagato in 12 rate uguali: la società applica le franchigie man mano "
+        "che i compensi maturano, quindi i primi mesi sono esenti e le ritenute crescono nel corso dell'anno."
+    )
+    piano = pd.DataFrame(piano_mensile(compenso_lordo, altra_prev, addizionale_reg, addizionale_com, anno=anno))
+    st.dataframe(
+        pd.DataFrame({
+            "Mese": piano["mese"],
+            "Compenso": formatta_euro_array(piano["compenso_lordo"]),
+            "Netto": formatta_euro_array(piano["netto_pagamento"]),
+            f"F24 {CODICE_F24_RITENUTE} (IRPEF)": formatta_euro_array(piano[f"f24_{CODICE_F24_RITENUTE}"]),
+            f"F24 {CODICE_F24_CONTRIBUTI} (INPS)": formatta_euro_array(piano[f"f24_{CODICE_F24_CONTRIBUTI}"]),
+            "Addizionali": formatta_euro_array(piano["addizionali"]),
+            "Franchigia fiscale residua": formatta_euro_array(piano["franchigia_fiscale_residua"]),
+        }),
+        hide_index=True,
+    )
+
+
+@cronometra("app.simulazione_singola")
+def simulazione_singola(anno, compatta=False, con_pulsante=False):
+    """
+    Simulazione singola; in modalità compatta il dettaglio è un unico blocco HTML.
+    Con `con_pulsante` gli input sono in un form: i clic su +/- restano nel browser e
+    lo script viene rieseguito una sola volta, alla pressione di "Calcola".
+    """
+    # =====================================================================
+    # LAYOUT A DUE COLONNE
+    # =====================================================================
+    col_input, col_risultati = st.columns(2)
+
+    # =====================================================================
+    # COLONNA SINISTRA - INPUT
+    # =====================================================================
+    with col_input, st.form("dati_input", border=False) if con_pulsante else nullcontext():
+        st.header("📝 Dati di Input")
+
+        st.subheader("Tipo di collaborazione sportiva")
+        tipo_attivita = st.selectbox(
+            "Seleziona la tua attività",
+            [
+                "Collaboratore sportivo (istruttore/allenatore)",
+                "Collaboratore amministrativo-gestionale",
+                "Preparatore atletico",
+                "Maestro di sport",
+                "Altro collaboratore sportivo",
+            ],
+            key="tipo_attivita"
+        )
+
+        st.markdown("---")
+
+        st.subheader("💰 Compensi annui")
+
+        compenso_lordo = st.number_input(
+            "Compenso lordo annuo Co.Co.Co (€)",
+            min_value=0,
+            max_value=200000,
+            value=18000,
+            step=500,
+            key="compenso_cococo",
+            help="Totale compensi annui corrisposti da ASD/SSD con contratto di collaborazione coordinata e continuativa."
+        )
+
+        if compenso_lordo == 0:
+            st.warning("Inserisci un compenso lordo annuo maggiore di zero per ottenere il calcolo completo.")
+
+        st.markdown("---")
+
+        st.subheader("📊 Situazione previdenziale")
+        altra_prev = st.checkbox(
+            "Ho già altra pensione o previdenza obbligatoria",
+            value=False,
+            key="altra_prev",
+            help="Se sei pensionato o iscritto ad altra forma previdenziale obbligatoria, l'aliquota IVS è ridotta al 24%."
+        )
+
+        st.markdown("---")
+
+        st.subheader("🏛️ Addizionali IRPEF (opzionale)")
+
+        codici_comuni, etichette_comuni = opzioni_comuni(anno)
+        comune = st.selectbox(
+            "Comune di residenza",
+            [None] + codici_comuni,
+            format_func=lambda codice: "Aliquote inserite a mano" if codice is None else etichette_comuni[codice],
+            key="comune_addizionali",
+            help="Scrivi il nome per cercare: addizionale regionale e comunale con scaglioni e soglie "
+                 "di esenzione dalla tabella dell'anno (valori indicativi, da verificare sulle delibere).",
+        )
+
+        if comune is not None:
+            # Le aliquote a scaglioni dipendono dal reddito imponibile netto, che non dipende dalle addizionali
+            reddito_netto = calcola_cococo_sportivo_cached(compenso_lordo, altra_prev, 0.0, 0.0, anno)[
+                "reddito_imponibile_netto"
+            ]
+            addizionale_reg, addizionale_com = aliquote_effettive(reddito_netto, comune.split(":", 1)[1], anno=anno)
+            st.caption(
+                f"Aliquote medie sul tuo reddito: regionale {formatta_percentuale(addizionale_reg, 3)}, "
+                f"comunale {formatta_percentuale(addizionale_com, 3)}"
+            )
+        else:
+            col_add1, col_add2 = st.columns(2)
+            with col_add1:
+                addizionale_reg = st.number_input(
+                    "Addizionale regionale (%)",
+                    min_value=0.0,
+                    max_value=3.33,
+                    value=1.23,
+                    step=0.05,
+                    key="addizionale_reg",
+                    help="Aliquota addizionale regionale IRPEF (es. Puglia 1,23%)"
+                )
+
+            with col_add2:
+                addizionale_com = st.number_input(
+                    "Addizionale comunale (%)",
+                    min_value=0.0,
+                    max_value=0.8,
+                    value=0.5,
+                    step=0.05,
+                    key="addizionale_com",
+                    help="Aliquota addizionale comunale IRPEF (0–0,8%)"
+                )
+
+        st.markdown("---")
+
+        if con_pulsante:
+            st.form_submit_button("🧮 Calcola", type="primary")
+        else:
+            st.info("ℹ️ I calcoli si aggiornano automaticamente mentre digiti")
+
+    # =====================================================================
+    # COLONNA DESTRA - RISULTATI
+    # =====================================================================
+    with col_risultati:
+        st.header("📊 Risultati Calcolo")
+
+        # Eseguire il calcolo
+        risultato = calcola_cococo_sportivo_cached(
+            compenso_lordo=compenso_lordo,
+            altra_previdenza=altra_prev,
+            addizionali_reg=addizionale_reg,
+            addizionali_com=addizionale_com,
+            anno=anno,
+        )
+
+        # ===== PANORAMICA GENERALE =====
+        st.subheader("💼 Panoramica Generale")
+
+        col_m1, col_m2, col_m3 = st.columns(3)
+
+        with col_m1:
+            st.metric(
+                label="Compenso Lordo",
+                value=formatta_euro(risultato["compenso_lordo"]),
+                help="Compenso lordo annuo pattuito"
+            )
+
+        with col_m2:
+            st.metric(
+                label="Netto Lavoratore",
+                value=formatta_euro(risultato["netto_lavoratore"]),
+                help="Quanto arriva al collaboratore"
+            )
+
+        with col_m3:
+            st.metric(
+                label="Costo Società",
+                value=formatta_euro(risultato["costo_totale_societa"]),
+                help="Costo complessivo per ASD/SSD"
+            )
+
+        col_m4, col_m5 = st.columns(2)
+
+        with col_m4:
+            netto_mensile = max(0.0, risultato["netto_lavoratore"] / 12.0)
+            st.metric(
+                label="Netto Mensile",
+                value=formatta_euro(netto_mensile),
+                help="Media su 12 mensilità"
+            )
+
+        with col_m5:
+            st.metric(
+                label="Tax Rate Effettivo",
+                value=formatta_percentuale(risultato["tax_rate"]),
+                help="Incidenza di contributi e imposte"
+            )
+
+        if compatta:
+            st.markdown("---")
+            st.markdown(
+                dettaglio_html(risultato, anno, addizionale_reg, addizionale_com, altra_prev),
+                unsafe_allow_html=True,
+            )
+        else:
+            # ===== DETTAGLIO CONTRIBUTIVO =====
+            st.markdown("---")
+            st.subheader("💼 Dettaglio Calcolo Contributivo")
+
+            st.write(f"**Compenso lordo:** {formatta_euro(compenso_lordo)}")
+
+            if risultato["franchigia_contributiva"] > 0:
+                st.success(
+                    f"✅ **Esenzione contributiva (5.000€):** "
+                    f"-{formatta_euro(risultato['franchigia_contributiva'])}"
+                )
+
+            if risultato["base_contrib_grezza"] > 0:
+                st.write(f"**Eccedenza contributiva:** {formatta_euro(risultato['base_contrib_grezza'])}")
+                st.info(
+                    f"💡 **Dimezzamento 50% (agevolazione fino al 31/12/2027):** "
+                    f"{formatta_euro(risultato['base_contrib_grezza'])} × 50% = "
+                    f"{formatta_euro(risultato['base_contrib_ridotta'])}"
+                )
+
+            st.write(
+                f"**Aliquota IVS:** {formatta_percentuale(risultato['aliquota_ivs'], 0)} "
+                f"(applicata sulla base dimezzata)"
+            )
+
+            if altra_prev:
+                st.info("✅ Aliquota IVS ridotta (24%) per altra previdenza/pensione")
+
+            st.write(f"**Contributi IVS:** {formatta_euro(risultato['contributi_ivs'])}")
+            st.write(
+                f"**Aliquota aggiuntiva:** {formatta_percentuale(risultato['aliquota_aggiuntiva'])} "
+                f"(applicata sulla base piena)"
+            )
+            st.write(f"**Contributi aggiuntivi:** {formatta_euro(risultato['contributi_aggiuntivi'])}")
+
+            st.write(f"**Totale contributi INPS:** {formatta_euro(risultato['totale_contributi'])}")
+
+            # Ripartizione
+            st.markdown("---")
+            st.subheader("⚖️ Ripartizione Contributi")
+
+            col_r1, col_r2 = st.columns(2)
+            with col_r1:
+                st.metric(
+                    "Quota lavoratore (1/3)",
+                    formatta_euro(risultato["contributi_lavoratore"]),
+                    help="Trattenuti al collaboratore"
+                )
+            with col_r2:
+                st.metric(
+                    "Quota società (2/3)",
+                    formatta_euro(risultato["contributi_societa"]),
+                    help="A carico di ASD/SSD"
+                )
+
+            # ===== DETTAGLIO FISCALE =====
+            st.markdown("---")
+            st.subheader("🧮 Dettaglio Calcolo Fiscale (IRPEF)")
+
+            if risultato["franchigia_fiscale"] > 0:
+                st.success(
+                    f"✅ **Esenzione fiscale (15.000€):** "
+                    f"-{formatta_euro(risultato['franchigia_fiscale'])}"
+                )
+
+            st.write(f"**Reddito imponibile lordo:** {formatta_euro(risultato['reddito_imponibile'])}")
+            st.write(
+                f"**Contributi deducibili (1/3):** -{formatta_euro(risultato['contributi_lavoratore'])}"
+            )
+            st.write(
+                f"**Reddito imponibile netto IRPEF:** {formatta_euro(risultato['reddito_imponibile_netto'])}"
+            )
+
+            aliquote_irpef = "-".join(f"{a * 100:g}" for a in REGOLE[anno].scaglioni_irpef.aliquote)
+            st.write(f"**IRPEF (scaglioni {aliquote_irpef}%):** {formatta_euro(risultato['irpef'])}")
+
+            if risultato["addizionale_regionale"] > 0:
+                st.write(
+                    f"**Addizionale regionale ({formatta_percentuale(addizionale_reg)}):** "
+                    f"{formatta_euro(risultato['addizionale_regionale'])}"
+                )
+
+            if risultato["addizionale_comunale"] > 0:
+                st.write(
+                    f"**Addizionale comunale ({formatta_percentuale(addizionale_com)}):** "
+                    f"{formatta_euro(risultato['addizionale_comunale'])}"
+                )
+
+            st.write(f"**Totale imposte:** {formatta_euro(risultato['totale_imposte'])}")
+
+            # ===== RIEPILOGO FINALE =====
+            st.markdown("---")
+            st.subheader("📋 Riepilogo Finale Completo")
+
+            st.write(f"**Compenso lordo annuo:** {formatta_euro(risultato['compenso_lordo'])}")
+            st.write(f"├─ Contributi INPS lavoratore: -{formatta_euro(risultato['contributi_lavoratore'])}")
+            st.write(f"└─ Imposte (IRPEF + addizionali): -{formatta_euro(risultato['totale_imposte'])}")
+
+            st.success(f"**= NETTO LAVORATORE ANNUALE:** {formatta_euro(risultato['netto_lavoratore'])}")
+            st.success(f"**= NETTO LAVORATORE MENSILE:** {formatta_euro(netto_mensile)}")
+
+            st.markdown("---")
+            st.write("**Costo complessivo per la società sportiva (ASD/SSD):**")
+            st.write(f"├─ Compenso lordo: {formatta_euro(risultato['compenso_lordo'])}")
+            st.write(f"└─ Contributi INPS società (2/3): +{formatta_euro(risultato['contributi_societa'])}")
+
+            st.warning(f"**= COSTO TOTALE SOCIETÀ:** {formatta_euro(risultato['costo_totale_societa'])}")
+
+        # ===== PIANO MENSILE =====
+        # In modalità compatta la tabella viene calcolata e inviata solo su richiesta
+        titolo_piano = "📅 Piano mensile: ritenute progressive e versamenti F24"
+        if compatta:
+            if st.toggle(titolo_piano, key="mostra_piano"):
+                mostra_piano_mensile(compenso_lordo, altra_prev, addizionale_reg, addizionale_com, anno)
+        else:
+            with st.expander(titolo_piano):
+                mostra_piano_mensile(compenso_lordo, altra_prev, addizionale_reg, addizionale_com, anno)
+
+
+@st.fragment
+def simulazione_singola_parziale(anno):
+    """
+    Simulazione compatta in un fragment: modificare un input riesegue solo questa funzione,
+    quindi header, sezioni informative e footer non vengono ricalcolati né reinviati.
+    """
+    with MisuraRerun("misura_fragment", attiva=debug):
+        simulazione_singola(anno, compatta=True, con_pulsante=con_pulsante)
+
+
+if modalita == MODALITA_FILE:
+    file_paghe.mostra(anno)
+elif modalita == MODALITA_SENSIBILITA:
+    sensibilita.mostra(anno)
+elif modalita == MODALITA_INVERSO:
+    calcolo_inverso.mostra(anno)
+elif modalita == MODALITA_REGIMI:
+    confronto_regimi.mostra(anno)
+elif modalita == MODALITA_STAGIONE:
+    montecarlo.mostra(anno)
+elif compatta:
+    simulazione_singola_parziale(anno)
+else:
+    simulazione_singola(anno, con_pulsante=con_pulsante)
+tappe_app.tappa("modalita")
+
+# =====================================================================
+# SEZIONE INFO AGGIUNTIVE
+# =====================================================================
+st.markdown("---")
+st.subheader("📚 Informazioni Utili")
+
+if compatta:
+    # Solo la sezione scelta viene generata e inviata al browser
+    titoli_info = [titolo for titolo, _ in SEZIONI_INFO]
+    scelta_info = st.selectbox("Sezione", ["—"] + titoli_info, key="sezione_info", label_visibility="collapsed")
+    if scelta_info != "—":
+        st.markdown(SEZIONI_INFO[titoli_info.index(scelta_info)][1])
+else:
+    for titolo, testo in SEZIONI_INFO:
+        with st.expander(titolo):
+            st.markdown(testo)
+tappe_app.tappa("informazioni")
+
+# =====================================================================
+# DEBUG (visibile solo con ?debug=1 nell'URL)
+# =====================================================================
+if debug:
+    with st.expander("🛠️ Debug – cache dei calcoli"):
+        statistiche = statistiche_cache()
+        with statistiche["lock"]:
+            richieste = statistiche["richieste"]
+            miss = statistiche["miss"]
+        hit = richieste - miss
+        col_d1, col_d2, col_d3 = st.columns(3)
+        col_d1.metric("Hit", f"{hit:,}".replace(",", "."))
+        col_d2.metric("Miss", f"{miss:,}".replace(",", "."))
+        col_d3.metric("Hit rate", formatta_percentuale(hit / richieste * 100.0 if richieste else 0.0))
+        st.caption(
+            f"Cache condivisa tra le sessioni: max {CACHE_MAX_VOCI:,} voci, "
+            f"scadenza {CACHE_TTL_SECONDI // 60} minuti.".replace(",", ".")
+        )
+        for chiave, etichetta in (("misura_rerun", "Ultimo rerun completo"), ("misura_fragment", "Ultimo rerun del calcolo")):
+            misura = ultima_misura(chiave)
+            if misura is not None:
+                st.caption(
+                    f"{etichetta}: {misura['messaggi']} messaggi, "
+                    f"{misura['byte'] / 1024:.1f} KB inviati, {misura['millisecondi']:.1f} ms".replace(".", ",")
+                )
 
 # =====================================================================
 # FOOTER / DISCLAIMER
@@ -563,4 +678,14 @@ st.markdown("""
     <p>© 2025 – Tutti i diritti riservati</p>
 </div>
 """, unsafe_allow_html=True)
+tappe_app.tappa("footer")
+
+# =====================================================================
+# STRUMENTAZIONE (pannello nascosto: ?admin=1 con la strumentazione attiva)
+# =====================================================================
+if STRUMENTAZIONE_ATTIVA and st.query_params.get("admin") == "1":
+    with st.expander("⏱️ Tempi delle sezioni", expanded=True):
+        mostra_strumentazione(REGISTRO)
 
+tappe_app.fine()
+misura_rerun.termina()
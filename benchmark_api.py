@@ -0,0 +1,145 @@
+"""
+Prova di carico del servizio HTTP (simulatore.api) su localhost.
+
+Apre `--client` connessioni keep-alive concorrenti che inviano richieste singole a
+/calcola (o /irpef) per `--secondi` secondi, poi riporta richieste/secondo, latenze
+(p50, p95, p99) e righe medie per micro-batch lette da /salute.
+
+Uso:
+    python benchmark_api.py --avvia [--client 64] [--secondi 10] [--endpoint calcola]
+    python benchmark_api.py --porta 8000          # servizio già in esecuzione
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+
+
+async def _richiesta(lettore, scrittore, metodo, percorso, corpo=b""):
+    scrittore.write(
+        f"{metodo} {percorso} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(corpo)}\r\n\r\n".encode("latin-1") + corpo
+    )
+    testa = await lettore.readuntil(b"\r\n\r\n")
+    stato = int(testa.split(b" ", 2)[1])
+    lunghezza = 0
+    for riga in testa.split(b"\r\n"):
+        if riga.lower().startswith(b"content-length:"):
+            lunghezza = int(riga.split(b":", 1)[1])
+    return stato, await lettore.readexactly(lunghezza)
+
+
+def _corpo(endpoint, rng):
+    if endpoint == "irpef":
+        dati = {"reddito": round(rng.uniform(0, 150000), 2)}
+    else:
+        dati = {
+            "compenso_lordo": round(rng.uniform(0, 200000), 2),
+            "altra_previdenza": rng.random() < 0.3,
+            "addizionali_reg": 1.23,
+            "addizionali_com": 0.5,
+        }
+    return json.dumps(dati).encode()
+
+
+async def _client(host, porta, endpoint, scadenza, latenze, seme):
+    rng = random.Random(seme)
+    lettore, scrittore = await asyncio.open_connection(host, porta)
+    errori = 0
+    try:
+        while time.perf_counter() < scadenza:
+            inizio = time.perf_counter()
+            stato, _ = await _richiesta(lettore, scrittore, "POST", f"/{endpoint}", _corpo(endpoint, rng))
+            latenze.append(time.perf_counter() - inizio)
+            errori += stato != 200
+    finally:
+        scrittore.close()
+    return errori
+
+
+async def _salute(host, porta):
+    lettore, scrittore = await asyncio.open_connection(host, porta)
+    try:
+        _, corpo = await _richiesta(lettore, scrittore, "GET", "/salute")
+    finally:
+        scrittore.close()
+    return json.loads(corpo)
+
+
+async def carico(host, porta, client, secondi, endpoint):
+    prima = await _salute(host, porta)
+    latenze = []
+    inizio = time.perf_counter()
+    errori = await asyncio.gather(*(
+        _client(host, porta, endpoint, inizio + secondi, latenze, seme) for seme in range(client)
+    ))
+    durata = time.perf_counter() - inizio
+    dopo = await _salute(host, porta)
+
+    latenze.sort()
+    percentile = lambda p: latenze[min(len(latenze) - 1, int(p / 100 * len(latenze)))] * 1000.0  # noqa: E731
+    lotti = max(dopo["lotti"] - prima["lotti"], 1)
+    return {
+        "endpoint": f"/{endpoint}",
+        "client": client,
+        "richieste": len(latenze),
+        "errori": sum(errori),
+        "richieste_al_secondo": len(latenze) / durata,
+        "latenza_p50_ms": percentile(50),
+        "latenza_p95_ms": percentile(95),
+        "latenza_p99_ms": percentile(99),
+        "richieste_per_lotto": (dopo["richieste_accorpate"] - prima["richieste_accorpate"]) / lotti,
+    }
+
+
+async def _attendi_servizio(host, porta, timeout=15.0):
+    scadenza = time.perf_counter() + timeout
+    while True:
+        try:
+            await _salute(host, porta)
+            return
+        except OSError:
+            if time.perf_counter() > scadenza:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--client", type=int, default=64, help="connessioni concorrenti")
+    parser.add_argument("--secondi", type=float, default=10.0)
+    parser.add_argument("--endpoint", choices=("calcola", "irpef"), default="calcola")
+    parser.add_argument("--avvia", action="store_true", help="avvia il servizio in un processo separato")
+    args = parser.parse_args()
+
+    processo = None
+    if args.avvia:
+        processo = subprocess.Popen(
+            [sys.executable, "-m", "simulatore.api", "--host", args.host, "--porta", str(args.porta)],
+            stdout=subprocess.DEVNULL,
+        )
+    try:
+        asyncio.run(_attendi_servizio(args.host, args.porta))
+        esito = asyncio.run(carico(args.host, args.porta, args.client, args.secondi, args.endpoint))
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+    print(f"{esito['endpoint']}: {esito['client']} client, {esito['richieste']:,} richieste, {esito['errori']} errori")
+    print(f"  {esito['richieste_al_secondo']:,.0f} richieste/s")
+    print(
+        f"  latenza p50 {esito['latenza_p50_ms']:.1f} ms, p95 {esito['latenza_p95_ms']:.1f} ms, "
+        f"p99 {esito['latenza_p99_ms']:.1f} ms"
+    )
+    print(f"  {esito['richieste_per_lotto']:.1f} richieste per micro-batch")
+    return 1 if esito["errori"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
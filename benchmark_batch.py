@@ -0,0 +1,76 @@
+"""
+Benchmark del calcolo vettoriale calcola_cococo_sportivo_batch.
+
+Misura il throughput (righe/secondo) su 10k, 1M e 10M collaboratori e verifica
+al centesimo la coerenza con il calcolo scalare su un campione di righe.
+
+Uso:
+    python benchmark_batch.py [--righe 10000 1000000 10000000] [--blocco 1000000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from simulatore.batch import calcola_cococo_sportivo_batch
+from simulatore.calcolo import COLONNE_RISULTATO, calcola_cococo_sportivo
+
+
+def genera_input(n, seme=0):
+    """Genera n collaboratori casuali, inclusi compensi nulli e negativi."""
+    rng = np.random.default_rng(seme)
+    compenso = rng.uniform(-1000.0, 200000.0, n).round(2)
+    compenso[rng.random(n) < 0.02] = 0.0
+    altra_prev = rng.random(n) < 0.3
+    add_reg = rng.uniform(0.0, 3.33, n).round(2)
+    add_com = rng.uniform(0.0, 0.8, n).round(2)
+    return compenso, altra_prev, add_reg, add_com
+
+
+def verifica_coerenza(campione=5000):
+    """Confronta batch e scalare riga per riga; solleva AssertionError se differiscono di oltre 0,005€."""
+    compenso, altra_prev, add_reg, add_com = genera_input(campione, seme=1)
+    # Soglie di franchigie e scaglioni IRPEF
+    bordi = np.array([0.0, -1.0, 5000.0, 15000.0, 43000.0, 65000.0, 200000.0])
+    compenso[: len(bordi)] = bordi
+    batch = calcola_cococo_sportivo_batch(compenso, altra_prev, add_reg, add_com)
+    for i in range(campione):
+        scalare = calcola_cococo_sportivo(float(compenso[i]), bool(altra_prev[i]), float(add_reg[i]), float(add_com[i]))
+        for colonna in COLONNE_RISULTATO:
+            if abs(scalare[colonna] - batch[colonna][i]) >= 0.005:
+                raise AssertionError(f"riga {i}, {colonna}: {scalare[colonna]} != {batch[colonna][i]}")
+
+
+def misura(n, blocco):
+    """Esegue il calcolo su n righe a blocchi di `blocco` righe e restituisce i secondi impiegati."""
+    secondi = 0.0
+    for inizio in range(0, n, blocco):
+        dati = genera_input(min(blocco, n - inizio), seme=inizio)
+        t0 = time.perf_counter()
+        calcola_cococo_sportivo_batch(*dati)
+        secondi += time.perf_counter() - t0
+    return secondi
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--righe", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--blocco", type=int, default=1_000_000, help="righe per blocco (limita la memoria)")
+    args = parser.parse_args()
+
+    verifica_coerenza()
+    print("Coerenza batch/scalare: OK")
+
+    t0 = time.perf_counter()
+    compenso, altra_prev, add_reg, add_com = genera_input(10_000)
+    for i in range(10_000):
+        calcola_cococo_sportivo(compenso[i], altra_prev[i], add_reg[i], add_com[i])
+    print(f"{'scalare':>12} {10_000:>12,} righe  {10_000 / (time.perf_counter() - t0):>16,.0f} righe/s")
+
+    for n in args.righe:
+        secondi = misura(n, args.blocco)
+        print(f"{'batch':>12} {n:>12,} righe  {n / secondi:>16,.0f} righe/s")
+
+
+if __name__ == "__main__":
+    main()
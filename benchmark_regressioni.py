@@ -0,0 +1,160 @@
+"""
+Benchmark di regressione: calcolo scalare, calcolo vettoriale e rerun completo dello
+script Streamlit (harness AppTest), con risultati in JSON confrontabili tra versioni.
+
+Uso:
+    python benchmark_regressioni.py --json risultati.json
+    python benchmark_regressioni.py --json nuovi.json --confronta risultati.json [--tolleranza 20]
+
+Con --confronta il processo termina con codice 1 se una misura peggiora oltre la
+tolleranza percentuale (throughput più basso o latenza più alta).
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from simulatore.batch import calcola_cococo_sportivo_batch
+from simulatore.calcolo import calcola_cococo_sportivo
+from simulatore.formato import formatta_euro_array
+
+APP = str(Path(__file__).resolve().parent / "app.py")
+COMPENSI_BORDI = (0.0, 5000.0, 15000.0, 43000.0, 65000.0, 200000.0)
+
+
+def _ripeti(funzione, ripetizioni):
+    """Mediana dei secondi di `ripetizioni` esecuzioni di funzione()."""
+    tempi = []
+    for _ in range(ripetizioni):
+        inizio = time.perf_counter()
+        funzione()
+        tempi.append(time.perf_counter() - inizio)
+    return statistics.median(tempi)
+
+
+def misura_scalare(chiamate=20_000):
+    compensi = [COMPENSI_BORDI[i % len(COMPENSI_BORDI)] + i % 997 for i in range(chiamate)]
+
+    def esegui():
+        for c in compensi:
+            calcola_cococo_sportivo(c, False, 1.23, 0.5)
+
+    secondi = _ripeti(esegui, 5)
+    return {"chiamate_al_secondo": chiamate / secondi, "microsecondi_per_chiamata": secondi / chiamate * 1e6}
+
+
+def misura_batch(righe):
+    rng = np.random.default_rng(0)
+    dati = (rng.uniform(0.0, 200000.0, righe), rng.random(righe) < 0.3, 1.23, 0.5)
+    secondi = _ripeti(lambda: calcola_cococo_sportivo_batch(*dati), 25 if righe <= 100_000 else 3)
+    return {"righe": righe, "righe_al_secondo": righe / secondi, "millisecondi": secondi * 1000.0}
+
+
+def misura_formattazione(righe=100_000):
+    valori = np.random.default_rng(0).uniform(-1000.0, 200000.0, righe)
+    secondi = _ripeti(lambda: formatta_euro_array(valori), 5)
+    return {"righe": righe, "righe_al_secondo": righe / secondi, "millisecondi": secondi * 1000.0}
+
+
+def misura_rerun(compatta, reruns=10):
+    """Millisecondi per rerun completo dello script dopo la modifica di un input."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=60)
+    if compatta:
+        at.query_params["compatta"] = "1"
+    at.run()
+    tempi = []
+    for i in range(reruns):
+        campo = at.number_input(key="compenso_cococo").set_value(10000 + 1000 * i)
+        inizio = time.perf_counter()
+        campo.run()
+        tempi.append(time.perf_counter() - inizio)
+        if at.exception:
+            raise RuntimeError(f"Eccezione nello script: {at.exception}")
+    return {"reruns": reruns, "millisecondi_mediana": statistics.median(tempi) * 1000.0}
+
+
+def esegui_benchmark(righe_batch=(10_000, 1_000_000)):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import streamlit
+
+    return {
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "ambiente": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "streamlit": streamlit.__version__,
+            "piattaforma": platform.platform(),
+        },
+        "misure": {
+            "scalare": misura_scalare(),
+            **{f"batch_{n}": misura_batch(n) for n in righe_batch},
+            "formattazione_euro": misura_formattazione(),
+            "rerun_app": misura_rerun(False),
+            "rerun_app_compatta": misura_rerun(True),
+        },
+    }
+
+
+# Per ogni misura: (chiave, True se più alto è meglio)
+INDICATORI = {
+    "scalare": ("chiamate_al_secondo", True),
+    "rerun_app": ("millisecondi_mediana", False),
+    "rerun_app_compatta": ("millisecondi_mediana", False),
+}
+
+
+def confronta(nuovi, precedenti, tolleranza):
+    """Elenco delle misure peggiorate oltre `tolleranza` percentuale rispetto a `precedenti`."""
+    peggioramenti = []
+    for nome, misura in nuovi["misure"].items():
+        if nome not in precedenti.get("misure", {}):
+            continue
+        chiave, piu_alto_meglio = INDICATORI.get(nome, ("righe_al_secondo", True))
+        prima, dopo = precedenti["misure"][nome][chiave], misura[chiave]
+        variazione = (dopo - prima) / prima * 100.0
+        if (-variazione if piu_alto_meglio else variazione) > tolleranza:
+            peggioramenti.append(f"{nome}.{chiave}: {prima:,.1f} → {dopo:,.1f} ({variazione:+.1f}%)")
+    return peggioramenti
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", help="file in cui scrivere i risultati (default: stdout)")
+    parser.add_argument("--confronta", help="risultati JSON di una versione precedente")
+    parser.add_argument("--tolleranza", type=float, default=20.0, help="peggioramento ammesso (%%)")
+    parser.add_argument("--righe", type=int, nargs="+", default=[10_000, 1_000_000], help="righe del calcolo vettoriale")
+    args = parser.parse_args()
+
+    risultati = esegui_benchmark(tuple(args.righe))
+    testo = json.dumps(risultati, indent=2, ensure_ascii=False)
+    if args.json:
+        Path(args.json).write_text(testo + "\n", encoding="utf-8")
+    else:
+        print(testo)
+
+    if args.confronta:
+        precedenti = json.loads(Path(args.confronta).read_text(encoding="utf-8"))
+        peggioramenti = confronta(risultati, precedenti, args.tolleranza)
+        for riga in peggioramenti:
+            print(f"REGRESSIONE {riga}", file=sys.stderr)
+        return 1 if peggioramenti else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,222 @@
+"""
+Prova di carico del server Streamlit con sessioni concorrenti simulate.
+
+Ogni sessione apre il websocket dell'app come un browser, poi ripete "raffiche" di
+`--clic` clic sul +/- del compenso, uno ogni `--pausa-ms` millisecondi, seguite da
+`--lettura-s` secondi di lettura dei risultati:
+- aggiornamento immediato: ogni clic è un rerun completo dello script, atteso prima del clic successivo;
+- con pulsante (?aggiornamento=pulsante): i clic restano nel browser e la raffica si
+  chiude con un solo rerun alla pressione di "Calcola".
+
+Per ogni numero di sessioni riporta rerun/s serviti, latenze (p50, p95, p99) e, con
+--avvia, la memoria residente del server per sessione.
+
+Uso:
+    python benchmark_sessioni.py --avvia [--sessioni 10 25 50] [--aggiornamento pulsante] [--secondi 30]
+    python benchmark_sessioni.py --porta 8501       # server già in esecuzione
+"""
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+APP = str(Path(__file__).resolve().parent / "app.py")
+CHIAVE_COMPENSO = "compenso_cococo"
+COMPENSO_INIZIALE = 18000
+PASSO = 500
+
+
+def memoria_residente_kb(pid):
+    """VmRSS del processo in KB (Linux), o None se non disponibile."""
+    try:
+        for riga in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if riga.startswith("VmRSS:"):
+                return int(riga.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class Sessione:
+    """Una scheda del browser: websocket, id dei widget e stato degli input inviati."""
+
+    __slots__ = ("url", "query", "socket", "id_compenso", "id_calcola", "compenso")
+
+    def __init__(self, url, query):
+        self.url = url
+        self.query = query
+        self.socket = None
+        self.id_compenso = None
+        self.id_calcola = None
+        self.compenso = COMPENSO_INIZIALE
+
+    async def apri(self):
+        self.socket = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        await self.rerun()
+        if self.id_compenso is None:
+            raise RuntimeError(f"Widget {CHIAVE_COMPENSO} non trovato nella pagina")
+
+    async def chiudi(self):
+        await self.socket.close()
+
+    async def rerun(self, invia_input=False):
+        """Invia un rerun (con il compenso corrente) e attende la fine dello script."""
+        messaggio = BackMsg()
+        messaggio.rerun_script.query_string = self.query
+        messaggio.rerun_script.page_script_hash = ""
+        if invia_input:
+            stati = messaggio.rerun_script.widget_states.widgets
+            stato = stati.add()
+            stato.id = self.id_compenso
+            stato.int_value = self.compenso
+            if self.id_calcola is not None:
+                pulsante = stati.add()
+                pulsante.id = self.id_calcola
+                pulsante.trigger_value = True
+        await self.socket.send(messaggio.SerializeToString())
+        while True:
+            risposta = ForwardMsg()
+            risposta.ParseFromString(await self.socket.recv())
+            tipo = risposta.WhichOneof("type")
+            if tipo == "script_finished":
+                return
+            if tipo == "delta" and risposta.delta.WhichOneof("type") == "new_element":
+                self._registra(risposta.delta.new_element)
+
+    def _registra(self, elemento):
+        tipo = elemento.WhichOneof("type")
+        if tipo == "number_input" and elemento.number_input.id.endswith(CHIAVE_COMPENSO):
+            self.id_compenso = elemento.number_input.id
+        elif tipo == "button" and elemento.button.is_form_submitter:
+            self.id_calcola = elemento.button.id
+
+    def clic(self):
+        self.compenso = COMPENSO_INIZIALE + (self.compenso - COMPENSO_INIZIALE + PASSO) % 100_000
+
+
+async def _utente(sessione, con_pulsante, clic, pausa, lettura, scadenza, latenze, seme):
+    # Partenze sfalsate: le raffiche delle sessioni non arrivano tutte insieme
+    await asyncio.sleep(lettura * (seme % 97) / 97)
+    while time.perf_counter() < scadenza:
+        for _ in range(clic):
+            sessione.clic()
+            await asyncio.sleep(pausa)
+            if not con_pulsante:
+                inizio = time.perf_counter()
+                await sessione.rerun(invia_input=True)
+                latenze.append(time.perf_counter() - inizio)
+        if con_pulsante:
+            inizio = time.perf_counter()
+            await sessione.rerun(invia_input=True)
+            latenze.append(time.perf_counter() - inizio)
+        await asyncio.sleep(lettura)
+
+
+async def carico(url, sessioni, con_pulsante, clic, pausa, lettura, secondi, pid=None):
+    query = urlencode({"aggiornamento": "pulsante"}) if con_pulsante else ""
+    memoria_prima = memoria_residente_kb(pid) if pid else None
+    aperte = [Sessione(url, query) for _ in range(sessioni)]
+    # Apertura scaglionata, come utenti che arrivano uno dopo l'altro
+    for gruppo in range(0, sessioni, 10):
+        await asyncio.gather(*(s.apri() for s in aperte[gruppo:gruppo + 10]))
+    memoria_sessioni = memoria_residente_kb(pid) if pid else None
+
+    latenze = []
+    inizio = time.perf_counter()
+    await asyncio.gather(*(
+        _utente(s, con_pulsante, clic, pausa, lettura, inizio + secondi, latenze, seme)
+        for seme, s in enumerate(aperte)
+    ))
+    durata = time.perf_counter() - inizio
+    memoria_dopo = memoria_residente_kb(pid) if pid else None
+    await asyncio.gather(*(s.chiudi() for s in aperte))
+
+    latenze.sort()
+    percentile = lambda p: latenze[min(len(latenze) - 1, int(p / 100 * len(latenze)))] * 1000.0  # noqa: E731
+    esito = {
+        "sessioni": sessioni,
+        "aggiornamento": "pulsante" if con_pulsante else "immediato",
+        "rerun": len(latenze),
+        "rerun_al_secondo": len(latenze) / durata,
+        "clic_al_secondo": len(latenze) * (clic if con_pulsante else 1) / durata,
+        "latenza_p50_ms": percentile(50),
+        "latenza_p95_ms": percentile(95),
+        "latenza_p99_ms": percentile(99),
+        "latenza_media_ms": statistics.fmean(latenze) * 1000.0,
+    }
+    if memoria_prima is not None:
+        esito["kb_per_sessione"] = (memoria_sessioni - memoria_prima) / sessioni
+        esito["memoria_server_mb"] = memoria_dopo / 1024.0
+    return esito
+
+
+async def _attendi_server(url, timeout=30.0):
+    scadenza = time.perf_counter() + timeout
+    while True:
+        try:
+            sessione = Sessione(url, "")
+            await sessione.apri()
+            await sessione.chiudi()
+            return
+        except OSError:
+            if time.perf_counter() > scadenza:
+                raise
+            await asyncio.sleep(0.5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8599)
+    parser.add_argument("--sessioni", type=int, nargs="+", default=[10, 25, 50], help="sessioni concorrenti")
+    parser.add_argument("--aggiornamento", choices=("immediato", "pulsante"), default="immediato")
+    parser.add_argument("--clic", type=int, default=6, help="clic su +/- per raffica")
+    parser.add_argument("--pausa-ms", type=float, default=150.0, help="pausa tra due clic")
+    parser.add_argument("--lettura-s", type=float, default=5.0, help="pausa di lettura dopo ogni raffica")
+    parser.add_argument("--secondi", type=float, default=30.0, help="durata di ogni prova")
+    parser.add_argument("--avvia", action="store_true", help="avvia `streamlit run app.py` in un processo separato")
+    args = parser.parse_args()
+
+    url = f"ws://{args.host}:{args.porta}/_stcore/stream"
+    processo = None
+    if args.avvia:
+        processo = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", APP, "--server.port", str(args.porta),
+             "--server.headless", "true", "--browser.gatherUsageStats", "false"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    try:
+        asyncio.run(_attendi_server(url))
+        for sessioni in args.sessioni:
+            esito = asyncio.run(carico(
+                url, sessioni, args.aggiornamento == "pulsante", args.clic, args.pausa_ms / 1000.0,
+                args.lettura_s, args.secondi, processo.pid if processo else None,
+            ))
+            memoria = (
+                f", {esito['kb_per_sessione']:.0f} KB/sessione, server {esito['memoria_server_mb']:.0f} MB"
+                if "kb_per_sessione" in esito else ""
+            )
+            print(
+                f"{sessioni:4d} sessioni ({esito['aggiornamento']}): {esito['rerun_al_secondo']:6.1f} rerun/s, "
+                f"{esito['clic_al_secondo']:6.1f} clic/s, latenza p50 {esito['latenza_p50_ms']:.0f} ms, "
+                f"p95 {esito['latenza_p95_ms']:.0f} ms, p99 {esito['latenza_p99_ms']:.0f} ms{memoria}",
+                flush=True,
+            )
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
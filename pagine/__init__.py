@@ -0,0 +1 @@
+"""Pagine aggiuntive dell'interfaccia Streamlit (una per modalità)."""
@@ -0,0 +1,70 @@
+"""
+Modalità "Calcolo inverso": dal netto desiderato o dal budget della società
+al compenso lordo da pattuire.
+"""
+import math
+
+import streamlit as st
+
+from simulatore.calcolo import calcola_cococo_sportivo, formatta_euro, formatta_percentuale
+from simulatore.solutore import compenso_da_obiettivo
+
+OBIETTIVI = {
+    "Netto lavoratore": "netto_lavoratore",
+    "Costo totale società (budget)": "costo_totale_societa",
+}
+
+
+def mostra(anno):
+    st.header("🎯 Calcolo inverso")
+    st.markdown(
+        "Indica il **netto** che il collaboratore vuole ricevere oppure il **budget** che la "
+        "società può spendere: il simulatore calcola il compenso lordo annuo corrispondente."
+    )
+
+    col_i1, col_i2 = st.columns(2)
+    with col_i1:
+        etichetta = st.radio("Obiettivo", list(OBIETTIVI), key="inv_obiettivo")
+        periodo = st.radio("Importo", ["Mensile (× 12)", "Annuo"], horizontal=True, key="inv_periodo")
+        importo = st.number_input(
+            "Importo obiettivo (€)",
+            min_value=0.0,
+            max_value=500000.0,
+            value=1500.0,
+            step=50.0,
+            key="inv_importo",
+        )
+    with col_i2:
+        altra_prev = st.checkbox("Ho già altra pensione o previdenza obbligatoria", value=False, key="inv_altra_prev")
+        addizionale_reg = st.number_input(
+            "Addizionale regionale (%)", min_value=0.0, max_value=3.33, value=1.23, step=0.05, key="inv_add_reg"
+        )
+        addizionale_com = st.number_input(
+            "Addizionale comunale (%)", min_value=0.0, max_value=0.8, value=0.5, step=0.05, key="inv_add_com"
+        )
+
+    obiettivo = OBIETTIVI[etichetta]
+    annuo = importo * 12.0 if periodo.startswith("Mensile") else importo
+    if annuo <= 0:
+        st.warning("Inserisci un importo obiettivo maggiore di zero.")
+        return
+
+    # Al centesimo: per eccesso sul netto (obiettivo raggiunto), per difetto sul budget (non superato)
+    compenso = compenso_da_obiettivo(obiettivo, annuo, altra_prev, addizionale_reg, addizionale_com, anno)
+    if obiettivo == "netto_lavoratore":
+        compenso = math.ceil(round(compenso * 100.0, 6)) / 100.0
+    else:
+        compenso = math.floor(round(compenso * 100.0, 6)) / 100.0
+    risultato = calcola_cococo_sportivo(compenso, altra_prev, addizionale_reg, addizionale_com, anno)
+
+    st.markdown("---")
+    st.success(f"**Compenso lordo annuo da pattuire:** {formatta_euro(compenso)}")
+    col_r1, col_r2, col_r3 = st.columns(3)
+    col_r1.metric("Netto lavoratore annuo", formatta_euro(risultato["netto_lavoratore"]))
+    col_r2.metric("Netto mensile", formatta_euro(risultato["netto_lavoratore"] / 12.0))
+    col_r3.metric("Costo totale società", formatta_euro(risultato["costo_totale_societa"]))
+    st.caption(
+        f"Contributi INPS totali {formatta_euro(risultato['totale_contributi'])} – "
+        f"imposte {formatta_euro(risultato['totale_imposte'])} – "
+        f"tax rate effettivo {formatta_percentuale(risultato['tax_rate'])}"
+    )
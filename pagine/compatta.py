@@ -0,0 +1,79 @@
+"""
+Visualizzazione compatta dei risultati: dettaglio contributivo, fiscale e riepilogo in un
+unico blocco HTML (un solo elemento Streamlit invece di qualche decina di st.write),
+con le classi CSS definite in app.py.
+"""
+from simulatore.calcolo import REGOLE, formatta_euro, formatta_percentuale
+
+
+def _riga(etichetta, valore):
+    return f"<div><strong>{etichetta}:</strong> {valore}</div>"
+
+
+def _riquadro(contenuto, classe=""):
+    return f'<div class="metric-box {classe}">{contenuto}</div>'
+
+
+def dettaglio_html(risultato, anno, addizionale_reg, addizionale_com, altra_previdenza):
+    """HTML del dettaglio di calcolo, con le stesse voci della visualizzazione estesa."""
+    r = risultato
+    parti = ["<h4>💼 Dettaglio Calcolo Contributivo</h4>", _riga("Compenso lordo", formatta_euro(r["compenso_lordo"]))]
+    if r["franchigia_contributiva"] > 0:
+        parti.append(_riquadro(
+            f"✅ <strong>Esenzione contributiva (5.000€):</strong> -{formatta_euro(r['franchigia_contributiva'])}",
+            "metric-green",
+        ))
+    if r["base_contrib_grezza"] > 0:
+        parti.append(_riga("Eccedenza contributiva", formatta_euro(r["base_contrib_grezza"])))
+        parti.append(_riga(
+            "Dimezzamento 50%",
+            f"{formatta_euro(r['base_contrib_grezza'])} × 50% = {formatta_euro(r['base_contrib_ridotta'])}",
+        ))
+    aliquota_ivs = formatta_percentuale(r["aliquota_ivs"], 0)
+    if altra_previdenza:
+        aliquota_ivs += " (ridotta per altra previdenza/pensione)"
+    parti += [
+        _riga("Aliquota IVS", aliquota_ivs),
+        _riga("Contributi IVS", formatta_euro(r["contributi_ivs"])),
+        _riga("Aliquota aggiuntiva", formatta_percentuale(r["aliquota_aggiuntiva"])),
+        _riga("Contributi aggiuntivi", formatta_euro(r["contributi_aggiuntivi"])),
+        _riga("Totale contributi INPS", formatta_euro(r["totale_contributi"])),
+        _riga("Quota lavoratore (1/3)", formatta_euro(r["contributi_lavoratore"])),
+        _riga("Quota società (2/3)", formatta_euro(r["contributi_societa"])),
+        "<h4>🧮 Dettaglio Calcolo Fiscale (IRPEF)</h4>",
+    ]
+    if r["franchigia_fiscale"] > 0:
+        parti.append(_riquadro(
+            f"✅ <strong>Esenzione fiscale (15.000€):</strong> -{formatta_euro(r['franchigia_fiscale'])}",
+            "metric-green",
+        ))
+    aliquote_irpef = "-".join(f"{a * 100:g}" for a in REGOLE[anno].scaglioni_irpef.aliquote)
+    parti += [
+        _riga("Reddito imponibile lordo", formatta_euro(r["reddito_imponibile"])),
+        _riga("Contributi deducibili (1/3)", f"-{formatta_euro(r['contributi_lavoratore'])}"),
+        _riga("Reddito imponibile netto IRPEF", formatta_euro(r["reddito_imponibile_netto"])),
+        _riga(f"IRPEF (scaglioni {aliquote_irpef}%)", formatta_euro(r["irpef"])),
+    ]
+    if r["addizionale_regionale"] > 0:
+        parti.append(_riga(
+            f"Addizionale regionale ({formatta_percentuale(addizionale_reg)})", formatta_euro(r["addizionale_regionale"])
+        ))
+    if r["addizionale_comunale"] > 0:
+        parti.append(_riga(
+            f"Addizionale comunale ({formatta_percentuale(addizionale_com)})", formatta_euro(r["addizionale_comunale"])
+        ))
+    parti += [
+        _riga("Totale imposte", formatta_euro(r["totale_imposte"])),
+        "<h4>📋 Riepilogo Finale</h4>",
+        _riquadro(
+            f"<strong>= NETTO LAVORATORE ANNUALE:</strong> {formatta_euro(r['netto_lavoratore'])}<br>"
+            f"<strong>= NETTO LAVORATORE MENSILE:</strong> {formatta_euro(max(0.0, r['netto_lavoratore'] / 12.0))}",
+            "metric-green",
+        ),
+        _riquadro(
+            f"<strong>= COSTO TOTALE SOCIETÀ:</strong> {formatta_euro(r['costo_totale_societa'])} "
+            f"(compenso + contributi società {formatta_euro(r['contributi_societa'])})",
+            "metric-orange",
+        ),
+    ]
+    return "".join(parti)
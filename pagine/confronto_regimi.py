@@ -0,0 +1,129 @@
+"""
+Modalità "Confronto regimi": netto e costo società dello stesso compenso come Co.Co.Co
+sportivo, Partita IVA forfettaria e lavoro sportivo subordinato, per un singolo
+collaboratore o per un intero elenco.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from simulatore.calcolo import formatta_euro, formatta_percentuale
+from simulatore.file_paghe import leggi_a_blocchi, prepara_ingresso
+from simulatore.scenari import (
+    ETICHETTE_REGIMI,
+    FORFETTARIO,
+    REGIMI,
+    SUBORDINATO,
+    confronta_regimi,
+    confronta_regimi_df,
+)
+
+VOCI = (
+    ("compenso_lordo", "Compenso lordo"),
+    ("contributi_lavoratore", "Contributi a carico del collaboratore"),
+    ("imposte", "Imposte (IRPEF + addizionali o sostitutiva)"),
+    ("netto_lavoratore", "Netto collaboratore"),
+    ("contributi_societa", "Contributi a carico della società"),
+    ("altri_costi_societa", "TFR"),
+    ("costo_totale_societa", "Costo totale società"),
+)
+
+
+def _tabella(confronto):
+    righe = {etichetta: [formatta_euro(confronto[r][voce]) for r in REGIMI] for voce, etichetta in VOCI}
+    righe["Tax rate effettivo"] = [formatta_percentuale(confronto[r]["tax_rate"]) for r in REGIMI]
+    return pd.DataFrame.from_dict(righe, orient="index", columns=[ETICHETTE_REGIMI[r] for r in REGIMI])
+
+
+def _confronta_elenco(file, anno, avvio_forfettario):
+    """Totali per regime e numero di collaboratori per cui ogni regime dà il netto più alto."""
+    totali = {r: dict.fromkeys(("compenso_lordo", "netto_lavoratore", "costo_totale_societa"), 0.0) for r in REGIMI}
+    migliori = dict.fromkeys(REGIMI, 0)
+    persone = 0
+    for blocco in leggi_a_blocchi(file, file.name):
+        confronto = confronta_regimi_df(prepara_ingresso(blocco), anno, avvio_forfettario)
+        for regime, righe in confronto.groupby("regime", sort=False):
+            for colonna in totali[regime]:
+                totali[regime][colonna] += float(righe[colonna].sum())
+        netti = confronto["netto_lavoratore"].to_numpy().reshape(len(REGIMI), -1)
+        conteggi = np.bincount(netti.argmax(axis=0), minlength=len(REGIMI))
+        for regime, conteggio in zip(REGIMI, conteggi):
+            migliori[regime] += int(conteggio)
+        persone += netti.shape[1]
+    return totali, migliori, persone
+
+
+def mostra(anno):
+    st.header("⚖️ Confronto regimi")
+    st.markdown(
+        "Lo stesso compenso lordo come **Co.Co.Co sportivo**, come **Partita IVA forfettaria** "
+        "e come **lavoro sportivo subordinato**: quanto resta al collaboratore e quanto costa alla società."
+    )
+
+    col_i1, col_i2 = st.columns(2)
+    with col_i1:
+        compenso = st.number_input(
+            "Compenso lordo annuo (€)", min_value=0, max_value=200000, value=18000, step=500, key="reg_compenso"
+        )
+        altra_prev = st.checkbox("Ho già altra pensione o previdenza obbligatoria", value=False, key="reg_altra_prev")
+        avvio = st.checkbox(
+            "Forfettario in avvio di attività (sostitutiva 5%)", value=False, key="reg_avvio",
+            help="Aliquota ridotta per i primi 5 anni di una nuova attività",
+        )
+    with col_i2:
+        addizionale_reg = st.number_input(
+            "Addizionale regionale (%)", min_value=0.0, max_value=3.33, value=1.23, step=0.05, key="reg_add_reg"
+        )
+        addizionale_com = st.number_input(
+            "Addizionale comunale (%)", min_value=0.0, max_value=0.8, value=0.5, step=0.05, key="reg_add_com"
+        )
+
+    confronto = confronta_regimi(compenso, altra_prev, addizionale_reg, addizionale_com, anno, avvio)
+
+    colonne = st.columns(len(REGIMI))
+    for colonna, regime in zip(colonne, REGIMI):
+        risultato = confronto[regime]
+        differenza = risultato["netto_lavoratore"] - confronto["cococo"]["netto_lavoratore"]
+        colonna.metric(
+            ETICHETTE_REGIMI[regime],
+            formatta_euro(risultato["netto_lavoratore"]),
+            delta=None if regime == "cococo" else f"{formatta_euro(differenza)} vs Co.Co.Co",
+            help=f"Netto collaboratore – costo società {formatta_euro(risultato['costo_totale_societa'])}",
+        )
+    st.dataframe(_tabella(confronto))
+
+    with st.expander("ℹ️ Ipotesi di calcolo"):
+        st.markdown(
+            f"- **Forfettario:** reddito = {FORFETTARIO['coefficiente_redditivita']:g}% del compenso, "
+            f"INPS gestione separata {FORFETTARIO['aliquota_gestione_separata']:g}% interamente a carico del "
+            f"collaboratore, imposta sostitutiva {FORFETTARIO['aliquota_sostitutiva']:g}% "
+            f"({FORFETTARIO['aliquota_sostitutiva_avvio']:g}% in avvio), nessuna franchigia sportiva né addizionale.\n"
+            f"- **Subordinato:** franchigie e base contributiva dimezzata come il Co.Co.Co, IVS "
+            f"{SUBORDINATO['aliquota_ivs_lavoratore']:g}% lavoratore e {SUBORDINATO['aliquota_ivs_datore']:g}% "
+            f"società, TFR {SUBORDINATO['quota_tfr']:g}% a carico della società.\n"
+            "- In tutti i regimi: nessuna detrazione IRPEF, come nel resto del simulatore."
+        )
+
+    st.markdown("---")
+    st.subheader("👥 Confronto su un elenco di collaboratori")
+    file = st.file_uploader(
+        "File collaboratori (stesse colonne dell'elaborazione file paghe)",
+        type=["csv", "txt", "xlsx", "xlsm"],
+        key="reg_file",
+    )
+    if file is None or not st.button("▶️ Confronta elenco", key="reg_elabora"):
+        return
+    try:
+        totali, migliori, persone = _confronta_elenco(file, anno, avvio)
+    except (ValueError, KeyError) as errore:
+        st.error(f"Impossibile elaborare il file: {errore}")
+        return
+    st.dataframe(pd.DataFrame(
+        {
+            "Netto collaboratori": [formatta_euro(totali[r]["netto_lavoratore"]) for r in REGIMI],
+            "Costo società": [formatta_euro(totali[r]["costo_totale_societa"]) for r in REGIMI],
+            "Collaboratori con il netto più alto": [migliori[r] for r in REGIMI],
+        },
+        index=[ETICHETTE_REGIMI[r] for r in REGIMI],
+    ))
+    st.caption(f"{persone:,} collaboratori confrontati.".replace(",", "."))
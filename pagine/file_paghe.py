@@ -0,0 +1,77 @@
+"""
+Modalità "Elaborazione file paghe": caricamento di un elenco collaboratori (CSV/Excel),
+calcolo a blocchi e download dei risultati.
+"""
+import tempfile
+import time
+
+import streamlit as st
+
+from simulatore.file_paghe import (
+    RIGHE_PER_BLOCCO,
+    conta_righe_excel,
+    elabora_file,
+    stima_avanzamento,
+)
+
+MIME_USCITA = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def mostra(anno):
+    st.header("📂 Elaborazione file paghe")
+    st.markdown(
+        "Carica l'elenco dei collaboratori in **CSV** o **Excel** con le colonne "
+        "`compenso_lordo` (obbligatoria), `altra_previdenza` (sì/no), `addizionali_reg` e "
+        "`addizionali_com` (in %). Le altre colonne (nome, codice fiscale, ...) vengono "
+        "riportate nel file dei risultati."
+    )
+
+    file = st.file_uploader("File collaboratori", type=["csv", "txt", "xlsx", "xlsm"], key="file_paghe")
+    col_f1, col_f2 = st.columns(2)
+    with col_f1:
+        formato_uscita = st.radio("Formato risultati", ["csv", "xlsx"], horizontal=True, key="formato_uscita")
+    with col_f2:
+        righe_per_blocco = st.number_input(
+            "Righe per blocco",
+            min_value=500,
+            max_value=100_000,
+            value=RIGHE_PER_BLOCCO,
+            step=500,
+            key="righe_per_blocco",
+            help="Blocchi più piccoli riducono la memoria occupata, blocchi più grandi sono più veloci.",
+        )
+
+    if file is None or not st.button("▶️ Elabora file", type="primary"):
+        return
+
+    righe_totali = conta_righe_excel(file) if file.name.lower().endswith(("xlsx", "xlsm")) else None
+    barra = st.progress(0.0, text="Elaborazione in corso...")
+    inizio = time.perf_counter()
+    righe = 0
+    # I risultati vanno su un file temporaneo blocco per blocco: in memoria resta un solo blocco
+    with tempfile.TemporaryFile() as uscita:
+        try:
+            for righe in elabora_file(file, file.name, uscita, formato_uscita, int(righe_per_blocco), anno=anno):
+                velocita = righe / max(time.perf_counter() - inizio, 1e-9)
+                barra.progress(
+                    stima_avanzamento(file, righe, righe_totali),
+                    text=f"{righe:,} righe elaborate – {velocita:,.0f} righe/s".replace(",", "."),
+                )
+        except (ValueError, KeyError) as errore:
+            barra.empty()
+            st.error(f"Impossibile elaborare il file: {errore}")
+            return
+
+        secondi = time.perf_counter() - inizio
+        barra.progress(1.0, text=f"Completato: {righe:,} righe in {secondi:.2f} s".replace(",", "."))
+        uscita.seek(0)
+        nome_base = file.name.rsplit(".", 1)[0]
+        st.download_button(
+            "⬇️ Scarica risultati",
+            data=uscita,
+            file_name=f"{nome_base}_risultati.{formato_uscita}",
+            mime=MIME_USCITA[formato_uscita],
+        )
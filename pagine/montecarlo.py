@@ -0,0 +1,116 @@
+"""
+Modalità "Pianificazione stagione": simulazione Monte Carlo del costo della società con
+compensi incerti (minimo, atteso, massimo) per ogni collaboratore.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from simulatore.calcolo import formatta_euro, formatta_percentuale
+from simulatore.file_paghe import leggi_a_blocchi
+from simulatore.montecarlo import (
+    prepara_distribuzioni,
+    probabilita_entro_budget,
+    riepilogo_percentili,
+    simula_stagione,
+)
+
+ESEMPIO = pd.DataFrame({
+    "nome": ["Istruttore nuoto", "Allenatore calcio", "Preparatore atletico"],
+    "compenso_min": [3000.0, 12000.0, 4000.0],
+    "compenso_atteso": [6000.0, 15000.0, 8000.0],
+    "compenso_max": [9000.0, 20000.0, 14000.0],
+    "altra_previdenza": [False, False, True],
+})
+BARRE_ISTOGRAMMA = 40
+
+VOCI = (
+    ("costo_totale_societa", "Costo totale società"),
+    ("contributi_societa", "Contributi a carico della società"),
+    ("compenso_lordo", "Compensi lordi"),
+    ("netto_lavoratore", "Netto collaboratori"),
+)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _simula(elenco, scenari, seme, anno, addizionale_reg, addizionale_com):
+    distribuzioni = prepara_distribuzioni(elenco)
+    if "addizionali_reg" not in elenco:
+        distribuzioni["addizionali_reg"] = addizionale_reg
+    if "addizionali_com" not in elenco:
+        distribuzioni["addizionali_com"] = addizionale_com
+    # Nel server Streamlit si resta nel processo corrente: il pool conviene da riga di comando
+    return simula_stagione(distribuzioni, scenari, seme, anno, processi=1)
+
+
+def mostra(anno):
+    st.header("🎲 Pianificazione stagione")
+    st.markdown(
+        "Per ogni collaboratore indica il compenso **minimo**, **atteso** e **massimo** della stagione: "
+        "il simulatore estrae migliaia di stagioni possibili (distribuzione triangolare) e riporta "
+        "i percentili del costo per la società."
+    )
+
+    file = st.file_uploader(
+        "Elenco collaboratori (facoltativo: compenso_min, compenso_atteso, compenso_max "
+        "oppure ore_min, ore_attese, ore_max, tariffa_oraria)",
+        type=["csv", "txt", "xlsx", "xlsm"],
+        key="mc_file",
+    )
+    if file is not None:
+        try:
+            elenco = pd.concat(list(leggi_a_blocchi(file, file.name)), ignore_index=True)
+        except (ValueError, KeyError) as errore:
+            st.error(f"Impossibile leggere il file: {errore}")
+            return
+        st.caption(f"{len(elenco):,} collaboratori letti dal file.".replace(",", "."))
+    else:
+        elenco = st.data_editor(ESEMPIO, num_rows="dynamic", hide_index=True, key="mc_elenco")
+
+    col_i1, col_i2, col_i3 = st.columns(3)
+    with col_i1:
+        scenari = st.select_slider("Scenari", options=[1000, 5000, 10000, 50000, 100000], value=10000, key="mc_scenari")
+        seme = st.number_input("Seme casuale", min_value=0, value=0, step=1, key="mc_seme",
+                               help="Stesso seme, stessi risultati")
+    with col_i2:
+        addizionale_reg = st.number_input(
+            "Addizionale regionale (%)", min_value=0.0, max_value=3.33, value=1.23, step=0.05, key="mc_add_reg"
+        )
+        addizionale_com = st.number_input(
+            "Addizionale comunale (%)", min_value=0.0, max_value=0.8, value=0.5, step=0.05, key="mc_add_com"
+        )
+    with col_i3:
+        budget = st.number_input("Budget della stagione (€)", min_value=0, value=50000, step=1000, key="mc_budget")
+
+    if elenco.empty:
+        st.info("Aggiungi almeno un collaboratore.")
+        return
+    try:
+        esiti = _simula(elenco, int(scenari), int(seme), anno, addizionale_reg, addizionale_com)
+    except (ValueError, KeyError) as errore:
+        st.error(str(errore))
+        return
+
+    riepilogo = riepilogo_percentili(esiti)
+    colonne = st.columns(3)
+    colonne[0].metric("Costo mediano (P50)", formatta_euro(riepilogo.loc["P50", "costo_totale_societa"]))
+    colonne[1].metric("Costo prudente (P95)", formatta_euro(riepilogo.loc["P95", "costo_totale_societa"]))
+    colonne[2].metric(
+        "Probabilità entro budget",
+        formatta_percentuale(probabilita_entro_budget(esiti, budget) * 100, 1),
+    )
+
+    st.dataframe(pd.DataFrame(
+        {etichetta: [formatta_euro(v) for v in riepilogo[colonna]] for colonna, etichetta in VOCI},
+        index=riepilogo.index,
+    ))
+
+    conteggi, bordi = np.histogram(esiti["costo_totale_societa"], bins=BARRE_ISTOGRAMMA)
+    st.bar_chart(pd.DataFrame(
+        {"Scenari": conteggi},
+        index=pd.Index(((bordi[:-1] + bordi[1:]) / 2).round(0), name="Costo totale società (€)"),
+    ))
+    st.caption(
+        f"{len(esiti):,} scenari simulati. Per elenchi grandi: "
+        "`python -m simulatore.montecarlo elenco.csv --processi 4`".replace(",", ".", 1)
+    )
@@ -0,0 +1,116 @@
+"""
+Misura del costo di un rerun: tempo di esecuzione dello script e numero/dimensione dei
+messaggi inviati al browser. I valori dell'ultimo rerun restano in st.session_state e sono
+mostrati nel pannello di debug (?debug=1); fuori dal debug la misura è disattivata e non
+occupa memoria nella sessione.
+
+I tempi aggregati di tutte le sessioni (simulatore.strumentazione) sono mostrati dal
+pannello nascosto di mostra_strumentazione.
+"""
+import time
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+
+class MisuraRerun:
+    """
+    Context manager che conta i messaggi inviati durante il blocco intercettando la coda
+    del contesto di esecuzione. Le misure annidate (es. un fragment dentro lo script) si
+    sommano a quelle esterne e vengono ripristinate in ordine inverso. Con `attiva=False`
+    il blocco non intercetta nulla e non scrive in sessione.
+
+    Con avvia()/termina() un rerun interrotto (st.rerun, widget cambiato durante
+    l'esecuzione, eccezione) non arriva a termina(): ripristina_invio() in cima allo
+    script toglie le intercettazioni rimaste prima di avviarne una nuova.
+    """
+
+    __slots__ = ("chiave", "attiva", "messaggi", "byte", "secondi", "_contesto", "_originale", "_inizio")
+
+    def __init__(self, chiave, attiva=True):
+        self.chiave = chiave
+        self.attiva = attiva
+        self.messaggi = 0
+        self.byte = 0
+        self.secondi = 0.0
+        self._contesto = None
+        self._originale = None
+        self._inizio = 0.0
+
+    def _accoda(self, messaggio):
+        self.messaggi += 1
+        self.byte += messaggio.ByteSize()
+        self._originale(messaggio)
+
+    def avvia(self):
+        """Inizia la misura (per lo script intero, dove un blocco `with` non è comodo)."""
+        if not self.attiva:
+            return self
+        self._contesto = get_script_run_ctx()
+        if self._contesto is not None:
+            self._originale = self._contesto._enqueue
+            self._contesto._enqueue = self._accoda
+        self._inizio = time.perf_counter()
+        return self
+
+    def termina(self, completata=True):
+        """Chiude la misura e, se il blocco è arrivato in fondo, la salva in sessione."""
+        if not self.attiva:
+            return
+        self.secondi = time.perf_counter() - self._inizio
+        if self._contesto is not None:
+            self._contesto._enqueue = self._originale
+        # Un rerun interrotto (st.rerun, stop) non è una misura significativa
+        if completata:
+            st.session_state[self.chiave] = {
+                "messaggi": self.messaggi,
+                "byte": self.byte,
+                "millisecondi": self.secondi * 1000.0,
+            }
+
+    def __enter__(self):
+        return self.avvia()
+
+    def __exit__(self, tipo, *_):
+        self.termina(tipo is None)
+        return False
+
+
+def ripristina_invio(contesto=None):
+    """
+    Rimette la coda originale del contesto togliendo le intercettazioni di MisuraRerun
+    lasciate da rerun interrotti. Va chiamata quando nessuna misura è in corso (prima
+    riga dello script), anche fuori dal debug.
+    """
+    contesto = contesto or get_script_run_ctx()
+    if contesto is None:
+        return
+    while isinstance(getattr(contesto._enqueue, "__self__", None), MisuraRerun):
+        contesto._enqueue = contesto._enqueue.__self__._originale
+
+
+def ultima_misura(chiave):
+    """Misura dell'ultimo rerun completato per `chiave`, o None."""
+    return st.session_state.get(chiave)
+
+
+def mostra_strumentazione(registro):
+    """Percentili in millisecondi delle sezioni misurate, con export JSON e Prometheus e azzeramento."""
+    riepilogo = registro.riepilogo()
+    if not riepilogo:
+        st.caption("Nessuna misura registrata.")
+        return
+    tabella = pd.DataFrame.from_dict(riepilogo, orient="index")
+    tempi = [c for c in tabella.columns if c.endswith("_s")]
+    tabella[tempi] = (tabella[tempi] * 1000.0).round(2)
+    st.dataframe(tabella.rename(columns={c: c[:-2] + " (ms)" for c in tempi}))
+
+    col_json, col_prometheus, col_azzera = st.columns(3)
+    col_json.download_button("JSON", registro.json(), "tempi.json", "application/json", key="strumentazione_json")
+    col_prometheus.download_button(
+        "Prometheus", registro.prometheus(), "tempi.prom", "text/plain", key="strumentazione_prometheus"
+    )
+    if col_azzera.button("Azzera", key="strumentazione_azzera"):
+        registro.azzera()
+        st.rerun()
@@ -0,0 +1,103 @@
+"""
+Modalità "Analisi di sensibilità": curve di netto, costo società, tax rate e aliquota
+marginale al variare del compenso lordo.
+"""
+import altair as alt
+import numpy as np
+import streamlit as st
+
+from simulatore.sensibilita import griglia_sensibilita, punti_critici
+
+PUNTI_GRAFICO = 2000  # punti per curva inviati al browser
+
+GRAFICI = (
+    ("netto_lavoratore", "Netto lavoratore (€)"),
+    ("costo_totale_societa", "Costo società (€)"),
+    ("tax_rate", "Tax rate effettivo (%)"),
+    ("aliquota_marginale", "Aliquota marginale (%)"),
+)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _dati_grafico(minimo, massimo, addizionali_reg, addizionali_com, anno):
+    """Griglia a passo 1€ ridotta a PUNTI_GRAFICO punti per curva, più i punti critici."""
+    griglia = griglia_sensibilita(minimo, massimo, 1.0, addizionali_reg, addizionali_com, anno)
+    punti = punti_critici(griglia, anno)
+    passo_grafico = max(1, int(np.ceil((massimo - minimo) / PUNTI_GRAFICO)))
+    compensi = griglia["compenso_lordo"]
+    # Oltre al campionamento regolare si tengono i punti critici e l'euro precedente,
+    # così i salti dell'aliquota marginale restano visibili
+    da_tenere = (
+        ((compensi - minimo) % passo_grafico == 0)
+        | compensi.isin(punti["compenso_lordo"])
+        | compensi.isin(punti["compenso_lordo"] - 1.0)
+    )
+    grafico = griglia[da_tenere].copy()
+    grafico["previdenza"] = np.where(grafico["altra_previdenza"], "Con altra previdenza (IVS 24%)", "Senza altra previdenza (IVS 25%)")
+    punti = punti[(punti["compenso_lordo"] >= minimo) & (punti["compenso_lordo"] <= massimo)]
+    return grafico, punti
+
+
+def _grafico(dati, punti, colonna, titolo):
+    linee = alt.Chart(dati).mark_line().encode(
+        x=alt.X("compenso_lordo:Q", title="Compenso lordo annuo (€)"),
+        y=alt.Y(f"{colonna}:Q", title=titolo),
+        color=alt.Color("previdenza:N", title=None, legend=alt.Legend(orient="bottom")),
+        tooltip=[
+            alt.Tooltip("compenso_lordo:Q", title="Compenso", format=",.0f"),
+            alt.Tooltip(f"{colonna}:Q", title=titolo, format=",.2f"),
+            alt.Tooltip("previdenza:N", title="Situazione"),
+        ],
+    )
+    soglie = alt.Chart(punti).mark_rule(strokeDash=[4, 4], color="#888").encode(
+        x="compenso_lordo:Q",
+        tooltip=[alt.Tooltip("descrizione:N", title="Soglia"), alt.Tooltip("compenso_lordo:Q", title="Compenso", format=",.0f")],
+    )
+    return (linee + soglie).properties(width="container", height=280)
+
+
+def mostra(anno):
+    st.header("📈 Analisi di sensibilità")
+    st.markdown(
+        "Andamento di netto, costo per la società, tax rate effettivo e aliquota marginale "
+        "al variare del compenso lordo annuo (calcolo a passi di 1€). Le linee tratteggiate "
+        "indicano le franchigie e l'ingresso negli scaglioni IRPEF."
+    )
+
+    col_s1, col_s2, col_s3 = st.columns(3)
+    with col_s1:
+        minimo, massimo = st.slider(
+            "Intervallo compenso lordo (€)",
+            min_value=0,
+            max_value=200000,
+            value=(0, 200000),
+            step=1000,
+            key="sens_intervallo",
+        )
+    with col_s2:
+        addizionale_reg = st.number_input(
+            "Addizionale regionale (%)", min_value=0.0, max_value=3.33, value=1.23, step=0.05, key="sens_add_reg"
+        )
+    with col_s3:
+        addizionale_com = st.number_input(
+            "Addizionale comunale (%)", min_value=0.0, max_value=0.8, value=0.5, step=0.05, key="sens_add_com"
+        )
+
+    if massimo <= minimo:
+        st.warning("Seleziona un intervallo di compensi non vuoto.")
+        return
+
+    dati, punti = _dati_grafico(float(minimo), float(massimo), addizionale_reg, addizionale_com, anno)
+
+    for riga in range(0, len(GRAFICI), 2):
+        colonne = st.columns(2)
+        for colonna, (campo, titolo) in zip(colonne, GRAFICI[riga:riga + 2]):
+            with colonna:
+                st.subheader(titolo)
+                st.altair_chart(_grafico(dati, punti, campo, titolo))
+
+    with st.expander("📍 Punti critici"):
+        tabella = punti.assign(
+            situazione=punti["altra_previdenza"].map({None: "Tutti", False: "IVS 25%", True: "IVS 24%"})
+        )[["compenso_lordo", "descrizione", "situazione"]]
+        st.dataframe(tabella, hide_index=True)
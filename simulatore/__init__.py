@@ -0,0 +1,33 @@
+"""
+Simulatore Co.Co.Co lavoratori sportivi – motore di calcolo importabile.
+
+Il calcolo vettoriale è in simulatore.batch (richiede NumPy), la riga di comando
+in simulatore.cli (`python -m simulatore`).
+"""
+from .calcolo import (
+    ANNI_DISPONIBILI,
+    ANNO_DEFAULT,
+    COLONNE_RISULTATO,
+    REGOLE,
+    SCAGLIONI_IRPEF,
+    RegoleAnno,
+    ScaglioniIrpef,
+    calcola_cococo_sportivo,
+    calcola_irpef,
+    formatta_euro,
+    formatta_percentuale,
+)
+
+__all__ = [
+    "ANNI_DISPONIBILI",
+    "ANNO_DEFAULT",
+    "COLONNE_RISULTATO",
+    "REGOLE",
+    "SCAGLIONI_IRPEF",
+    "RegoleAnno",
+    "ScaglioniIrpef",
+    "calcola_cococo_sportivo",
+    "calcola_irpef",
+    "formatta_euro",
+    "formatta_percentuale",
+]
@@ -0,0 +1,288 @@
+"""
+Addizionali IRPEF regionali e comunali da tabella, con scaglioni e soglie di esenzione.
+
+Il file dati (simulatore/dati/addizionali.csv, o quello indicato dalla variabile d'ambiente
+SIMULATORE_ADDIZIONALI) ha una riga per ente e anno. Per ogni anno viene compilata una sola
+volta una TabellaAddizionali: codici ordinati, etichette per la ricerca e matrici
+enti × scaglioni (soglie, aliquote, imposta cumulata) valutate come gli scaglioni IRPEF.
+
+Per gli elenchi, le colonne codice_comune (ISTAT a 6 cifre) e/o codice_regione vengono
+risolte con un unico join vettoriale (pandas Index.get_indexer) e trasformate nelle
+aliquote effettive addizionali_reg / addizionali_com che il motore di calcolo già usa.
+"""
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .calcolo import ANNO_DEFAULT, COLONNE_CODICI
+from .strumentazione import cronometra
+
+PERCORSO_ADDIZIONALI = Path(__file__).resolve().parent / "dati" / "addizionali.csv"
+TIPI = {"R": "regione", "C": "comune"}
+# Trentino-Alto Adige: l'addizionale è delle province autonome (021 Bolzano, 022 Trento)
+CODICE_TRENTINO_ALTO_ADIGE = "04"
+
+
+def _percorso():
+    return Path(os.environ.get("SIMULATORE_ADDIZIONALI", PERCORSO_ADDIZIONALI))
+
+
+def normalizza_codici(valori, cifre):
+    """
+    Codici ISTAT come stringhe: spazi e ".0" finali (celle Excel numeriche) rimossi, zeri
+    iniziali ripristinati fino a `cifre` (1272 → "001272"); valori mancanti → "".
+    """
+    # Si normalizzano solo i valori distinti (qualche migliaio anche su milioni di righe)
+    posizioni, distinti = pd.factorize(pd.Series(valori, dtype=object).fillna(""))
+    testo = pd.Series(distinti, dtype=object).astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+    testo = testo.where(~testo.isin(("nan", "None", "<NA>")), "")
+    cifre_sole = testo.str.fullmatch(r"\d+")
+    return testo.where(~cifre_sole, testo.str.zfill(cifre)).to_numpy(dtype=object)[posizioni]
+
+
+@lru_cache(maxsize=1)
+def leggi_dati(percorso=None):
+    """Righe del file dati validate: un DataFrame con una riga per ente e anno."""
+    percorso = Path(percorso) if percorso is not None else _percorso()
+    dati = pd.read_csv(percorso, comment="#", dtype=str, keep_default_na=False)
+    mancanti = {"tipo", "codice", "nome", "regione", "anno", "esenzione", "soglie", "aliquote"} - set(dati.columns)
+    if mancanti:
+        raise ValueError(f"{percorso}: colonne mancanti {sorted(mancanti)}")
+    dati["tipo"] = dati["tipo"].str.strip().str.upper()
+    if not dati["tipo"].isin(list(TIPI)).all():
+        raise ValueError(f"{percorso}: tipo deve essere R (regione) o C (comune)")
+    for colonna in ("nome", "provincia"):
+        if colonna in dati:
+            dati[colonna] = dati[colonna].str.strip()
+    dati["codice"] = np.where(
+        dati["tipo"] == "C", normalizza_codici(dati["codice"], 6), normalizza_codici(dati["codice"], 2)
+    )
+    dati["regione"] = normalizza_codici(dati["regione"], 2)
+    dati["anno"] = dati["anno"].astype(int)
+    dati["esenzione"] = pd.to_numeric(dati["esenzione"].replace("", "0"))
+    if dati.duplicated(["tipo", "codice", "anno"]).any():
+        raise ValueError(f"{percorso}: ente ripetuto nello stesso anno")
+    return dati
+
+
+@lru_cache(maxsize=1)
+def impronta_dati(percorso=None):
+    """Impronta a 64 bit del file dati: cambia con qualunque aliquota, soglia o esenzione."""
+    return int(pd.util.hash_pandas_object(leggi_dati(percorso), index=False).sum())
+
+
+class TabellaAddizionali:
+    """
+    Addizionali di un anno compilate per la valutazione vettoriale.
+
+    `codici` sono "R:<codice>" e "C:<codice>" in ordine; le matrici hanno una riga per ente e
+    tante colonne quanti gli scaglioni dell'ente più articolato (soglie mancanti = +inf).
+    """
+
+    __slots__ = ("anno", "codici", "nomi", "etichette", "regione", "esenzione", "soglie", "inizi", "aliquote",
+                 "cumulate", "_indice", "_ricerca", "_posizione_regione")
+
+    def __init__(self, righe, anno):
+        righe = righe.sort_values(["tipo", "codice"], kind="stable")
+        self.anno = anno
+        self.codici = (righe["tipo"] + ":" + righe["codice"]).to_numpy()
+        self.nomi = righe["nome"].to_numpy()
+        provincia = righe["provincia"] if "provincia" in righe else pd.Series("", index=righe.index)
+        self.etichette = np.where(
+            righe["tipo"] == "C",
+            righe["nome"] + np.where(provincia != "", " (" + provincia + ")", ""),
+            righe["nome"] + " – regione",
+        ).astype(str)
+        self._ricerca = np.char.lower(self.etichette)
+        self.regione = ("R:" + righe["regione"]).to_numpy()
+        self.esenzione = righe["esenzione"].to_numpy(dtype=np.float64)
+        self._indice = pd.Index(self.codici)
+        self._posizione_regione = self._indice.get_indexer(self.regione)
+
+        soglie = [[float(s) for s in testo.split("|")] if testo else [] for testo in righe["soglie"]]
+        aliquote = [[float(a) / 100.0 for a in testo.split("|")] for testo in righe["aliquote"]]
+        scaglioni = max((len(a) for a in aliquote), default=1)
+        n = len(righe)
+        # Le soglie mancanti sono +inf: gli scaglioni oltre l'ultimo dell'ente non vengono mai scelti
+        self.soglie = np.full((n, scaglioni - 1), np.inf)
+        self.inizi = np.zeros((n, scaglioni))
+        self.aliquote = np.zeros((n, scaglioni))
+        self.cumulate = np.zeros((n, scaglioni))
+        for i, (s, a, codice) in enumerate(zip(soglie, aliquote, self.codici)):
+            if len(a) != len(s) + 1 or any(b <= x for x, b in zip([0.0] + s, s)):
+                raise ValueError(f"Addizionale {codice} ({anno}): soglie crescenti e un'aliquota in più delle soglie")
+            inizi = [0.0] + s
+            self.soglie[i, :len(s)] = s
+            self.inizi[i, :len(a)] = inizi
+            self.aliquote[i, :len(a)] = a
+            for k in range(1, len(a)):
+                self.cumulate[i, k] = self.cumulate[i, k - 1] + (inizi[k] - inizi[k - 1]) * a[k - 1]
+
+    def __len__(self):
+        return len(self.codici)
+
+    def __repr__(self):
+        return f"TabellaAddizionali(anno={self.anno}, enti={len(self)})"
+
+    def posizioni(self, codici):
+        """Codici "R:…"/"C:…" → righe della tabella in un solo join; KeyError per i codici sconosciuti."""
+        posizioni = self._indice.get_indexer(np.asarray(codici, dtype=object))
+        if (posizioni < 0).any():
+            sconosciuti = sorted(set(np.asarray(codici, dtype=object)[posizioni < 0].tolist()))
+            raise KeyError(f"Addizionali non disponibili per {', '.join(sconosciuti[:5])} (anno {self.anno})")
+        return posizioni
+
+    def importi(self, posizioni, redditi):
+        """Addizionale dovuta dagli enti `posizioni` (−1 = nessuno) sui redditi imponibili."""
+        posizioni = np.asarray(posizioni)
+        redditi = np.asarray(redditi, dtype=np.float64)
+        righe = np.maximum(posizioni, 0)
+        k = (redditi[..., np.newaxis] > self.soglie[righe]).sum(axis=-1)
+        righe_k = (righe, k)
+        imposta = self.cumulate[righe_k] + (redditi - self.inizi[righe_k]) * self.aliquote[righe_k]
+        dovuta = (posizioni >= 0) & (redditi > 0) & (redditi > self.esenzione[righe])
+        return np.where(dovuta, imposta, 0.0)
+
+    def cerca(self, testo, tipo=None, limite=20):
+        """Enti il cui nome contiene `testo` (senza distinzione di maiuscole): lista di (codice, etichetta)."""
+        trovati = np.flatnonzero(np.char.find(self._ricerca, testo.strip().lower()) >= 0)
+        if tipo is not None:
+            trovati = trovati[np.char.startswith(self.codici[trovati].astype(str), f"{tipo}:")]
+        return [(str(self.codici[i]), str(self.etichette[i])) for i in trovati[:limite]]
+
+    def comuni(self):
+        """(codici, etichette) dei comuni ordinati per nome, per un selettore con ricerca."""
+        comuni = np.flatnonzero(np.char.startswith(self.codici.astype(str), "C:"))
+        ordine = comuni[np.argsort(self.etichette[comuni], kind="stable")]
+        return [str(c) for c in self.codici[ordine]], self.etichette[ordine].tolist()
+
+    def posizioni_codici(self, tipo, codici):
+        """
+        Codici ISTAT normalizzati (array) → righe della tabella, −1 per i codici vuoti.
+        Il join si fa sui soli valori distinti e si riporta alle righe con un indice intero.
+        """
+        righe, distinti = pd.factorize(codici)
+        posizioni_distinti = np.full(len(distinti), -1)
+        pieni = distinti != ""
+        posizioni_distinti[pieni] = self.posizioni(f"{tipo}:" + distinti[pieni].astype(object))
+        return posizioni_distinti[righe]
+
+    def codici_regione(self, codici):
+        """
+        Codici regione normalizzati → codici della tabella, cercando il codice così com'è e
+        a tre cifre (21 → "021", provincia autonoma). Restituisce (codici, da_comune): il
+        codice "04" di Trentino-Alto Adige, se la tabella non lo contiene, diventa "" e va
+        risolto con la provincia del comune (da_comune vero).
+        """
+        posizioni, distinti = pd.factorize(np.asarray(codici, dtype=object))
+        risolti = []
+        for codice in distinti:
+            candidati = (codice, codice.lstrip("0").zfill(3)) if codice else ()
+            risolti.append(next((c for c in candidati if f"R:{c}" in self._indice), codice))
+        risolti = np.array(risolti, dtype=object)
+        trentino = (risolti == CODICE_TRENTINO_ALTO_ADIGE) & (f"R:{CODICE_TRENTINO_ALTO_ADIGE}" not in self._indice)
+        risolti[trentino] = ""
+        return risolti[posizioni], trentino[posizioni]
+
+    def posizioni_regioni(self, posizioni_comuni):
+        """Righe della regione di ciascun comune (−1 dove il comune manca)."""
+        regioni = np.where(posizioni_comuni >= 0, self._posizione_regione[np.maximum(posizioni_comuni, 0)], -1)
+        senza = (posizioni_comuni >= 0) & (regioni < 0)
+        if senza.any():
+            raise KeyError(f"Regione non disponibile per {self.codici[posizioni_comuni[senza][0]]} (anno {self.anno})")
+        return regioni
+
+
+@lru_cache(maxsize=None)
+def tabella_addizionali(anno=ANNO_DEFAULT):
+    """
+    Tabella compilata per `anno`: per ogni ente la riga più recente non successiva all'anno
+    o, in mancanza, la prima disponibile.
+    """
+    dati = leggi_dati()
+    distanza = pd.Series(
+        np.where(dati["anno"] <= anno, anno - dati["anno"], 10_000 + dati["anno"] - anno), index=dati.index
+    )
+    scelte = distanza.groupby([dati["tipo"], dati["codice"]]).idxmin()
+    return TabellaAddizionali(dati.loc[scelte.to_numpy()], anno)
+
+
+def aliquote_effettive(reddito_imponibile_netto, codice_comune=None, codice_regione=None, anno=ANNO_DEFAULT):
+    """
+    Aliquote medie (%) delle addizionali regionale e comunale su un reddito: le percentuali
+    da passare come addizionali_reg / addizionali_com al calcolo. La regione, se non
+    indicata, è quella del comune.
+    """
+    reg, com = _aliquote_array(
+        np.array([reddito_imponibile_netto], dtype=np.float64),
+        normalizza_codici([codice_comune or ""], 6),
+        normalizza_codici([codice_regione or ""], 2),
+        anno,
+    )
+    return float(reg[0]), float(com[0])
+
+
+def _aliquote_array(redditi, comuni, regioni, anno):
+    tabella = tabella_addizionali(anno)
+    posizioni_comuni = tabella.posizioni_codici("C", comuni)
+    regioni, da_comune = tabella.codici_regione(regioni)
+    if (da_comune & (posizioni_comuni < 0)).any():
+        raise KeyError(
+            f"Regione {CODICE_TRENTINO_ALTO_ADIGE} (Trentino-Alto Adige): l'addizionale è delle province "
+            "autonome, indicare codice_comune oppure 021 (Bolzano) / 022 (Trento)"
+        )
+    # Regione esplicita, altrimenti quella del comune
+    posizioni_regioni = tabella.posizioni_codici("R", regioni)
+    posizioni_regioni = np.where(posizioni_regioni >= 0, posizioni_regioni, tabella.posizioni_regioni(posizioni_comuni))
+    con_comune = posizioni_comuni >= 0
+    con_regione = posizioni_regioni >= 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reg = np.where(redditi > 0, tabella.importi(posizioni_regioni, redditi) / redditi * 100.0, 0.0)
+        com = np.where(redditi > 0, tabella.importi(posizioni_comuni, redditi) / redditi * 100.0, 0.0)
+    return np.where(con_regione, reg, np.nan), np.where(con_comune, com, np.nan)
+
+
+@cronometra()
+def risolvi_addizionali_df(df, anno=ANNO_DEFAULT):
+    """
+    Sostituisce addizionali_reg / addizionali_com con le aliquote effettive delle tabelle per
+    le righe che hanno codice_comune e/o codice_regione (le altre restano invariate).
+    Le aliquote dipendono dal reddito imponibile netto, che non dipende dalle addizionali:
+    un primo calcolo vettoriale lo ricava, poi un solo join risolve tutti i codici.
+    """
+    from .batch import calcola_cococo_sportivo_batch
+
+    presenti = [c for c in COLONNE_CODICI if c in df]
+    if not presenti:
+        return df
+    n = len(df)
+    codici = {
+        c: normalizza_codici(df[c].to_numpy(), cifre) if c in df else np.full(n, "", dtype=object)
+        for c, cifre in zip(COLONNE_CODICI, (2, 6))
+    }
+    redditi = calcola_cococo_sportivo_batch(
+        df["compenso_lordo"].to_numpy(dtype=np.float64),
+        df["altra_previdenza"].to_numpy(dtype=bool) if "altra_previdenza" in df else False,
+        0.0,
+        0.0,
+        df["anno"].to_numpy(dtype=np.int64) if "anno" in df else anno,
+    )["reddito_imponibile_netto"]
+
+    anni = df["anno"].to_numpy(dtype=np.int64) if "anno" in df else np.full(n, anno)
+    reg = np.full(n, np.nan)
+    com = np.full(n, np.nan)
+    for a in np.unique(anni):
+        righe = anni == a
+        reg[righe], com[righe] = _aliquote_array(
+            redditi[righe], codici["codice_comune"][righe], codici["codice_regione"][righe], int(a)
+        )
+
+    risolto = df.copy()
+    for colonna, valori in (("addizionali_reg", reg), ("addizionali_com", com)):
+        precedenti = risolto[colonna].to_numpy(dtype=np.float64) if colonna in risolto else np.zeros(n)
+        risolto[colonna] = np.where(np.isnan(valori), precedenti, valori)
+    return risolto
@@ -0,0 +1,83 @@
+"""
+Collaboratori con più contratti: le franchigie di 15.000€ (fiscale) e 5.000€ (contributiva)
+valgono sul totale dei compensi da ASD/SSD della persona, non sul singolo contratto.
+
+Il calcolo si fa una volta per persona sul compenso complessivo (un solo group-by), poi
+franchigie, contributi e imposte vengono ripartiti tra i contratti in proporzione al compenso.
+"""
+import numpy as np
+import pandas as pd
+
+from .addizionali import COLONNE_CODICI
+from .batch import calcola_cococo_sportivo_df
+from .calcolo import ANNO_DEFAULT, COLONNE_RISULTATO
+
+# Colonne che sono aliquote della persona e non importi da ripartire
+COLONNE_NON_RIPARTITE = ("aliquota_ivs", "aliquota_aggiuntiva", "tax_rate")
+
+
+def raggruppa_contratti(contratti, chiave="codice_fiscale"):
+    """
+    Ingressi del calcolo per persona: (group-by dei contratti, DataFrame indicizzato per
+    `chiave` con numero_contratti, compenso_lordo sommato e le colonne facoltative).
+    """
+    if chiave not in contratti or "compenso_lordo" not in contratti:
+        raise ValueError(f"Colonne obbligatorie: {chiave}, compenso_lordo")
+    chiavi = contratti[chiave]
+    mancanti = chiavi.isna().to_numpy() | (chiavi.astype(str).str.strip() == "").to_numpy()
+    if mancanti.any():
+        righe = contratti.index[mancanti].tolist()
+        elenco = ", ".join(map(str, righe[:10])) + (" ..." if len(righe) > 10 else "")
+        raise ValueError(f"{chiave} mancante nelle righe {elenco}")
+
+    gruppi = contratti.groupby(chiave, sort=False)
+    aggregazioni = {
+        "numero_contratti": ("compenso_lordo", "size"),
+        "compenso_lordo": ("compenso_lordo", "sum"),
+    }
+    if "altra_previdenza" in contratti:
+        aggregazioni["altra_previdenza"] = ("altra_previdenza", "max")
+    for colonna in ("addizionali_reg", "addizionali_com", *COLONNE_CODICI):
+        if colonna in contratti:
+            aggregazioni[colonna] = (colonna, "first")
+    return gruppi, gruppi.agg(**aggregazioni)
+
+
+def aggrega_collaboratori(contratti, chiave="codice_fiscale", anno=ANNO_DEFAULT):
+    """
+    `contratti` ha una riga per contratto con le colonne `chiave` e compenso_lordo, più le
+    facoltative altra_previdenza (vera se lo è in almeno un contratto), addizionali_reg,
+    addizionali_com, codice_regione e codice_comune (si usa il primo valore della persona,
+    sono legate alla residenza).
+
+    Restituisce (per_contratto, per_persona):
+    - per_contratto: le colonne di `contratti` seguite dalla quota di ogni risultato;
+    - per_persona: una riga per `chiave` con numero_contratti e i risultati sul totale.
+    """
+    gruppi, persone = raggruppa_contratti(contratti, chiave)
+
+    risultati_persone = calcola_cococo_sportivo_df(persone, anno)
+    per_persona = pd.concat([persone[["numero_contratti"]], risultati_persone], axis=1)
+
+    # Posizione della persona per ogni contratto, nello stesso ordine di `persone`
+    indice_persona = gruppi.ngroup().to_numpy()
+    compenso_contratto = contratti["compenso_lordo"].to_numpy(dtype=np.float64)
+    compenso_persona = risultati_persone["compenso_lordo"].to_numpy()[indice_persona]
+    totale_persona = persone["compenso_lordo"].to_numpy(dtype=np.float64)[indice_persona]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quota = np.where(totale_persona > 0, compenso_contratto / totale_persona, 0.0)
+
+    ripartiti = {}
+    for colonna in COLONNE_RISULTATO:
+        valori = risultati_persone[colonna].to_numpy()[indice_persona]
+        ripartiti[colonna] = valori if colonna in COLONNE_NON_RIPARTITE else valori * quota
+    # Con totale positivo la quota di compenso è esattamente quella del contratto
+    ripartiti["compenso_lordo"] = np.where(compenso_persona > 0, compenso_contratto, 0.0)
+    ripartiti["quota_compenso"] = quota
+
+    extra = contratti[[c for c in contratti.columns if c not in COLONNE_RISULTATO]]
+    per_contratto = pd.concat(
+        [extra, pd.DataFrame(ripartiti, index=contratti.index)],
+        axis=1,
+    )
+    return per_contratto, per_persona
@@ -0,0 +1,408 @@
+"""
+Servizio HTTP JSON del simulatore per i gestionali paghe (solo libreria standard e NumPy).
+
+    python -m simulatore.api [--host 127.0.0.1] [--porta 8000] [--finestra-ms 1]
+
+Endpoint:
+    POST /calcola   un oggetto {"compenso_lordo", "altra_previdenza", "addizionali_reg",
+                    "addizionali_com", "anno"} oppure un array di oggetti
+    GET  /calcola   gli stessi campi nella query string (?compenso_lordo=18000&anno=2025)
+    POST /batch     colonne {"compenso_lordo": [...], ...}: risultati colonna per colonna
+    POST /irpef     {"reddito", "anno"} oppure un array di oggetti; GET /irpef?reddito=...
+    GET  /salute    stato del servizio e numero di micro-batch eseguiti
+
+Le richieste concorrenti a /calcola e /irpef vengono accodate e calcolate insieme con un
+solo passaggio vettoriale (micro-batch). Ogni risposta riuscita ha ETag e Cache-Control;
+una richiesta con If-None-Match uguale all'ETag riceve 304 senza corpo.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from .batch import calcola_cococo_sportivo_batch, calcola_irpef_batch
+from .calcolo import ANNI_DISPONIBILI, ANNO_DEFAULT, COLONNE_RISULTATO, REGOLE
+from .cli import _booleano, _numero
+
+MAX_CORPO = 16 * 1024 * 1024  # byte
+CACHE_CONTROL = "public, max-age=3600"  # le regole cambiano solo al riavvio
+MOTIVI = {
+    200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+registro = logging.getLogger(__name__)
+
+
+class RichiestaNonValida(ValueError):
+    """Errore dei dati in ingresso: diventa una risposta 400."""
+
+
+# =====================================================================
+# CONVERSIONE DEGLI INGRESSI
+# =====================================================================
+def _anno(valore):
+    try:
+        anno = ANNO_DEFAULT if valore in (None, "") else int(_numero(valore))
+    except (TypeError, ValueError, OverflowError):
+        raise RichiestaNonValida(f"Anno d'imposta non valido: {valore!r}") from None
+    if anno not in REGOLE:
+        raise RichiestaNonValida(f"Anno d'imposta non configurato: {anno} (disponibili: {list(ANNI_DISPONIBILI)})")
+    return anno
+
+
+def _controlla_finiti(colonne):
+    """Gli importi "nan"/"inf" darebbero risultati NaN (JSON non valido): si rifiutano prima del calcolo."""
+    for nome, valori in colonne.items():
+        if valori.dtype.kind == "f" and not np.isfinite(valori).all():
+            raise RichiestaNonValida(f"{nome}: sono ammessi solo numeri finiti")
+    return colonne
+
+
+def colonne_calcolo(oggetti):
+    """Elenco di oggetti JSON → colonne NumPy per calcola_cococo_sportivo_batch."""
+    try:
+        if any("compenso_lordo" not in o for o in oggetti):
+            raise RichiestaNonValida("Campo obbligatorio mancante: compenso_lordo")
+        return _controlla_finiti({
+            "compenso_lordo": np.array([_numero(o["compenso_lordo"]) for o in oggetti], dtype=np.float64),
+            "altra_previdenza": np.array([_booleano(o.get("altra_previdenza")) for o in oggetti], dtype=bool),
+            "addizionali_reg": np.array([_numero(o.get("addizionali_reg")) for o in oggetti], dtype=np.float64),
+            "addizionali_com": np.array([_numero(o.get("addizionali_com")) for o in oggetti], dtype=np.float64),
+            "anno": np.array([_anno(o.get("anno")) for o in oggetti], dtype=np.int64),
+        })
+    except (TypeError, ValueError, OverflowError, AttributeError) as errore:
+        raise RichiestaNonValida(str(errore)) from None
+
+
+def _colonna_batch(valori, converti, dtype, tipi_diretti):
+    """
+    Valore singolo o lista JSON di /batch → array NumPy con le stesse regole di /calcola:
+    le liste con tipi già adatti (`tipi_diretti`, es. "biuf") si convertono in blocco,
+    le altre applicando `converti` una volta per valore distinto.
+    """
+    if not isinstance(valori, list):
+        return np.asarray(converti(valori), dtype=dtype)
+    blocco = np.asarray(valori) if valori else np.array([], dtype=dtype)
+    if blocco.ndim == 1 and blocco.dtype.kind in tipi_diretti:
+        return blocco.astype(dtype)
+    posizioni = {}
+    indici = np.fromiter((posizioni.setdefault(v, len(posizioni)) for v in valori), dtype=np.int64, count=len(valori))
+    return np.array([converti(v) for v in posizioni], dtype=dtype)[indici]
+
+
+def colonne_irpef(oggetti):
+    """Elenco di oggetti JSON → colonne NumPy per calcola_irpef_batch."""
+    try:
+        if any("reddito" not in o for o in oggetti):
+            raise RichiestaNonValida("Campo obbligatorio mancante: reddito")
+        return _controlla_finiti({
+            "reddito_imponibile": np.array([_numero(o["reddito"]) for o in oggetti], dtype=np.float64),
+            "anno": np.array([_anno(o.get("anno")) for o in oggetti], dtype=np.int64),
+        })
+    except (TypeError, ValueError, OverflowError, AttributeError) as errore:
+        raise RichiestaNonValida(str(errore)) from None
+
+
+def _irpef(reddito_imponibile, anno):
+    return {"irpef": calcola_irpef_batch(reddito_imponibile, anno)}
+
+
+# =====================================================================
+# MICRO-BATCH
+# =====================================================================
+class Accorpatore:
+    """
+    Coda delle richieste piccole: il primo elemento apre una finestra di `finestra` secondi,
+    poi tutto ciò che è in coda (fino a `max_righe`) viene calcolato con una sola chiamata
+    vettoriale e i risultati vengono ridistribuiti alle singole richieste.
+    """
+
+    def __init__(self, funzione, finestra=0.001, max_righe=50_000):
+        self.funzione = funzione
+        self.finestra = finestra
+        self.max_righe = max_righe
+        self.lotti = 0
+        self.richieste = 0
+        self._coda = None
+        self._lavoratore = None
+
+    def avvia(self):
+        self._coda = asyncio.Queue()
+        self._lavoratore = asyncio.create_task(self._ciclo())
+
+    async def ferma(self):
+        if self._lavoratore is not None:
+            self._lavoratore.cancel()
+            try:
+                await self._lavoratore
+            except asyncio.CancelledError:
+                pass
+
+    async def calcola(self, colonne):
+        futuro = asyncio.get_running_loop().create_future()
+        self._coda.put_nowait((colonne, futuro))
+        return await futuro
+
+    async def _ciclo(self):
+        while True:
+            lotto = [await self._coda.get()]
+            if self.finestra > 0:
+                await asyncio.sleep(self.finestra)
+            righe = len(next(iter(lotto[0][0].values())))
+            while righe < self.max_righe and not self._coda.empty():
+                elemento = self._coda.get_nowait()
+                lotto.append(elemento)
+                righe += len(next(iter(elemento[0].values())))
+            self._esegui(lotto)
+
+    def _esegui(self, lotto):
+        self.lotti += 1
+        self.richieste += len(lotto)
+        lunghezze = [len(next(iter(colonne.values()))) for colonne, _ in lotto]
+        try:
+            unite = {k: np.concatenate([colonne[k] for colonne, _ in lotto]) for k in lotto[0][0]}
+            risultati = self.funzione(**unite)
+        except Exception:
+            # Un errore imprevisto non deve ricadere sulle altre richieste del lotto
+            for colonne, futuro in lotto:
+                if futuro.cancelled():
+                    continue
+                try:
+                    futuro.set_result(self.funzione(**colonne))
+                except Exception as errore:
+                    futuro.set_exception(errore)
+            return
+        inizio = 0
+        for (_, futuro), n in zip(lotto, lunghezze):
+            if not futuro.cancelled():
+                futuro.set_result({k: v[inizio:inizio + n] for k, v in risultati.items()})
+            inizio += n
+
+
+# =====================================================================
+# SERVIZIO HTTP
+# =====================================================================
+def _oggetti(dati):
+    """Un oggetto o un array di oggetti → (elenco di oggetti, era un singolo oggetto)."""
+    if isinstance(dati, dict):
+        return [dati], True
+    if isinstance(dati, list) and all(isinstance(o, dict) for o in dati):
+        return dati, False
+    raise RichiestaNonValida("Atteso un oggetto JSON o un array di oggetti")
+
+
+def _righe(risultati, colonne):
+    """Colonne di risultati → elenco di dizionari, uno per riga."""
+    liste = [risultati[c].tolist() for c in colonne]
+    return [dict(zip(colonne, valori)) for valori in zip(*liste)]
+
+
+class ServizioApi:
+    """Instradamento degli endpoint e gestione delle connessioni HTTP/1.1 (keep-alive)."""
+
+    def __init__(self, finestra=0.001, max_righe=50_000):
+        self.calcolo = Accorpatore(calcola_cococo_sportivo_batch, finestra, max_righe)
+        self.irpef = Accorpatore(_irpef, finestra, max_righe)
+
+    async def avvia(self, host="127.0.0.1", porta=8000):
+        self.calcolo.avvia()
+        self.irpef.avvia()
+        return await asyncio.start_server(self.gestisci_connessione, host, porta, limit=64 * 1024)
+
+    async def ferma(self):
+        await self.calcolo.ferma()
+        await self.irpef.ferma()
+
+    # ----- endpoint -----
+    async def _calcola(self, dati):
+        oggetti, singolo = _oggetti(dati)
+        if not oggetti:
+            return []
+        risultati = await self.calcolo.calcola(colonne_calcolo(oggetti))
+        righe = _righe(risultati, COLONNE_RISULTATO)
+        return righe[0] if singolo else righe
+
+    async def _batch(self, dati):
+        if not isinstance(dati, dict) or "compenso_lordo" not in dati:
+            raise RichiestaNonValida('Atteso un oggetto di colonne con almeno "compenso_lordo": [...]')
+        if not isinstance(dati["compenso_lordo"], list):
+            raise RichiestaNonValida('"compenso_lordo" deve essere un array')
+        try:
+            colonne = _controlla_finiti({
+                "compenso_lordo": _colonna_batch(dati["compenso_lordo"], _numero, np.float64, "biuf"),
+                "altra_previdenza": _colonna_batch(dati.get("altra_previdenza", False), _booleano, bool, "b"),
+                "addizionali_reg": _colonna_batch(dati.get("addizionali_reg", 0.0), _numero, np.float64, "biuf"),
+                "addizionali_com": _colonna_batch(dati.get("addizionali_com", 0.0), _numero, np.float64, "biuf"),
+                "anno": _colonna_batch(dati.get("anno", ANNO_DEFAULT), _anno, np.int64, ""),
+            })
+        except (TypeError, ValueError, OverflowError, AttributeError) as errore:
+            raise RichiestaNonValida(str(errore)) from None
+        argomenti = tuple(colonne.values())
+        n = argomenti[0].shape[0]
+        if any(a.ndim > 1 or (a.ndim == 1 and a.shape[0] != n) for a in argomenti):
+            raise RichiestaNonValida("Le colonne devono essere array della stessa lunghezza (o valori singoli)")
+        # Un elenco grande non blocca le altre connessioni: si calcola in un thread
+        risultati = await asyncio.get_running_loop().run_in_executor(None, calcola_cococo_sportivo_batch, *argomenti)
+        return {colonna: risultati[colonna].tolist() for colonna in COLONNE_RISULTATO}
+
+    async def _irpef_endpoint(self, dati):
+        oggetti, singolo = _oggetti(dati)
+        if not oggetti:
+            return []
+        colonne = colonne_irpef(oggetti)
+        risultati = await self.irpef.calcola(colonne)
+        righe = [
+            {"reddito": r, "anno": a, "irpef": i}
+            for r, a, i in zip(colonne["reddito_imponibile"].tolist(), colonne["anno"].tolist(), risultati["irpef"].tolist())
+        ]
+        return righe[0] if singolo else righe
+
+    def _salute(self, _dati):
+        return {
+            "stato": "ok",
+            "anni": list(ANNI_DISPONIBILI),
+            "anno_default": ANNO_DEFAULT,
+            "richieste_accorpate": self.calcolo.richieste + self.irpef.richieste,
+            "lotti": self.calcolo.lotti + self.irpef.lotti,
+        }
+
+    async def instrada(self, metodo, destinazione, corpo):
+        """Restituisce (stato HTTP, oggetto JSON della risposta)."""
+        url = urlsplit(destinazione)
+        endpoint = {
+            "/calcola": self._calcola,
+            "/batch": self._batch,
+            "/irpef": self._irpef_endpoint,
+            "/salute": self._salute,
+        }.get(url.path.rstrip("/") or "/")
+        if endpoint is None:
+            return 404, {"errore": f"Endpoint sconosciuto: {url.path}"}
+        if metodo == "GET":
+            if url.path.startswith("/batch"):
+                return 405, {"errore": "/batch accetta solo POST"}
+            dati = dict(parse_qsl(url.query))
+        elif metodo == "POST":
+            try:
+                dati = json.loads(corpo or b"null")
+            except (UnicodeDecodeError, json.JSONDecodeError) as errore:
+                return 400, {"errore": f"JSON non valido: {errore}"}
+        else:
+            return 405, {"errore": f"Metodo non supportato: {metodo}"}
+        try:
+            risultato = endpoint(dati)
+            if asyncio.iscoroutine(risultato):
+                risultato = await risultato
+        except (RichiestaNonValida, OverflowError) as errore:
+            return 400, {"errore": str(errore)}
+        except Exception:
+            # Meglio una risposta 500 che una connessione chiusa senza risposta
+            registro.exception("Errore interno su %s %s", metodo, destinazione)
+            return 500, {"errore": "Errore interno del servizio"}
+        return 200, risultato
+
+    @staticmethod
+    def risposta(stato, payload, se_diverso=None, chiudi=False):
+        """Byte della risposta HTTP; ETag sul corpo e 304 se coincide con If-None-Match."""
+        try:
+            corpo = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+        except ValueError:
+            # NaN e Infinity non sono JSON: meglio un 500 registrato che una risposta illeggibile
+            registro.exception("Risposta con valori non finiti")
+            stato, corpo = 500, b'{"errore":"Errore interno del servizio"}'
+        intestazioni = [
+            "Content-Type: application/json; charset=utf-8",
+            f"Connection: {'close' if chiudi else 'keep-alive'}",
+        ]
+        if stato == 200:
+            etag = f'"{hashlib.blake2b(corpo, digest_size=16).hexdigest()}"'
+            intestazioni += [f"ETag: {etag}", f"Cache-Control: {CACHE_CONTROL}"]
+            if se_diverso is not None and etag in (t.strip() for t in se_diverso.split(",")):
+                stato, corpo = 304, b""
+        else:
+            intestazioni.append("Cache-Control: no-store")
+        intestazioni.append(f"Content-Length: {len(corpo)}")
+        testa = f"HTTP/1.1 {stato} {MOTIVI[stato]}\r\n" + "\r\n".join(intestazioni) + "\r\n\r\n"
+        return testa.encode("latin-1") + corpo
+
+    async def gestisci_connessione(self, lettore, scrittore):
+        try:
+            while True:
+                try:
+                    testa = await lettore.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    scrittore.write(self.risposta(431, {"errore": "Intestazioni troppo grandi"}, chiudi=True))
+                    break
+                righe = testa.decode("latin-1").split("\r\n")
+                try:
+                    metodo, destinazione, versione = righe[0].split(" ", 2)
+                except ValueError:
+                    scrittore.write(self.risposta(400, {"errore": "Riga di richiesta non valida"}, chiudi=True))
+                    break
+                intestazioni = {}
+                for riga in righe[1:]:
+                    nome, _, valore = riga.partition(":")
+                    if nome:
+                        intestazioni[nome.strip().lower()] = valore.strip()
+
+                connessione = intestazioni.get("connection", "").lower()
+                chiudi = connessione == "close" or (versione == "HTTP/1.0" and connessione != "keep-alive")
+                if "transfer-encoding" in intestazioni:
+                    scrittore.write(self.risposta(411, {"errore": "Serve Content-Length"}, chiudi=True))
+                    break
+                try:
+                    lunghezza = int(intestazioni.get("content-length") or 0)
+                except ValueError:
+                    lunghezza = -1
+                if not 0 <= lunghezza <= MAX_CORPO:
+                    scrittore.write(self.risposta(413, {"errore": f"Corpo oltre {MAX_CORPO} byte"}, chiudi=True))
+                    break
+                corpo = await lettore.readexactly(lunghezza) if lunghezza else b""
+
+                stato, payload = await self.instrada(metodo, destinazione, corpo)
+                scrittore.write(self.risposta(stato, payload, intestazioni.get("if-none-match"), chiudi))
+                await scrittore.drain()
+                if chiudi:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            scrittore.close()
+
+
+async def servi(host="127.0.0.1", porta=8000, finestra=0.001):
+    servizio = ServizioApi(finestra)
+    server = await servizio.avvia(host, porta)
+    print(f"Simulatore API su http://{host}:{porta} (micro-batch {finestra * 1000:g} ms)", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await servizio.ferma()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m simulatore.api",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8000)
+    parser.add_argument("--finestra-ms", type=float, default=1.0, help="attesa per accorpare le richieste (ms)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(servi(args.host, args.porta, args.finestra_ms / 1000.0))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,371 @@
+"""
+Archivio persistente dei risultati per elenco collaboratori, con ricalcolo incrementale.
+
+    python -m simulatore.archivio --archivio ./archivio carica elenco.csv [--anno 2025]
+    python -m simulatore.archivio --archivio ./archivio elenco
+    python -m simulatore.archivio --archivio ./archivio confronta 1 2 [--uscita differenze.csv]
+
+Ogni persona (righe con lo stesso codice_fiscale sommate come in simulatore.aggregazione)
+ha un'impronta a 64 bit di codice, ingressi del calcolo, regole dell'anno e tabelle delle
+addizionali. A ogni caricamento si calcolano solo le impronte che l'archivio non conosce;
+le altre si leggono dai segmenti già scritti. La cartella contiene:
+
+    catalogo.json               segmenti e caricamenti (data, nome, anno, righe, calcolate)
+    segmenti/000001/*.npy       risultati calcolati in un caricamento, una colonna per file
+    caricamenti/000001/*.npy    composizione dell'elenco: chiave, impronta, segmento, riga
+
+Le colonne sono file .npy aperti in memory map: un elenco di 100.000 persone quasi
+invariato legge dal disco solo le pagine delle righe richieste. I caricamenti precedenti
+restano disponibili per i confronti tra mesi o anni. L'archivio assume un solo processo
+scrittore; i file di un segmento o di un caricamento sono resi visibili con un rename e il
+catalogo è riscritto per ultimo, quindi un'interruzione non lascia riferimenti a dati parziali;
+le cartelle che il catalogo non conosce si rimuovono alla riapertura.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .addizionali import COLONNE_CODICI, impronta_dati, normalizza_codici
+from .aggregazione import raggruppa_contratti
+from .batch import calcola_cococo_sportivo_df
+from .calcolo import ANNI_DISPONIBILI, ANNO_DEFAULT, COLONNE_RISULTATO, REGOLE
+from .file_paghe import leggi_elenco
+
+VERSIONE_CALCOLO = 1  # da aumentare quando cambia il motore: invalida tutte le impronte
+NOME_CATALOGO = "catalogo.json"
+COLONNE_INGRESSO = ("compenso_lordo", "altra_previdenza", "addizionali_reg", "addizionali_com", *COLONNE_CODICI)
+
+
+@lru_cache(maxsize=None)
+def impronta_regole(anno):
+    """Impronta a 64 bit di regole dell'anno, tabelle delle addizionali e versione del calcolo."""
+    regole = REGOLE[anno]
+    dati = [
+        VERSIONE_CALCOLO,
+        anno,
+        [getattr(regole, campo) for campo in regole.__slots__ if campo != "scaglioni_irpef"],
+        [regole.scaglioni_irpef.soglie, regole.scaglioni_irpef.aliquote],
+        impronta_dati(),
+    ]
+    digest = hashlib.sha256(json.dumps(dati, default=str).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def ingressi_normalizzati(persone):
+    """Colonne di COLONNE_INGRESSO con tipi e valori di default fissi, per impronte stabili."""
+    n = len(persone)
+    return pd.DataFrame({
+        "compenso_lordo": persone["compenso_lordo"].to_numpy(dtype=np.float64),
+        "altra_previdenza": (
+            persone["altra_previdenza"].to_numpy(dtype=bool) if "altra_previdenza" in persone else np.zeros(n, dtype=bool)
+        ),
+        "addizionali_reg": persone["addizionali_reg"].to_numpy(dtype=np.float64) if "addizionali_reg" in persone else np.zeros(n),
+        "addizionali_com": persone["addizionali_com"].to_numpy(dtype=np.float64) if "addizionali_com" in persone else np.zeros(n),
+        "codice_regione": (
+            normalizza_codici(persone["codice_regione"].to_numpy(), 2) if "codice_regione" in persone
+            else np.full(n, "", dtype=object)
+        ),
+        "codice_comune": (
+            normalizza_codici(persone["codice_comune"].to_numpy(), 6) if "codice_comune" in persone
+            else np.full(n, "", dtype=object)
+        ),
+    }, index=persone.index, columns=list(COLONNE_INGRESSO))
+
+
+def impronte(chiavi, ingressi, anno):
+    """Impronta uint64 per persona: codice, ingressi normalizzati e impronta delle regole."""
+    dati = ingressi.reset_index(drop=True)
+    dati.insert(0, "chiave", np.asarray(chiavi, dtype=object).astype(str))
+    return pd.util.hash_pandas_object(dati, index=False).to_numpy() ^ np.uint64(impronta_regole(anno))
+
+
+def _scrivi_colonne(cartella, colonne):
+    """Scrive le colonne come .npy in una cartella temporanea e la rende visibile con un rename."""
+    temporanea = cartella.with_name(f".{cartella.name}.{os.getpid()}.tmp")
+    shutil.rmtree(temporanea, ignore_errors=True)
+    temporanea.mkdir(parents=True)
+    for nome, valori in colonne.items():
+        np.save(temporanea / f"{nome}.npy", valori, allow_pickle=False)
+    os.replace(temporanea, cartella)
+
+
+def _leggi_colonne(cartella):
+    return {file.stem: np.load(file, mmap_mode="r", allow_pickle=False) for file in sorted(cartella.glob("*.npy"))}
+
+
+class ArchivioRisultati:
+    """
+    Archivio in una cartella: segmenti di risultati e caricamenti, letti in memory map.
+    L'indice impronta → (segmento, riga) è costruito alla prima ricerca e aggiornato
+    quando si aggiungono segmenti.
+    """
+
+    __slots__ = ("cartella", "catalogo", "_segmenti", "_indice", "_segmento_indice", "_riga_indice")
+
+    def __init__(self, cartella):
+        self.cartella = Path(cartella)
+        self.cartella.mkdir(parents=True, exist_ok=True)
+        percorso = self.cartella / NOME_CATALOGO
+        if percorso.exists():
+            self.catalogo = json.loads(percorso.read_text(encoding="utf-8"))
+        else:
+            self.catalogo = {"versione": 1, "segmenti": [], "caricamenti": []}
+        self._rimuovi_orfani()
+        self._segmenti = {}
+        self._indice = None
+        self._segmento_indice = None
+        self._riga_indice = None
+
+    def __repr__(self):
+        return (
+            f"ArchivioRisultati({str(self.cartella)!r}, segmenti={len(self.catalogo['segmenti'])}, "
+            f"caricamenti={len(self.catalogo['caricamenti'])})"
+        )
+
+    # ----- lettura -----
+    def segmento(self, numero):
+        """Colonne del segmento `numero` (memory map, aperte una sola volta)."""
+        if numero not in self._segmenti:
+            self._segmenti[numero] = _leggi_colonne(self.cartella / "segmenti" / f"{numero:06d}")
+        return self._segmenti[numero]
+
+    def _indice_impronte(self):
+        if self._indice is None:
+            numeri = [voce["id"] for voce in self.catalogo["segmenti"]]
+            impronte_segmenti = [np.asarray(self.segmento(n)["impronta"]) for n in numeri]
+            lunghezze = [v.size for v in impronte_segmenti]
+            self._indice = pd.Index(np.concatenate([np.array([], dtype=np.uint64), *impronte_segmenti]))
+            self._segmento_indice = np.repeat(np.array(numeri, dtype=np.int32), lunghezze)
+            self._riga_indice = np.concatenate([np.array([], dtype=np.int64), *(np.arange(n) for n in lunghezze)])
+        return self._indice
+
+    def cerca(self, impronte_cercate):
+        """(segmento, riga) di ogni impronta; segmento 0 dove l'archivio non la conosce."""
+        posizioni = self._indice_impronte().get_indexer(impronte_cercate)
+        trovate = posizioni >= 0
+        segmenti = np.zeros(posizioni.size, dtype=np.int32)
+        righe = np.zeros(posizioni.size, dtype=np.int64)
+        segmenti[trovate] = self._segmento_indice[posizioni[trovate]]
+        righe[trovate] = self._riga_indice[posizioni[trovate]]
+        return segmenti, righe
+
+    def raccogli(self, segmenti, righe, colonne=("chiave", "anno", *COLONNE_RISULTATO)):
+        """Valori di `colonne` per le coppie (segmento, riga), letti segmento per segmento."""
+        uscita = {}
+        for numero in np.unique(segmenti):
+            selezione = np.flatnonzero(segmenti == numero)
+            dati = self.segmento(int(numero))
+            ordine = np.argsort(righe[selezione], kind="stable")
+            # Righe in ordine crescente: la memory map legge le pagine in sequenza
+            righe_ordinate = righe[selezione][ordine]
+            for colonna in colonne:
+                valori = np.asarray(dati[colonna][righe_ordinate])
+                if colonna not in uscita:
+                    uscita[colonna] = np.empty(segmenti.size, dtype=valori.dtype if valori.dtype.kind != "U" else object)
+                uscita[colonna][selezione[ordine]] = valori
+        return uscita
+
+    def caricamento(self, numero=None):
+        """Metadati del caricamento `numero` (default: l'ultimo)."""
+        caricamenti = self.catalogo["caricamenti"]
+        if not caricamenti:
+            raise KeyError("Archivio senza caricamenti")
+        if numero is None:
+            return caricamenti[-1]
+        for voce in caricamenti:
+            if voce["id"] == numero:
+                return voce
+        raise KeyError(f"Caricamento non trovato: {numero}")
+
+    def risultati(self, numero=None):
+        """Risultati del caricamento `numero` (default: l'ultimo), indicizzati per chiave."""
+        voce = self.caricamento(numero)
+        composizione = _leggi_colonne(self.cartella / "caricamenti" / f"{voce['id']:06d}")
+        segmenti = np.asarray(composizione["segmento"])
+        righe = np.asarray(composizione["riga"])
+        valori = self.raccogli(segmenti, righe, COLONNE_RISULTATO) if segmenti.size else {c: [] for c in COLONNE_RISULTATO}
+        indice = pd.Index(np.asarray(composizione["chiave"]).astype(object), name=voce.get("chiave", "chiave"))
+        return pd.DataFrame(valori, index=indice, columns=list(COLONNE_RISULTATO))
+
+    def storico(self, chiave):
+        """Una riga per caricamento in cui compare `chiave`: id, data, anno e risultati."""
+        righe = []
+        for voce in self.catalogo["caricamenti"]:
+            composizione = _leggi_colonne(self.cartella / "caricamenti" / f"{voce['id']:06d}")
+            trovate = np.flatnonzero(np.asarray(composizione["chiave"]) == str(chiave))
+            if trovate.size:
+                valori = self.raccogli(
+                    np.asarray(composizione["segmento"][trovate]), np.asarray(composizione["riga"][trovate]),
+                    COLONNE_RISULTATO,
+                )
+                righe.append({"caricamento": voce["id"], "data": voce["data"], "anno": voce["anno"],
+                              **{c: v[0] for c, v in valori.items()}})
+        return pd.DataFrame(righe, columns=["caricamento", "data", "anno", *COLONNE_RISULTATO])
+
+    def confronta(self, precedente, successivo, colonne=("compenso_lordo", "netto_lavoratore", "costo_totale_societa")):
+        """
+        Confronto tra due caricamenti per chiave (outer join): per ogni colonna il valore nei
+        due caricamenti e la differenza; `stato` è nuovo, uscito, variato o invariato.
+        """
+        prima = self.risultati(precedente)[list(colonne)]
+        dopo = self.risultati(successivo)[list(colonne)]
+        unione = prima.join(dopo, how="outer", lsuffix="_prima", rsuffix="_dopo")
+        for colonna in colonne:
+            unione[f"{colonna}_differenza"] = unione[f"{colonna}_dopo"] - unione[f"{colonna}_prima"]
+        assenti_prima = ~unione.index.isin(prima.index)
+        assenti_dopo = ~unione.index.isin(dopo.index)
+        variati = np.zeros(len(unione), dtype=bool)
+        for colonna in colonne:
+            variati |= unione[f"{colonna}_differenza"].abs().to_numpy() > 0.005
+        unione["stato"] = np.select(
+            [assenti_prima, assenti_dopo, variati], ["nuovo", "uscito", "variato"], default="invariato"
+        )
+        return unione
+
+    # ----- scrittura -----
+    def _rimuovi_orfani(self):
+        """
+        Cartelle lasciate da un caricamento interrotto prima della scrittura del catalogo:
+        temporanee e segmenti/caricamenti che il catalogo non conosce.
+        """
+        for temporaneo in self.cartella.glob(f".{NOME_CATALOGO}.*.tmp"):
+            temporaneo.unlink(missing_ok=True)
+        for elenco in ("segmenti", "caricamenti"):
+            noti = {f"{voce['id']:06d}" for voce in self.catalogo[elenco]}
+            for cartella in (self.cartella / elenco).glob("*"):
+                if cartella.is_dir() and cartella.name not in noti:
+                    shutil.rmtree(cartella)
+
+    def _prossimo(self, elenco):
+        # Anche le cartelle già presenti: un id non si riusa mai, nemmeno dopo un errore
+        esistenti = (int(c.name) for c in (self.cartella / elenco).glob("*") if c.name.isdigit())
+        return max(max((voce["id"] for voce in self.catalogo[elenco]), default=0), max(esistenti, default=0)) + 1
+
+    def _salva_catalogo(self):
+        percorso = self.cartella / NOME_CATALOGO
+        temporaneo = percorso.with_name(f".{NOME_CATALOGO}.{os.getpid()}.tmp")
+        temporaneo.write_text(json.dumps(self.catalogo, indent=1), encoding="utf-8")
+        os.replace(temporaneo, percorso)
+
+    def carica(self, contratti, anno=ANNO_DEFAULT, nome="", chiave="codice_fiscale"):
+        """
+        Registra un elenco (una riga per contratto, più contratti della stessa persona sommati):
+        calcola e salva in un nuovo segmento solo le persone con impronta sconosciuta.
+        Restituisce (risultati per chiave, metadati del caricamento).
+        """
+        if anno not in ANNI_DISPONIBILI:
+            raise KeyError(f"Anno d'imposta non configurato: {anno}")
+        _, persone = raggruppa_contratti(contratti, chiave)
+        chiavi = persone.index.to_numpy(dtype=object).astype(str)
+        ingressi = ingressi_normalizzati(persone)
+        impronte_persone = impronte(chiavi, ingressi, anno)
+        segmenti, righe = self.cerca(impronte_persone)
+
+        # Impronte a 64 bit: si verifica comunque che la chiave archiviata sia la stessa
+        trovate = np.flatnonzero(segmenti > 0)
+        if trovate.size:
+            archiviate = self.raccogli(segmenti[trovate], righe[trovate], ("chiave",))["chiave"]
+            if (archiviate.astype(str) != chiavi[trovate]).any():
+                raise ValueError("Collisione di impronte nell'archivio: ricostruirlo in una cartella nuova")
+
+        nuove = np.flatnonzero(segmenti == 0)
+        if nuove.size:
+            da_calcolare = ingressi.iloc[nuove]
+            # Senza codici ISTAT si evita il passaggio per le tabelle delle addizionali
+            vuote = [c for c in COLONNE_CODICI if not (da_calcolare[c] != "").any()]
+            risultati = calcola_cococo_sportivo_df(da_calcolare.drop(columns=vuote), anno)
+            numero = self._prossimo("segmenti")
+            colonne = {
+                "chiave": chiavi[nuove].astype(str),
+                "impronta": impronte_persone[nuove],
+                "anno": np.full(nuove.size, anno, dtype=np.int64),
+                **{c: risultati[c].to_numpy(dtype=np.float64) for c in COLONNE_RISULTATO},
+            }
+            _scrivi_colonne(self.cartella / "segmenti" / f"{numero:06d}", colonne)
+            self.catalogo["segmenti"].append({"id": numero, "righe": int(nuove.size)})
+            segmenti[nuove] = numero
+            righe[nuove] = np.arange(nuove.size)
+            if self._indice is not None:
+                self._indice = self._indice.append(pd.Index(impronte_persone[nuove]))
+                self._segmento_indice = np.concatenate([self._segmento_indice, segmenti[nuove]])
+                self._riga_indice = np.concatenate([self._riga_indice, righe[nuove]])
+
+        numero = self._prossimo("caricamenti")
+        _scrivi_colonne(self.cartella / "caricamenti" / f"{numero:06d}", {
+            "chiave": chiavi,
+            "impronta": impronte_persone,
+            "segmento": segmenti,
+            "riga": righe,
+        })
+        voce = {
+            "id": numero,
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "nome": nome,
+            "anno": anno,
+            "chiave": chiave,
+            "righe": len(chiavi),
+            "calcolate": int(nuove.size),
+        }
+        self.catalogo["caricamenti"].append(voce)
+        self._salva_catalogo()
+        return self.risultati(numero), voce
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m simulatore.archivio",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--archivio", required=True, help="cartella dell'archivio (creata se manca)")
+    comandi = parser.add_subparsers(dest="comando", required=True)
+    carica = comandi.add_parser("carica", help="registra un elenco e calcola solo le righe nuove o cambiate")
+    carica.add_argument("elenco", help="file collaboratori CSV o Excel")
+    carica.add_argument("--anno", type=int, choices=ANNI_DISPONIBILI, default=ANNO_DEFAULT)
+    carica.add_argument("--chiave", default="codice_fiscale", help="colonna che identifica il collaboratore")
+    carica.add_argument("--uscita", help="CSV dei risultati per collaboratore")
+    comandi.add_parser("elenco", help="caricamenti registrati")
+    confronta = comandi.add_parser("confronta", help="differenze per collaboratore tra due caricamenti")
+    confronta.add_argument("precedente", type=int)
+    confronta.add_argument("successivo", type=int)
+    confronta.add_argument("--uscita", help="CSV del confronto")
+    args = parser.parse_args(argv)
+
+    try:
+        archivio = ArchivioRisultati(args.archivio)
+        if args.comando == "carica":
+            risultati, voce = archivio.carica(
+                leggi_elenco(args.elenco, args.chiave), args.anno, Path(args.elenco).name, args.chiave
+            )
+            if args.uscita:
+                risultati.round(2).to_csv(args.uscita)
+            print(
+                f"Caricamento {voce['id']}: {voce['righe']} collaboratori, "
+                f"{voce['calcolate']} calcolati, {voce['righe'] - voce['calcolate']} dall'archivio"
+            )
+        elif args.comando == "elenco":
+            for voce in archivio.catalogo["caricamenti"]:
+                print(f"{voce['id']:4d}  {voce['data']}  {voce['anno']}  {voce['righe']:8d} righe  "
+                      f"{voce['calcolate']:8d} calcolate  {voce['nome']}")
+        else:
+            confronto = archivio.confronta(args.precedente, args.successivo)
+            if args.uscita:
+                confronto.round(2).to_csv(args.uscita)
+            print(confronto["stato"].value_counts().to_string())
+    except (ValueError, KeyError, OSError) as errore:
+        print(f"Errore: {errore}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,193 @@
+"""
+Calcolo vettoriale (NumPy) su interi elenchi di collaboratori.
+
+Stesse espressioni del calcolo scalare in simulatore.calcolo, applicate colonna per colonna.
+"""
+import numpy as np
+
+from .calcolo import ANNI_DISPONIBILI, ANNO_DEFAULT, COLONNE_CODICI, COLONNE_RISULTATO, REGOLE
+from .strumentazione import cronometra
+
+# Parametri di tutti gli anni come array indicizzati per posizione dell'anno in ANNI_DISPONIBILI
+_ANNI = np.array(ANNI_DISPONIBILI)
+_PARAMETRI = {
+    campo: np.array([getattr(REGOLE[anno], campo) for anno in ANNI_DISPONIBILI])
+    for campo in (
+        "franchigia_fiscale",
+        "franchigia_contributiva",
+        "riduzione_base_contributiva",
+        "aliquota_ivs",
+        "aliquota_ivs_altra_previdenza",
+        "aliquota_aggiuntiva",
+        "quota_lavoratore_num",
+        "quota_lavoratore_den",
+        "quota_societa_num",
+        "quota_societa_den",
+    )
+}
+
+def _indice_anni(anno):
+    """Posizione di ogni anno in ANNI_DISPONIBILI; errore se un anno non è configurato."""
+    anni = np.asarray(anno, dtype=np.int64)
+    indice = np.clip(np.searchsorted(_ANNI, anni), 0, len(_ANNI) - 1)
+    mancanti = _ANNI[indice] != anni
+    if np.any(mancanti):
+        raise KeyError(f"Anno d'imposta non configurato: {np.unique(anni[mancanti]).tolist()}")
+    return indice
+
+def calcola_irpef_batch(reddito_imponibile, anno=ANNO_DEFAULT):
+    """Versione vettoriale di calcola_irpef; `anno` può essere anche un array (un anno per riga)."""
+    anni = np.asarray(anno)
+    if anni.ndim == 0:
+        return REGOLE[int(anni)].scaglioni_irpef.imposta_array(reddito_imponibile)
+    r, anni = np.broadcast_arrays(np.asarray(reddito_imponibile, dtype=np.float64), anni)
+    _indice_anni(anni)
+    irpef = np.empty(r.shape)
+    # Un passaggio vettoriale per ogni anno presente (pochi), non per riga
+    for a in np.unique(anni):
+        selezione = anni == a
+        irpef[selezione] = REGOLE[int(a)].scaglioni_irpef.imposta_array(r[selezione])
+    return irpef
+
+@cronometra()
+def calcola_cococo_sportivo_batch(compenso_lordo, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0,
+                                  anno=ANNO_DEFAULT):
+    """
+    Calcolo vettoriale di calcola_cococo_sportivo su interi elenchi di collaboratori.
+
+    Accetta array NumPy (o scalari, che vengono estesi per broadcasting) e restituisce
+    un dizionario {colonna: array} con le stesse chiavi del calcolo scalare.
+    I compensi nulli o negativi producono una riga a zero come nella versione scalare.
+    `anno` può essere un array: più anni d'imposta si confrontano in un solo passaggio.
+    """
+    compenso = np.asarray(compenso_lordo, dtype=np.float64)
+    altra_prev = np.asarray(altra_previdenza, dtype=bool)
+    add_reg = np.asarray(addizionali_reg, dtype=np.float64)
+    add_com = np.asarray(addizionali_com, dtype=np.float64)
+    anni = np.asarray(anno, dtype=np.int64)
+    if anni.ndim == 0:
+        regole = REGOLE[int(anni)]
+        p = {campo: getattr(regole, campo) for campo in _PARAMETRI}
+        compenso, altra_prev, add_reg, add_com = np.broadcast_arrays(compenso, altra_prev, add_reg, add_com)
+    else:
+        compenso, altra_prev, add_reg, add_com, anni = np.broadcast_arrays(compenso, altra_prev, add_reg, add_com, anni)
+        p = {campo: valori[_indice_anni(anni)] for campo, valori in _PARAMETRI.items()}
+
+    # Caso patologico: compenso nullo o negativo → tutto a zero
+    positivo = compenso > 0
+    compenso = np.where(positivo, compenso, 0.0)
+
+    # FRANCHIGIE
+    franchigia_fiscale = np.minimum(compenso, p["franchigia_fiscale"])
+    franchigia_contributiva = np.minimum(compenso, p["franchigia_contributiva"])
+
+    # BASE CONTRIBUTIVA
+    base_contrib_grezza = np.maximum(0.0, compenso - franchigia_contributiva)
+    base_contrib_ridotta = base_contrib_grezza * p["riduzione_base_contributiva"]  # Dimezzamento 50%
+
+    # ALIQUOTE INPS GESTIONE SEPARATA
+    aliquota_ivs = np.where(altra_prev, p["aliquota_ivs_altra_previdenza"], p["aliquota_ivs"])
+    aliquota_aggiuntiva = np.full(compenso.shape, p["aliquota_aggiuntiva"])
+
+    # CALCOLO CONTRIBUTI
+    contributi_ivs = base_contrib_ridotta * (aliquota_ivs / 100.0)
+    contributi_aggiuntivi = base_contrib_grezza * (aliquota_aggiuntiva / 100.0)
+    totale_contributi_inps = contributi_ivs + contributi_aggiuntivi
+
+    contributi_lavoratore = totale_contributi_inps * p["quota_lavoratore_num"] / p["quota_lavoratore_den"]
+    contributi_societa = totale_contributi_inps * p["quota_societa_num"] / p["quota_societa_den"]
+
+    # BASE FISCALE
+    reddito_imponibile = np.maximum(0.0, compenso - franchigia_fiscale)
+    reddito_imponibile_netto = np.maximum(0.0, reddito_imponibile - contributi_lavoratore)
+
+    # CALCOLO IMPOSTE
+    irpef = calcola_irpef_batch(reddito_imponibile_netto, anni)
+    addizionale_regionale = reddito_imponibile_netto * (add_reg / 100.0)
+    addizionale_comunale = reddito_imponibile_netto * (add_com / 100.0)
+    totale_imposte = irpef + addizionale_regionale + addizionale_comunale
+
+    # RISULTATI FINALI
+    totale_trattenute_lavoratore = contributi_lavoratore + totale_imposte
+    netto_lavoratore = compenso - totale_trattenute_lavoratore
+    costo_totale_societa = compenso + contributi_societa
+
+    # Tax rate effettivo (bloccato tra 0 e 100)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tax_rate_raw = totale_trattenute_lavoratore / compenso * 100.0
+    tax_rate = np.where(positivo, np.clip(tax_rate_raw, 0.0, 100.0), 0.0)
+
+    return {
+        "compenso_lordo": compenso,
+        "franchigia_fiscale": franchigia_fiscale,
+        "franchigia_contributiva": franchigia_contributiva,
+        "base_contrib_grezza": base_contrib_grezza,
+        "base_contrib_ridotta": base_contrib_ridotta,
+        "aliquota_ivs": aliquota_ivs,
+        "aliquota_aggiuntiva": aliquota_aggiuntiva,
+        "contributi_ivs": contributi_ivs,
+        "contributi_aggiuntivi": contributi_aggiuntivi,
+        "totale_contributi": totale_contributi_inps,
+        "contributi_lavoratore": contributi_lavoratore,
+        "contributi_societa": contributi_societa,
+        "reddito_imponibile": reddito_imponibile,
+        "reddito_imponibile_netto": reddito_imponibile_netto,
+        "irpef": irpef,
+        "addizionale_regionale": addizionale_regionale,
+        "addizionale_comunale": addizionale_comunale,
+        "totale_imposte": totale_imposte,
+        "totale_trattenute_lavoratore": totale_trattenute_lavoratore,
+        "netto_lavoratore": netto_lavoratore,
+        "costo_totale_societa": costo_totale_societa,
+        "tax_rate": tax_rate,
+    }
+
+@cronometra()
+def calcola_cococo_sportivo_df(df, anno=ANNO_DEFAULT):
+    """
+    Applica calcola_cococo_sportivo_batch a un DataFrame con le colonne
+    compenso_lordo, altra_previdenza, addizionali_reg e addizionali_com
+    (le ultime tre facoltative). Una colonna `anno`, se presente, prevale sul parametro.
+    Con codice_comune e/o codice_regione le addizionali vengono dalle tabelle a scaglioni
+    (simulatore.addizionali). Restituisce un DataFrame con lo stesso indice.
+    """
+    if any(colonna in df for colonna in COLONNE_CODICI):
+        # Import locale: le tabelle richiedono pandas, il calcolo vettoriale solo NumPy
+        from .addizionali import risolvi_addizionali_df
+
+        df = risolvi_addizionali_df(df, anno)
+    n = len(df)
+    risultati = calcola_cococo_sportivo_batch(
+        df["compenso_lordo"].to_numpy(dtype=np.float64),
+        df["altra_previdenza"].to_numpy(dtype=bool) if "altra_previdenza" in df else np.zeros(n, dtype=bool),
+        df["addizionali_reg"].to_numpy(dtype=np.float64) if "addizionali_reg" in df else np.zeros(n),
+        df["addizionali_com"].to_numpy(dtype=np.float64) if "addizionali_com" in df else np.zeros(n),
+        df["anno"].to_numpy(dtype=np.int64) if "anno" in df else anno,
+    )
+    import pandas as pd
+
+    return pd.DataFrame(risultati, index=df.index, columns=list(COLONNE_RISULTATO))
+
+def confronta_anni(df, anni=ANNI_DISPONIBILI):
+    """
+    Calcola ogni riga di `df` per tutti gli `anni` in un solo passaggio vettoriale
+    (broadcasting anni × righe). Restituisce un DataFrame lungo con la colonna `anno`
+    e l'indice originale ripetuto per ciascun anno.
+    """
+    import pandas as pd
+
+    n = len(df)
+    anni = np.asarray(anni, dtype=np.int64)
+    risultati = calcola_cococo_sportivo_batch(
+        df["compenso_lordo"].to_numpy(dtype=np.float64)[np.newaxis, :],
+        (df["altra_previdenza"].to_numpy(dtype=bool) if "altra_previdenza" in df else np.zeros(n, dtype=bool))[np.newaxis, :],
+        (df["addizionali_reg"].to_numpy(dtype=np.float64) if "addizionali_reg" in df else np.zeros(n))[np.newaxis, :],
+        (df["addizionali_com"].to_numpy(dtype=np.float64) if "addizionali_com" in df else np.zeros(n))[np.newaxis, :],
+        anni[:, np.newaxis],
+    )
+    confronto = pd.DataFrame(
+        {colonna: risultati[colonna].ravel() for colonna in COLONNE_RISULTATO},
+        index=np.tile(df.index.to_numpy(), len(anni)),
+    )
+    confronto.insert(0, "anno", np.repeat(anni, n))
+    return confronto
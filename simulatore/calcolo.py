@@ -0,0 +1,172 @@
+"""
+Motore di calcolo del simulatore Co.Co.Co lavoratori sportivi.
+
+Funzioni pure, senza dipendenze da Streamlit né da NumPy: importabili da script,
+job batch e dalla riga di comando con un avvio di pochi millisecondi.
+"""
+from .regole import ANNI_DISPONIBILI, ANNO_DEFAULT, REGOLE, RegoleAnno, ScaglioniIrpef
+from .strumentazione import cronometra
+
+# =====================================================================
+# FUNZIONI DI UTILITÀ
+# =====================================================================
+def formatta_euro(valore):
+    """Formatta un numero in euro con separatori italiani."""
+    return f"€ {valore:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+def formatta_percentuale(valore, decimali=2):
+    """Formatta una percentuale con virgola italiana."""
+    return f"{valore:.{decimali}f}%".replace(".", ",")
+
+# Scaglioni IRPEF per anno d'imposta (da config.toml)
+SCAGLIONI_IRPEF = {anno: regole.scaglioni_irpef for anno, regole in REGOLE.items()}
+
+def calcola_irpef(reddito_imponibile, anno=ANNO_DEFAULT):
+    """
+    Calcola IRPEF con gli scaglioni dell'anno indicato (default da config.toml).
+    Nel 2025:
+    - 0-28.000€: 23%
+    - 28.001-50.000€: 35%
+    - oltre 50.000€: 43%
+    """
+    return SCAGLIONI_IRPEF[anno].imposta(reddito_imponibile)
+
+@cronometra()
+def calcola_cococo_sportivo(compenso_lordo, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0,
+                            anno=ANNO_DEFAULT):
+    """
+    Calcola imposte, contributi e costi per collaboratore sportivo in Co.Co.Co.
+    
+    D.Lgs. 36/2021 - Riforma dello Sport (parametri dell'anno da config.toml, nel 2025:)
+    - Esenzione fiscale: 15.000€
+    - Esenzione contributiva: 5.000€
+    - Dimezzamento base contributiva eccedenza: 50% fino al 31/12/2027
+    - Ripartizione contributi: 1/3 lavoratore, 2/3 società
+    """
+    regole = REGOLE[anno]
+
+    # Caso patologico: compenso nullo o negativo → tutto a zero
+    if compenso_lordo <= 0:
+        return {
+            "compenso_lordo": 0.0,
+            "franchigia_fiscale": 0.0,
+            "franchigia_contributiva": 0.0,
+            "base_contrib_grezza": 0.0,
+            "base_contrib_ridotta": 0.0,
+            "aliquota_ivs": regole.aliquota_ivs_per(altra_previdenza),
+            "aliquota_aggiuntiva": regole.aliquota_aggiuntiva,
+            "contributi_ivs": 0.0,
+            "contributi_aggiuntivi": 0.0,
+            "totale_contributi": 0.0,
+            "contributi_lavoratore": 0.0,
+            "contributi_societa": 0.0,
+            "reddito_imponibile": 0.0,
+            "reddito_imponibile_netto": 0.0,
+            "irpef": 0.0,
+            "addizionale_regionale": 0.0,
+            "addizionale_comunale": 0.0,
+            "totale_imposte": 0.0,
+            "totale_trattenute_lavoratore": 0.0,
+            "netto_lavoratore": 0.0,
+            "costo_totale_societa": 0.0,
+            "tax_rate": 0.0,
+        }
+    
+    # FRANCHIGIE
+    franchigia_fiscale = min(compenso_lordo, regole.franchigia_fiscale)
+    franchigia_contributiva = min(compenso_lordo, regole.franchigia_contributiva)
+    
+    # BASE CONTRIBUTIVA
+    base_contrib_grezza = max(0.0, compenso_lordo - franchigia_contributiva)
+    base_contrib_ridotta = base_contrib_grezza * regole.riduzione_base_contributiva  # Dimezzamento 50%
+    
+    # ALIQUOTE INPS GESTIONE SEPARATA
+    if altra_previdenza:
+        aliquota_ivs = regole.aliquota_ivs_altra_previdenza
+    else:
+        aliquota_ivs = regole.aliquota_ivs
+    aliquota_aggiuntiva = regole.aliquota_aggiuntiva  # maternità, malattia, ANF, DIS-COLL
+    
+    # CALCOLO CONTRIBUTI
+    contributi_ivs = base_contrib_ridotta * (aliquota_ivs / 100.0)
+    contributi_aggiuntivi = base_contrib_grezza * (aliquota_aggiuntiva / 100.0)
+    totale_contributi_inps = contributi_ivs + contributi_aggiuntivi
+    
+    contributi_lavoratore = totale_contributi_inps * regole.quota_lavoratore_num / regole.quota_lavoratore_den
+    contributi_societa = totale_contributi_inps * regole.quota_societa_num / regole.quota_societa_den
+    
+    # BASE FISCALE
+    reddito_imponibile = max(0.0, compenso_lordo - franchigia_fiscale)
+    reddito_imponibile_netto = max(0.0, reddito_imponibile - contributi_lavoratore)
+    
+    # CALCOLO IMPOSTE
+    irpef = regole.scaglioni_irpef.imposta(reddito_imponibile_netto)
+    addizionale_regionale = reddito_imponibile_netto * (addizionali_reg / 100.0)
+    addizionale_comunale = reddito_imponibile_netto * (addizionali_com / 100.0)
+    totale_imposte = irpef + addizionale_regionale + addizionale_comunale
+    
+    # RISULTATI FINALI
+    totale_trattenute_lavoratore = contributi_lavoratore + totale_imposte
+    netto_lavoratore = compenso_lordo - totale_trattenute_lavoratore
+    costo_totale_societa = compenso_lordo + contributi_societa
+    
+    # Tax rate effettivo (bloccato tra 0 e 100)
+    if compenso_lordo > 0:
+        tax_rate_raw = (totale_trattenute_lavoratore / compenso_lordo * 100.0)
+        tax_rate = max(0.0, min(100.0, tax_rate_raw))
+    else:
+        tax_rate = 0.0
+    
+    return {
+        "compenso_lordo": compenso_lordo,
+        "franchigia_fiscale": franchigia_fiscale,
+        "franchigia_contributiva": franchigia_contributiva,
+        "base_contrib_grezza": base_contrib_grezza,
+        "base_contrib_ridotta": base_contrib_ridotta,
+        "aliquota_ivs": aliquota_ivs,
+        "aliquota_aggiuntiva": aliquota_aggiuntiva,
+        "contributi_ivs": contributi_ivs,
+        "contributi_aggiuntivi": contributi_aggiuntivi,
+        "totale_contributi": totale_contributi_inps,
+        "contributi_lavoratore": contributi_lavoratore,
+        "contributi_societa": contributi_societa,
+        "reddito_imponibile": reddito_imponibile,
+        "reddito_imponibile_netto": reddito_imponibile_netto,
+        "irpef": irpef,
+        "addizionale_regionale": addizionale_regionale,
+        "addizionale_comunale": addizionale_comunale,
+        "totale_imposte": totale_imposte,
+        "totale_trattenute_lavoratore": totale_trattenute_lavoratore,
+        "netto_lavoratore": netto_lavoratore,
+        "costo_totale_societa": costo_totale_societa,
+        "tax_rate": tax_rate,
+    }
+
+# Colonne prodotte dal calcolo, nello stesso ordine del dizionario scalare
+COLONNE_RISULTATO = (
+    "compenso_lordo",
+    "franchigia_fiscale",
+    "franchigia_contributiva",
+    "base_contrib_grezza",
+    "base_contrib_ridotta",
+    "aliquota_ivs",
+    "aliquota_aggiuntiva",
+    "contributi_ivs",
+    "contributi_aggiuntivi",
+    "totale_contributi",
+    "contributi_lavoratore",
+    "contributi_societa",
+    "reddito_imponibile",
+    "reddito_imponibile_netto",
+    "irpef",
+    "addizionale_regionale",
+    "addizionale_comunale",
+    "totale_imposte",
+    "totale_trattenute_lavoratore",
+    "netto_lavoratore",
+    "costo_totale_societa",
+    "tax_rate",
+)
+
+# Codici ISTAT facoltativi per le addizionali da tabella (simulatore.addizionali)
+COLONNE_CODICI = ("codice_regione", "codice_comune")
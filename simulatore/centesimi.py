@@ -0,0 +1,244 @@
+"""
+Calcolo esatto in centesimi interi (int64), senza errori di arrotondamento binario.
+
+Le aliquote sono convertite in punti base interi (25% → 2500, 2,03% → 203) e ogni importo
+è calcolato in aritmetica intera e arrotondato al centesimo una sola volta, per eccesso
+da mezzo centesimo in su (arrotondamento commerciale, come per gli importi F24):
+- contributi IVS e aggiuntivi: ciascuno arrotondato al centesimo, base ridotta compresa
+  nel prodotto (nessun mezzo centesimo intermedio);
+- quota lavoratore arrotondata, quota società = totale − quota lavoratore: le due quote
+  sommano sempre esattamente al totale;
+- IRPEF calcolata esatta su tutti gli scaglioni e arrotondata solo alla fine;
+- addizionali arrotondate ciascuna al centesimo; le loro aliquote sono in milionesimi di
+  punto, perché quelle effettive delle tabelle a scaglioni non sono multipli dello 0,01%.
+
+Così i totali di un elenco sono le somme esatte dei centesimi di ogni persona.
+"""
+import numpy as np
+
+from .calcolo import ANNI_DISPONIBILI, ANNO_DEFAULT, COLONNE_CODICI, COLONNE_RISULTATO, REGOLE
+
+PUNTI_BASE = 10_000  # 100% in punti base
+SCALA_ADDIZIONALI = 10 ** 8  # 100% in milionesimi di punto: reddito × aliquota resta sotto 2^63
+LIMITE_CENTESIMI = 10 ** 10  # 100 milioni di euro: i prodotti restano sotto 2^63
+COLONNE_ALIQUOTA = ("aliquota_ivs", "aliquota_aggiuntiva", "tax_rate")
+
+
+def _centesimi(valore, contesto):
+    """Importo in euro (5000.0) → centesimi interi (500000), solo se la conversione è esatta."""
+    centesimi = round(valore * 100)
+    if abs(valore * 100 - centesimi) > 1e-6:
+        raise ValueError(f"{contesto}: {valore} € non è un importo in centesimi interi")
+    return centesimi
+
+
+def _punti_base(valore, contesto):
+    """Percentuale (25.0) → punti base interi (2500), solo se la conversione è esatta."""
+    punti = round(valore * 100)
+    if abs(valore * 100 - punti) > 1e-6:
+        raise ValueError(f"{contesto}: {valore}% non è esprimibile in punti base (0,01%)")
+    return punti
+
+
+def _dividi(numeratore, divisore):
+    """Divisione intera arrotondata per eccesso da metà in su (valori non negativi)."""
+    return (numeratore + divisore // 2) // divisore
+
+
+class _ParametriCentesimi:
+    """Parametri di un anno in centesimi e punti base, con la tabella IRPEF in unità esatte."""
+
+    __slots__ = (
+        "franchigia_fiscale", "franchigia_contributiva", "riduzione", "aliquota_ivs", "aliquota_ivs_altra",
+        "aliquota_aggiuntiva", "quota_num", "quota_den", "soglie", "inizi", "aliquote", "cumulate",
+    )
+
+    def __init__(self, regole):
+        contesto = f"regole.{regole.anno}"
+        self.franchigia_fiscale = _centesimi(regole.franchigia_fiscale, f"{contesto}.franchigia_fiscale")
+        self.franchigia_contributiva = _centesimi(regole.franchigia_contributiva, f"{contesto}.franchigia_contributiva")
+        self.riduzione = _punti_base(regole.riduzione_base_contributiva * 100, f"{contesto}.riduzione_base_contributiva")
+        self.aliquota_ivs = _punti_base(regole.aliquota_ivs, f"{contesto}.aliquota_ivs")
+        self.aliquota_ivs_altra = _punti_base(regole.aliquota_ivs_altra_previdenza, f"{contesto}.aliquota_ivs_altra_previdenza")
+        self.aliquota_aggiuntiva = _punti_base(regole.aliquota_aggiuntiva, f"{contesto}.aliquota_aggiuntiva")
+        self.quota_num = int(regole.quota_lavoratore_num)
+        self.quota_den = int(regole.quota_lavoratore_den)
+
+        scaglioni = regole.scaglioni_irpef
+        soglie = [_centesimi(s, f"{contesto}.scaglioni_irpef") for s in scaglioni.soglie]
+        aliquote = [_punti_base(a * 100, f"{contesto}.scaglioni_irpef") for a in scaglioni.aliquote]
+        inizi = [0] + soglie
+        # Imposta cumulata a inizio scaglione in centesimi × punti base (esatta)
+        cumulate = [0]
+        for i in range(len(soglie)):
+            cumulate.append(cumulate[-1] + (inizi[i + 1] - inizi[i]) * aliquote[i])
+        self.soglie = np.array(soglie, dtype=np.int64)
+        self.inizi = np.array(inizi, dtype=np.int64)
+        self.aliquote = np.array(aliquote, dtype=np.int64)
+        self.cumulate = np.array(cumulate, dtype=np.int64)
+
+    def irpef(self, reddito):
+        """IRPEF in centesimi su redditi in centesimi, arrotondata una volta sola."""
+        i = np.searchsorted(self.soglie, reddito, side="left")
+        esatta = self.cumulate[i] + (reddito - self.inizi[i]) * self.aliquote[i]
+        return np.where(reddito <= 0, 0, _dividi(esatta, PUNTI_BASE))
+
+
+PARAMETRI_CENTESIMI = {anno: _ParametriCentesimi(REGOLE[anno]) for anno in ANNI_DISPONIBILI}
+
+
+def in_centesimi(importi):
+    """Importi in euro → centesimi interi (arrotondamento al centesimo più vicino)."""
+    importi = np.asarray(importi, dtype=np.float64)
+    centesimi = np.where(importi >= 0, np.floor(importi * 100 + 0.5), np.ceil(importi * 100 - 0.5))
+    if np.any(np.abs(centesimi) >= LIMITE_CENTESIMI):
+        raise ValueError("Importo oltre il limite del calcolo in centesimi (100 milioni di euro)")
+    return centesimi.astype(np.int64)
+
+
+def in_punti_base(percentuali):
+    """Percentuali (1.23) → punti base interi (123), arrotondando allo 0,01%."""
+    return np.rint(np.asarray(percentuali, dtype=np.float64) * 100).astype(np.int64)
+
+
+def _aliquote_addizionali(percentuali):
+    """Percentuali (1.23, o 1.49075 effettiva da tabella) → milionesimi di punto interi."""
+    return np.rint(np.asarray(percentuali, dtype=np.float64) * (SCALA_ADDIZIONALI // 100)).astype(np.int64)
+
+
+def calcola_cococo_sportivo_centesimi(compenso_lordo, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0,
+                                     anno=ANNO_DEFAULT):
+    """
+    Versione esatta di calcola_cococo_sportivo_batch: stessi argomenti (importi in euro,
+    aliquote in percentuale), risultati in centesimi int64 per tutte le colonne di importo;
+    aliquota_ivs, aliquota_aggiuntiva e tax_rate restano percentuali float.
+    `anno` può essere un array (un anno per riga).
+    """
+    compenso = in_centesimi(compenso_lordo)
+    altra_prev = np.asarray(altra_previdenza, dtype=bool)
+    add_reg = _aliquote_addizionali(addizionali_reg)
+    add_com = _aliquote_addizionali(addizionali_com)
+    anni = np.asarray(anno, dtype=np.int64)
+    # Anno unico: scalare, tutte le righe uguali o nessuna riga (array di anni vuoto)
+    anno_unico = int(anni) if anni.ndim == 0 else None
+    compenso, altra_prev, add_reg, add_com, anni = np.broadcast_arrays(compenso, altra_prev, add_reg, add_com, anni)
+    compenso = np.maximum(compenso, 0)
+    if anno_unico is None:
+        if not anni.size:
+            anno_unico = ANNO_DEFAULT
+        elif np.all(anni == anni.flat[0]):
+            anno_unico = int(anni.flat[0])
+
+    if anno_unico is not None:
+        valori = PARAMETRI_CENTESIMI.get(anno_unico)
+        if valori is None:
+            raise KeyError(f"Anno d'imposta non configurato: {anno_unico}")
+        p = {campo: getattr(valori, campo) for campo in _ParametriCentesimi.__slots__[:8]}
+        gruppi = [(valori, None)]
+    else:
+        mancanti = sorted(set(np.unique(anni).tolist()) - set(PARAMETRI_CENTESIMI))
+        if mancanti:
+            raise KeyError(f"Anno d'imposta non configurato: {mancanti}")
+        indice = np.searchsorted(np.array(ANNI_DISPONIBILI), anni)
+        p = {
+            campo: np.array([getattr(PARAMETRI_CENTESIMI[a], campo) for a in ANNI_DISPONIBILI], dtype=np.int64)[indice]
+            for campo in _ParametriCentesimi.__slots__[:8]
+        }
+        gruppi = [(PARAMETRI_CENTESIMI[int(a)], anni == a) for a in np.unique(anni)]
+
+    # FRANCHIGIE E BASE CONTRIBUTIVA
+    franchigia_fiscale = np.minimum(compenso, p["franchigia_fiscale"])
+    franchigia_contributiva = np.minimum(compenso, p["franchigia_contributiva"])
+    base_contrib_grezza = compenso - franchigia_contributiva
+    base_contrib_ridotta = _dividi(base_contrib_grezza * p["riduzione"], PUNTI_BASE)
+
+    # CONTRIBUTI: base × riduzione × aliquota in un solo prodotto intero
+    aliquota_ivs = np.where(altra_prev, p["aliquota_ivs_altra"], p["aliquota_ivs"])
+    contributi_ivs = _dividi(base_contrib_grezza * p["riduzione"] * aliquota_ivs, PUNTI_BASE * PUNTI_BASE)
+    contributi_aggiuntivi = _dividi(base_contrib_grezza * p["aliquota_aggiuntiva"], PUNTI_BASE)
+    totale_contributi = contributi_ivs + contributi_aggiuntivi
+    contributi_lavoratore = _dividi(totale_contributi * p["quota_num"], p["quota_den"])
+    contributi_societa = totale_contributi - contributi_lavoratore
+
+    # IMPOSTE
+    reddito_imponibile = compenso - franchigia_fiscale
+    reddito_imponibile_netto = np.maximum(0, reddito_imponibile - contributi_lavoratore)
+    if len(gruppi) == 1:
+        irpef = gruppi[0][0].irpef(reddito_imponibile_netto)
+    else:
+        irpef = np.empty_like(reddito_imponibile_netto)
+        for valori, selezione in gruppi:
+            irpef[selezione] = valori.irpef(reddito_imponibile_netto[selezione])
+    addizionale_regionale = _dividi(reddito_imponibile_netto * add_reg, SCALA_ADDIZIONALI)
+    addizionale_comunale = _dividi(reddito_imponibile_netto * add_com, SCALA_ADDIZIONALI)
+    totale_imposte = irpef + addizionale_regionale + addizionale_comunale
+
+    totale_trattenute_lavoratore = contributi_lavoratore + totale_imposte
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tax_rate = np.where(compenso > 0, np.clip(totale_trattenute_lavoratore / compenso * 100.0, 0.0, 100.0), 0.0)
+
+    return {
+        "compenso_lordo": compenso,
+        "franchigia_fiscale": franchigia_fiscale,
+        "franchigia_contributiva": franchigia_contributiva,
+        "base_contrib_grezza": base_contrib_grezza,
+        "base_contrib_ridotta": base_contrib_ridotta,
+        "aliquota_ivs": aliquota_ivs / 100.0,
+        "aliquota_aggiuntiva": np.broadcast_to(p["aliquota_aggiuntiva"] / 100.0, compenso.shape),
+        "contributi_ivs": contributi_ivs,
+        "contributi_aggiuntivi": contributi_aggiuntivi,
+        "totale_contributi": totale_contributi,
+        "contributi_lavoratore": contributi_lavoratore,
+        "contributi_societa": contributi_societa,
+        "reddito_imponibile": reddito_imponibile,
+        "reddito_imponibile_netto": reddito_imponibile_netto,
+        "irpef": irpef,
+        "addizionale_regionale": addizionale_regionale,
+        "addizionale_comunale": addizionale_comunale,
+        "totale_imposte": totale_imposte,
+        "totale_trattenute_lavoratore": totale_trattenute_lavoratore,
+        "netto_lavoratore": compenso - totale_trattenute_lavoratore,
+        "costo_totale_societa": compenso + contributi_societa,
+        "tax_rate": tax_rate,
+    }
+
+
+def in_euro(risultati):
+    """Risultati in centesimi → stesso dizionario con gli importi in euro (float a 2 decimali)."""
+    return {
+        colonna: valori if colonna in COLONNE_ALIQUOTA else valori / 100.0
+        for colonna, valori in risultati.items()
+    }
+
+
+def calcola_cococo_sportivo_esatto(compenso_lordo, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0,
+                                   anno=ANNO_DEFAULT):
+    """Calcolo singolo esatto: stesso dizionario di calcola_cococo_sportivo, importi al centesimo."""
+    risultati = in_euro(calcola_cococo_sportivo_centesimi(
+        compenso_lordo, altra_previdenza, addizionali_reg, addizionali_com, anno
+    ))
+    return {colonna: float(risultati[colonna]) for colonna in COLONNE_RISULTATO}
+
+
+def calcola_cococo_sportivo_centesimi_df(df, anno=ANNO_DEFAULT):
+    """
+    Come batch.calcola_cococo_sportivo_df, ma con le colonne di importo in centesimi int64:
+    le somme di colonna (totali società, F24) sono esatte al centesimo.
+    """
+    import pandas as pd
+
+    if any(colonna in df for colonna in COLONNE_CODICI):
+        # Stesse aliquote da tabella di batch.calcola_cococo_sportivo_df
+        from .addizionali import risolvi_addizionali_df
+
+        df = risolvi_addizionali_df(df, anno)
+
+    n = len(df)
+    risultati = calcola_cococo_sportivo_centesimi(
+        df["compenso_lordo"].to_numpy(dtype=np.float64),
+        df["altra_previdenza"].to_numpy(dtype=bool) if "altra_previdenza" in df else np.zeros(n, dtype=bool),
+        df["addizionali_reg"].to_numpy(dtype=np.float64) if "addizionali_reg" in df else np.zeros(n),
+        df["addizionali_com"].to_numpy(dtype=np.float64) if "addizionali_com" in df else np.zeros(n),
+        df["anno"].to_numpy(dtype=np.int64) if "anno" in df else anno,
+    )
+    return pd.DataFrame(risultati, index=df.index, columns=list(COLONNE_RISULTATO))
@@ -0,0 +1,314 @@
+"""
+Prospetti annuali per collaboratore in stile Certificazione Unica, in PDF e/o CSV,
+più un riepilogo della società, scritti uno alla volta in un archivio zip.
+
+    python -m simulatore.certificazioni collaboratori.csv --uscita cu_2025.zip
+        [--anno 2025] [--formati pdf csv] [--societa "ASD Esempio"] [--processi 4]
+        [--precedente cu_2025_v1.zip]
+
+L'elenco ha una riga per contratto con codice_fiscale e compenso_lordo (più nome,
+altra_previdenza, addizionali_reg, addizionali_com facoltative): i contratti della stessa
+persona vengono sommati prima del calcolo. I documenti sono generati da un pool di processi
+e scritti nello zip man mano che arrivano, quindi in memoria resta solo un lotto di documenti.
+
+Con --precedente si rigenerano solo i collaboratori i cui dati sono cambiati: l'indice
+(indice.json nello zip) conserva un'impronta degli input di ogni persona, e i documenti
+dei collaboratori invariati si copiano dallo zip precedente.
+"""
+import argparse
+import contextlib
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import zipfile
+from itertools import islice
+from multiprocessing import Pool
+
+import pandas as pd
+
+from .addizionali import impronta_dati
+from .aggregazione import aggrega_collaboratori
+from .calcolo import ANNI_DISPONIBILI, ANNO_DEFAULT, REGOLE, formatta_euro
+from .file_paghe import leggi_elenco
+
+FORMATI = ("pdf", "csv")
+VERSIONE_MODELLO = 1  # da aumentare quando cambia il contenuto dei documenti
+NOME_INDICE = "indice.json"
+
+# (colonna del calcolo, voce del prospetto)
+VOCI = (
+    ("compenso_lordo", "Compensi lordi corrisposti"),
+    ("franchigia_fiscale", "Quota esente IRPEF (franchigia fiscale)"),
+    ("franchigia_contributiva", "Quota esente INPS (franchigia contributiva)"),
+    ("reddito_imponibile", "Reddito imponibile lordo"),
+    ("totale_contributi", "Contributi INPS gestione separata"),
+    ("contributi_lavoratore", "  di cui a carico del collaboratore"),
+    ("contributi_societa", "  di cui a carico della società"),
+    ("reddito_imponibile_netto", "Reddito imponibile netto IRPEF"),
+    ("irpef", "Ritenute IRPEF (codice tributo 1040)"),
+    ("addizionale_regionale", "Addizionale regionale"),
+    ("addizionale_comunale", "Addizionale comunale"),
+    ("netto_lavoratore", "Netto corrisposto"),
+)
+
+
+# =====================================================================
+# PDF MINIMALE (una pagina A4, Helvetica, senza dipendenze)
+# =====================================================================
+def _testo_pdf(testo):
+    dati = testo.encode("cp1252", errors="replace")
+    return dati.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def pdf_semplice(righe):
+    """
+    PDF di una pagina da un elenco di righe (testo, grassetto, colonna destra).
+    Il risultato è deterministico: stessi dati, stessi byte.
+    """
+    flusso = [b"BT"]
+    y = 800
+    for testo, grassetto, destra in righe:
+        y -= 16 if testo else 8
+        if not testo:
+            continue
+        flusso.append(b"/%s %d Tf 1 0 0 1 50 %d Tm (%s) Tj" % (b"F2" if grassetto else b"F1", 11, y, _testo_pdf(testo)))
+        if destra:
+            flusso.append(b"1 0 0 1 400 %d Tm (%s) Tj" % (y, _testo_pdf(destra)))
+    flusso.append(b"ET")
+    contenuto = b"\n".join(flusso)
+
+    oggetti = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        b"/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(contenuto), contenuto),
+    ]
+    uscita = io.BytesIO()
+    uscita.write(b"%PDF-1.4\n")
+    posizioni = []
+    for numero, oggetto in enumerate(oggetti, start=1):
+        posizioni.append(uscita.tell())
+        uscita.write(b"%d 0 obj\n%s\nendobj\n" % (numero, oggetto))
+    inizio_xref = uscita.tell()
+    uscita.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(oggetti) + 1))
+    for posizione in posizioni:
+        uscita.write(b"%010d 00000 n \n" % posizione)
+    uscita.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(oggetti) + 1, inizio_xref))
+    return uscita.getvalue()
+
+
+# =====================================================================
+# DOCUMENTI
+# =====================================================================
+def impronta(persona, anno, formati, societa=""):
+    """
+    Impronta degli input di una persona, delle regole dell'anno, delle tabelle delle
+    addizionali e del modello dei documenti (società stampata come sostituto d'imposta compresa).
+    """
+    regole = REGOLE[anno]
+    dati = [
+        VERSIONE_MODELLO,
+        sorted(formati),
+        societa,
+        anno,
+        [getattr(regole, campo) for campo in regole.__slots__ if campo != "scaglioni_irpef"],
+        [regole.scaglioni_irpef.soglie, regole.scaglioni_irpef.aliquote],
+        impronta_dati(),
+        persona,
+    ]
+    return hashlib.sha256(json.dumps(dati, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:20]
+
+
+def _nome_file(chiave):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(chiave)) or "senza_codice"
+
+
+def genera_documenti(lavoro):
+    """
+    Documenti di un collaboratore: [(nome nello zip, byte)]. Funzione di modulo per
+    poter essere eseguita nei processi del pool.
+    """
+    persona, risultato, anno, formati, societa = lavoro
+    nome_base = f"{_nome_file(persona['chiave'])}_{anno}"
+    documenti = []
+    if "pdf" in formati:
+        righe = [
+            (f"Prospetto compensi sportivi dilettantistici - anno {anno}", True, None),
+            ("", False, None),
+            ("Sostituto d'imposta", True, societa or "-"),
+            ("Percipiente", True, persona.get("nome") or "-"),
+            ("Codice fiscale", False, str(persona["chiave"])),
+            ("Contratti nell'anno", False, str(persona["numero_contratti"])),
+            ("", False, None),
+        ]
+        righe += [(voce, colonna == "netto_lavoratore", formatta_euro(risultato[colonna])) for colonna, voce in VOCI]
+        righe += [
+            ("", False, None),
+            ("Prospetto informativo calcolato dal simulatore (D.Lgs. 36/2021):", False, None),
+            ("non sostituisce la Certificazione Unica trasmessa all'Agenzia delle Entrate.", False, None),
+        ]
+        documenti.append((f"{nome_base}.pdf", pdf_semplice(righe)))
+    if "csv" in formati:
+        testo = io.StringIO()
+        scrittore = csv.writer(testo, delimiter=";", lineterminator="\n")
+        scrittore.writerow(["voce", "importo"])
+        scrittore.writerows((colonna, f"{risultato[colonna]:.2f}") for colonna, _ in VOCI)
+        documenti.append((f"{nome_base}.csv", testo.getvalue().encode("utf-8")))
+    return documenti
+
+
+# =====================================================================
+# ELENCO E ARCHIVIO
+# =====================================================================
+def leggi_indice(archivio):
+    """Indice {codice: impronta} di uno zip generato in precedenza (zipfile.ZipFile aperto)."""
+    try:
+        return json.loads(archivio.read(NOME_INDICE))
+    except KeyError:
+        raise ValueError(f"{archivio.filename or 'archivio precedente'}: {NOME_INDICE} mancante") from None
+
+
+def _lavori(per_persona, nomi, impronte_contratti, anno, formati, societa, precedente, indice, saltati):
+    """Generatore dei lavori per il pool; i collaboratori invariati vanno in `saltati`."""
+    colonne = [colonna for colonna, _ in VOCI]
+    for chiave, riga in zip(per_persona.index, per_persona.itertuples(index=False)):
+        risultato = {colonna: float(getattr(riga, colonna)) for colonna in colonne}
+        persona = {
+            "chiave": chiave,
+            "nome": nomi.get(chiave, ""),
+            "numero_contratti": int(riga.numero_contratti),
+        }
+        indice[chiave] = impronta({**persona, "contratti": int(impronte_contratti[chiave])}, anno, formati, societa)
+        if precedente.get(chiave) == indice[chiave]:
+            saltati.add(chiave)
+            continue
+        yield persona, risultato, anno, formati, societa
+
+
+def genera_archivio(contratti, uscita, anno=ANNO_DEFAULT, formati=FORMATI, societa="", processi=None, precedente=None,
+                    chiave="codice_fiscale", lotto=32):
+    """
+    Scrive nello zip `uscita` (percorso o file binario) i documenti di ogni collaboratore,
+    il riepilogo della società (riepilogo.csv, riepilogo.pdf) e l'indice delle impronte.
+    `precedente` è uno zip generato in precedenza (percorso o file binario): i documenti dei
+    collaboratori invariati si copiano da lì invece di rigenerarli.
+    Restituisce (documenti generati, collaboratori saltati).
+    """
+    formati = tuple(f for f in FORMATI if f in formati)
+    if not formati:
+        raise ValueError(f"Indicare almeno un formato tra {', '.join(FORMATI)}")
+    _, per_persona = aggrega_collaboratori(contratti.drop(columns=["nome"], errors="ignore"), chiave, anno)
+    # Nomi mancanti → "": nel prospetto il percipiente diventa "-"
+    nomi = (
+        contratti.groupby(chiave, sort=False)["nome"].first().astype(object).fillna("").to_dict()
+        if "nome" in contratti else {}
+    )
+    indice, saltati = {}, set()
+    # Impronta dei contratti di ogni persona, indipendente dall'ordine delle righe
+    colonne_ingresso = [c for c in contratti.columns if c != chiave]
+    impronte_contratti = (
+        pd.util.hash_pandas_object(contratti[colonne_ingresso], index=False)
+        .groupby(contratti[chiave].to_numpy(), sort=False)
+        .sum()
+    )
+
+    generati = 0
+    processi = processi or os.cpu_count() or 1
+    with (
+        zipfile.ZipFile(precedente) if precedente is not None else contextlib.nullcontext() as vecchio,
+        zipfile.ZipFile(uscita, "w", compression=zipfile.ZIP_DEFLATED) as archivio,
+    ):
+        indice_vecchio = leggi_indice(vecchio) if vecchio is not None else {}
+        lavori = _lavori(per_persona, nomi, impronte_contratti, anno, formati, societa, indice_vecchio, indice, saltati)
+        if processi > 1:
+            with Pool(processi) as pool:
+                # imap consuma subito tutto l'iteratore: si invia una finestra di lavori alla volta
+                while finestra := list(islice(lavori, processi * lotto * 4)):
+                    for documenti in pool.imap(genera_documenti, finestra, chunksize=lotto):
+                        for nome, dati in documenti:
+                            archivio.writestr(nome, dati)
+                        generati += 1
+        else:
+            for documenti in map(genera_documenti, lavori):
+                for nome, dati in documenti:
+                    archivio.writestr(nome, dati)
+                generati += 1
+        # Invariati: stessa impronta, quindi stessi formati e stessi byte dello zip precedente
+        for chiave in per_persona.index[per_persona.index.isin(saltati)]:
+            for formato in formati:
+                nome = f"{_nome_file(chiave)}_{anno}.{formato}"
+                archivio.writestr(nome, vecchio.read(nome))
+
+        _scrivi_riepilogo(archivio, per_persona, nomi, anno, societa, indice, saltati)
+        archivio.writestr(NOME_INDICE, json.dumps(indice, indent=1, sort_keys=True))
+    return generati, len(saltati)
+
+
+def _scrivi_riepilogo(archivio, per_persona, nomi, anno, societa, indice, saltati):
+    colonne = [colonna for colonna, _ in VOCI]
+    with archivio.open("riepilogo.csv", "w") as file:
+        testo = io.TextIOWrapper(file, encoding="utf-8", newline="")
+        scrittore = csv.writer(testo, delimiter=";", lineterminator="\n")
+        scrittore.writerow(["codice_fiscale", "nome", "numero_contratti", *colonne, "impronta", "stato"])
+        for chiave, riga in zip(per_persona.index, per_persona.itertuples(index=False)):
+            scrittore.writerow([
+                chiave,
+                nomi.get(chiave, ""),
+                int(riga.numero_contratti),
+                *(f"{float(getattr(riga, c)):.2f}" for c in colonne),
+                indice[chiave],
+                "invariato" if chiave in saltati else "generato",
+            ])
+        testo.flush()
+        testo.detach()
+
+    totali = per_persona[colonne].sum()
+    righe = [
+        (f"Riepilogo compensi sportivi dilettantistici - anno {anno}", True, None),
+        ("", False, None),
+        ("Società", True, societa or "-"),
+        ("Collaboratori", False, str(len(per_persona))),
+        ("Contratti", False, str(int(per_persona["numero_contratti"].sum()))),
+        ("", False, None),
+    ]
+    righe += [(voce.strip(), colonna == "netto_lavoratore", formatta_euro(float(totali[colonna]))) for colonna, voce in VOCI]
+    righe += [("Costo totale società", True, formatta_euro(float(per_persona["costo_totale_societa"].sum())))]
+    archivio.writestr("riepilogo.pdf", pdf_semplice(righe))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m simulatore.certificazioni",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("elenco", help="file contratti CSV o Excel")
+    parser.add_argument("--uscita", required=True, help="archivio zip da creare")
+    parser.add_argument("--anno", type=int, choices=ANNI_DISPONIBILI, default=ANNO_DEFAULT)
+    parser.add_argument("--formati", nargs="+", choices=FORMATI, default=list(FORMATI))
+    parser.add_argument("--societa", default="", help="denominazione del sostituto d'imposta")
+    parser.add_argument("--processi", type=int, help="processi del pool (default: numero di CPU)")
+    parser.add_argument("--precedente", help="zip precedente: copia i documenti dei collaboratori invariati")
+    args = parser.parse_args(argv)
+
+    try:
+        contratti = leggi_elenco(args.elenco)
+        generati, saltati = genera_archivio(
+            contratti, args.uscita, args.anno, args.formati, args.societa, args.processi, args.precedente
+        )
+    except (ValueError, KeyError, OSError, zipfile.BadZipFile) as errore:
+        print(f"Errore: {errore}", file=sys.stderr)
+        return 1
+    print(f"{generati} collaboratori generati, {saltati} invariati → {args.uscita}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
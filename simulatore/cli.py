@@ -0,0 +1,140 @@
+"""
+Riga di comando del simulatore (senza Streamlit).
+
+Calcolo singolo:
+    python -m simulatore --compenso 18000 [--altra-previdenza] [--add-reg 1.23] [--add-com 0.5]
+
+Elaborazione in streaming di un file paghe da stdin a stdout, una riga alla volta:
+    python -m simulatore --formato csv < collaboratori.csv > risultati.csv
+    python -m simulatore --formato jsonl < collaboratori.jsonl > risultati.jsonl
+
+Con --esatto il calcolo avviene in centesimi interi (simulatore.centesimi): ogni importo
+è arrotondato al centesimo e le quote lavoratore/società sommano esattamente al totale.
+
+Colonne in ingresso: compenso_lordo (obbligatoria), altra_previdenza, addizionali_reg,
+addizionali_com (facoltative). Le altre colonne (nome, codice fiscale, ...) sono
+riportate invariate prima dei risultati.
+"""
+import argparse
+import csv
+import json
+import sys
+
+from .calcolo import ANNI_DISPONIBILI, ANNO_DEFAULT, COLONNE_RISULTATO, calcola_cococo_sportivo
+
+COLONNE_INPUT = ("compenso_lordo", "altra_previdenza", "addizionali_reg", "addizionali_com")
+VALORI_VERO = {"1", "true", "vero", "si", "sì", "s", "yes", "y", "x"}
+
+
+def _booleano(valore):
+    if isinstance(valore, bool):
+        return valore
+    if valore is None:
+        return False
+    return str(valore).strip().lower() in VALORI_VERO
+
+
+def _numero(valore):
+    if valore is None or valore == "":
+        return 0.0
+    if isinstance(valore, (int, float)):
+        return float(valore)
+    # Accetta sia "1234.56" sia il formato italiano "1.234,56"
+    testo = str(valore).strip()
+    if "," in testo:
+        testo = testo.replace(".", "").replace(",", ".")
+    return float(testo)
+
+
+def _funzione_calcolo(esatto):
+    if esatto:
+        # Import locale: solo --esatto usa NumPy, l'avvio del calcolo float resta rapido
+        from .centesimi import calcola_cococo_sportivo_esatto
+        return calcola_cococo_sportivo_esatto
+    return calcola_cococo_sportivo
+
+
+def calcola_riga(riga, decimali=None, anno=ANNO_DEFAULT, esatto=False):
+    """
+    Calcola una riga del file paghe e restituisce input e risultati in un unico dizionario.
+    Una colonna `anno` nella riga prevale sull'anno indicato.
+    """
+    calcola = _funzione_calcolo(esatto)
+    risultato = calcola(
+        _numero(riga.get("compenso_lordo")),
+        _booleano(riga.get("altra_previdenza")),
+        _numero(riga.get("addizionali_reg")),
+        _numero(riga.get("addizionali_com")),
+        int(riga["anno"]) if riga.get("anno") not in (None, "") else anno,
+    )
+    if decimali is not None:
+        risultato = {k: round(v, decimali) for k, v in risultato.items()}
+    uscita = {k: v for k, v in riga.items() if k not in COLONNE_RISULTATO}
+    uscita.update(risultato)
+    return uscita
+
+
+def elabora_csv(ingresso, uscita, decimali=None, separatore=",", anno=ANNO_DEFAULT, esatto=False):
+    """Legge un CSV riga per riga e scrive il CSV dei risultati senza caricare il file in memoria."""
+    lettore = csv.DictReader(ingresso, delimiter=separatore)
+    if lettore.fieldnames is None:
+        return 0
+    if "compenso_lordo" not in lettore.fieldnames:
+        raise ValueError("Colonna obbligatoria mancante: compenso_lordo")
+    extra = [c for c in lettore.fieldnames if c not in COLONNE_RISULTATO]
+    scrittore = csv.DictWriter(uscita, fieldnames=extra + list(COLONNE_RISULTATO), delimiter=separatore)
+    scrittore.writeheader()
+    righe = 0
+    for riga in lettore:
+        scrittore.writerow(calcola_riga(riga, decimali, anno, esatto))
+        righe += 1
+    return righe
+
+
+def elabora_jsonl(ingresso, uscita, decimali=None, anno=ANNO_DEFAULT, esatto=False):
+    """Legge un oggetto JSON per riga e scrive un oggetto JSON di risultati per riga."""
+    righe = 0
+    for linea in ingresso:
+        if not linea.strip():
+            continue
+        uscita.write(json.dumps(calcola_riga(json.loads(linea), decimali, anno, esatto), ensure_ascii=False))
+        uscita.write("\n")
+        righe += 1
+    return righe
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m simulatore",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--compenso", type=float, help="calcolo singolo sul compenso lordo annuo indicato")
+    parser.add_argument("--altra-previdenza", action="store_true", help="aliquota IVS ridotta (24%%)")
+    parser.add_argument("--add-reg", type=float, default=0.0, help="addizionale regionale (%%)")
+    parser.add_argument("--add-com", type=float, default=0.0, help="addizionale comunale (%%)")
+    parser.add_argument("--formato", choices=("csv", "jsonl"), default="csv", help="formato di stdin/stdout")
+    parser.add_argument("--separatore", default=",", help="separatore CSV (default ',')")
+    parser.add_argument("--anno", type=int, choices=ANNI_DISPONIBILI, default=ANNO_DEFAULT, help="anno d'imposta")
+    parser.add_argument("--decimali", type=int, help="arrotonda i risultati al numero di decimali indicato")
+    parser.add_argument("--esatto", action="store_true", help="calcolo esatto in centesimi interi")
+    args = parser.parse_args(argv)
+
+    if args.compenso is not None:
+        calcola = _funzione_calcolo(args.esatto)
+        risultato = calcola(args.compenso, args.altra_previdenza, args.add_reg, args.add_com, args.anno)
+        if args.decimali is not None:
+            risultato = {k: round(v, args.decimali) for k, v in risultato.items()}
+        json.dump(risultato, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return 0
+
+    try:
+        if args.formato == "csv":
+            elabora_csv(sys.stdin, sys.stdout, args.decimali, args.separatore, args.anno, args.esatto)
+        else:
+            elabora_jsonl(sys.stdin, sys.stdout, args.decimali, args.anno, args.esatto)
+    except (ValueError, KeyError) as errore:
+        print(f"Errore: {errore}", file=sys.stderr)
+        return 1
+    return 0
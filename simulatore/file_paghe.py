@@ -0,0 +1,233 @@
+"""
+Lettura e scrittura a blocchi dei file paghe (CSV ed Excel).
+
+I file vengono letti un blocco di righe alla volta, calcolati con il motore vettoriale
+e scritti subito sul file di uscita: la memoria occupata dipende dalla dimensione del
+blocco e non da quella del file.
+"""
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+
+from .addizionali import COLONNE_CODICI
+from .batch import calcola_cococo_sportivo_df
+from .calcolo import ANNO_DEFAULT, COLONNE_RISULTATO
+from .cli import VALORI_VERO
+
+RIGHE_PER_BLOCCO = 5000
+
+
+def _rileva_separatore(file):
+    """Riconosce ',' o ';' dalla prima riga del CSV e riporta il file all'inizio."""
+    inizio = file.tell()
+    prima_riga = file.readline()
+    file.seek(inizio)
+    if isinstance(prima_riga, bytes):
+        prima_riga = prima_riga.decode("utf-8-sig", errors="replace")
+    try:
+        return csv.Sniffer().sniff(prima_riga, delimiters=",;\t").delimiter
+    except csv.Error:
+        return ","
+
+
+def _leggi_excel_a_blocchi(file, righe_per_blocco):
+    from openpyxl import load_workbook
+
+    cartella = load_workbook(file, read_only=True, data_only=True)
+    try:
+        foglio = cartella.active
+        righe = foglio.iter_rows(values_only=True)
+        intestazione = next(righe, None)
+        if intestazione is None:
+            return
+        colonne = [str(c).strip() if c is not None else f"colonna_{i}" for i, c in enumerate(intestazione)]
+        blocco = []
+        for riga in righe:
+            if all(v is None for v in riga):
+                continue
+            blocco.append(riga)
+            if len(blocco) >= righe_per_blocco:
+                yield pd.DataFrame(blocco, columns=colonne)
+                blocco = []
+        if blocco:
+            yield pd.DataFrame(blocco, columns=colonne)
+    finally:
+        cartella.close()
+
+
+def leggi_a_blocchi(file, nome_file, righe_per_blocco=RIGHE_PER_BLOCCO):
+    """
+    Restituisce un iteratore di DataFrame da al più `righe_per_blocco` righe.
+    Il formato è dedotto dall'estensione di `nome_file` (.csv, .txt, .xlsx, .xlsm).
+    """
+    estensione = nome_file.rsplit(".", 1)[-1].lower()
+    if estensione in ("xlsx", "xlsm"):
+        return _leggi_excel_a_blocchi(file, righe_per_blocco)
+    if estensione in ("csv", "txt"):
+        separatore = _rileva_separatore(file)
+        return pd.read_csv(
+            file,
+            sep=separatore,
+            chunksize=righe_per_blocco,
+            dtype=str,
+            keep_default_na=False,
+            encoding="utf-8-sig",
+        )
+    raise ValueError(f"Formato file non supportato: .{estensione} (usare CSV o Excel)")
+
+
+def stima_avanzamento(file, righe_elaborate, righe_totali=None):
+    """
+    Frazione (0–1) del file già elaborata: per i CSV dalla posizione di lettura,
+    per Excel dal numero di righe dichiarato nel foglio (`righe_totali`).
+    """
+    if righe_totali:
+        return min(righe_elaborate / righe_totali, 1.0)
+    dimensione = getattr(file, "size", None)
+    if not dimensione:
+        return 0.0
+    return min(file.tell() / dimensione, 1.0)
+
+
+def conta_righe_excel(file):
+    """Numero di righe dati dichiarato nel foglio attivo (senza leggerlo tutto)."""
+    from openpyxl import load_workbook
+
+    inizio = file.tell()
+    cartella = load_workbook(file, read_only=True)
+    try:
+        return max((cartella.active.max_row or 1) - 1, 0)
+    finally:
+        cartella.close()
+        file.seek(inizio)
+
+
+def _colonna_numerica(serie):
+    """Converte una colonna in float accettando sia '1234.56' sia il formato italiano '1.234,56'."""
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.fillna(0.0).astype(np.float64)
+    testo = serie.fillna("").astype(str).str.strip()
+    italiano = testo.str.contains(",", regex=False)
+    testo = testo.where(~italiano, testo.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(testo.replace("", "0"), errors="raise").astype(np.float64)
+
+
+def _colonna_booleana(serie):
+    if pd.api.types.is_bool_dtype(serie):
+        return serie
+    return serie.fillna("").astype(str).str.strip().str.lower().isin(VALORI_VERO)
+
+
+def prepara_ingresso(blocco):
+    """Colonne di calcolo di un blocco del file paghe, convertite in numeri e booleani."""
+    blocco = blocco.rename(columns=lambda c: str(c).strip())
+    if "compenso_lordo" not in blocco.columns:
+        raise ValueError("Colonna obbligatoria mancante: compenso_lordo")
+    ingresso = pd.DataFrame(
+        {"compenso_lordo": _colonna_numerica(blocco["compenso_lordo"])},
+        index=blocco.index,
+    )
+    if "altra_previdenza" in blocco:
+        ingresso["altra_previdenza"] = _colonna_booleana(blocco["altra_previdenza"])
+    for colonna in ("addizionali_reg", "addizionali_com"):
+        if colonna in blocco:
+            ingresso[colonna] = _colonna_numerica(blocco[colonna])
+    # Codici ISTAT per le addizionali da tabella (simulatore.addizionali)
+    for colonna in COLONNE_CODICI:
+        if colonna in blocco:
+            ingresso[colonna] = blocco[colonna]
+    return ingresso
+
+
+def leggi_elenco(percorso, chiave="codice_fiscale"):
+    """
+    Legge un elenco contratti (CSV/Excel) a blocchi: la colonna `chiave` che identifica il
+    collaboratore, nome se presente e le colonne di calcolo di prepara_ingresso.
+    """
+    parti = []
+    with open(percorso, "rb") as file:
+        for blocco in leggi_a_blocchi(file, str(percorso)):
+            blocco = blocco.rename(columns=lambda c: str(c).strip())
+            if chiave not in blocco:
+                raise ValueError(f"Colonna obbligatoria mancante: {chiave}")
+            ingresso = prepara_ingresso(blocco)
+            # "string" conserva le celle vuote come NA (astype(str) le renderebbe "nan")
+            ingresso.insert(0, chiave, blocco[chiave].astype("string").str.strip())
+            if "nome" in blocco:
+                ingresso.insert(1, "nome", blocco["nome"].astype("string").str.strip())
+            parti.append(ingresso)
+    if not parti:
+        raise ValueError("Elenco vuoto")
+    return pd.concat(parti, ignore_index=True)
+
+
+def calcola_blocco(blocco, decimali=2, anno=ANNO_DEFAULT):
+    """
+    Calcola un blocco del file paghe: restituisce le colonne non di calcolo
+    (nome, codice fiscale, ...) seguite da tutte le colonne dei risultati.
+    """
+    blocco = blocco.rename(columns=lambda c: str(c).strip())
+    risultati = calcola_cococo_sportivo_df(prepara_ingresso(blocco), anno)
+    if decimali is not None:
+        risultati = risultati.round(decimali)
+    extra = blocco[[c for c in blocco.columns if c not in COLONNE_RISULTATO]]
+    return pd.concat([extra, risultati], axis=1)
+
+
+class ScrittoreRisultati:
+    """
+    Scrive i blocchi calcolati su un file binario aperto, in CSV o in Excel.
+    Per Excel usa la modalità write-only di openpyxl, che non tiene le righe in memoria.
+    """
+
+    __slots__ = ("file", "formato", "separatore", "_intestazione_scritta", "_cartella", "_foglio")
+
+    def __init__(self, file, formato="csv", separatore=";"):
+        if formato not in ("csv", "xlsx"):
+            raise ValueError(f"Formato di uscita non supportato: {formato}")
+        self.file = file
+        self.formato = formato
+        self.separatore = separatore
+        self._intestazione_scritta = False
+        self._cartella = None
+        self._foglio = None
+        if formato == "xlsx":
+            from openpyxl import Workbook
+
+            self._cartella = Workbook(write_only=True)
+            self._foglio = self._cartella.create_sheet("Risultati")
+
+    def scrivi(self, blocco):
+        if self.formato == "csv":
+            testo = io.StringIO()
+            blocco.to_csv(testo, sep=self.separatore, index=False, header=not self._intestazione_scritta)
+            self.file.write(testo.getvalue().encode("utf-8"))
+        else:
+            if not self._intestazione_scritta:
+                self._foglio.append([str(c) for c in blocco.columns])
+            for riga in blocco.itertuples(index=False, name=None):
+                self._foglio.append(list(riga))
+        self._intestazione_scritta = True
+
+    def chiudi(self):
+        if self._cartella is not None:
+            self._cartella.save(self.file)
+            self._cartella = None
+
+
+def elabora_file(file, nome_file, uscita, formato_uscita="csv", righe_per_blocco=RIGHE_PER_BLOCCO, decimali=2,
+                 anno=ANNO_DEFAULT):
+    """
+    Elabora un intero file paghe a blocchi scrivendo i risultati su `uscita`.
+    È un generatore: dopo ogni blocco restituisce il numero di righe elaborate fino a quel momento,
+    così l'interfaccia può aggiornare la barra di avanzamento.
+    """
+    scrittore = ScrittoreRisultati(uscita, formato_uscita)
+    righe = 0
+    for blocco in leggi_a_blocchi(file, nome_file, righe_per_blocco):
+        scrittore.scrivi(calcola_blocco(blocco, decimali, anno))
+        righe += len(blocco)
+        yield righe
+    scrittore.chiudi()
@@ -0,0 +1,131 @@
+"""
+Formattazione di intere colonne di importi e percentuali in un solo passaggio vettoriale.
+
+I valori vengono arrotondati a interi (centesimi per gli importi) e le cifre raggruppate
+per migliaia con tabelle precalcolate ("000"…"999"), senza f-string né replace per valore.
+Con il formato italiano il risultato è identico byte per byte a formatta_euro e
+formatta_percentuale: i pochi valori il cui arrotondamento binario è ambiguo (es. 0,005),
+oltre a NaN, infiniti e importi oltre 10^13, passano dalla formattazione scalare di Python.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+_TRE_CIFRE = np.array([f"{i:03d}" for i in range(1000)])
+_SENZA_ZERI = np.array([str(i) for i in range(1000)])
+_LIMITE_ESATTO = 1e13  # oltre, gli interi scalati non sono più esatti in float64
+
+
+@lru_cache(maxsize=None)
+def _cifre_decimali(decimali):
+    """Tabella "00"…"99" (o "000"…"999", ...) per le parti decimali fino a 4 cifre."""
+    return np.array([f"{i:0{decimali}d}" for i in range(10 ** decimali)])
+
+
+class FormatoNumerico:
+    """
+    Regole di un formato: separatori, prefisso/suffisso e decimali.
+
+    `formatta` lavora su un valore, `formatta_array` su un array o una colonna e
+    restituisce un array NumPy di stringhe con lo stesso risultato.
+    """
+
+    __slots__ = ("separatore_migliaia", "separatore_decimali", "prefisso", "suffisso", "decimali", "_traduzione")
+
+    def __init__(self, separatore_migliaia=".", separatore_decimali=",", prefisso="", suffisso="", decimali=2):
+        self.separatore_migliaia = separatore_migliaia
+        self.separatore_decimali = separatore_decimali
+        self.prefisso = prefisso
+        self.suffisso = suffisso
+        self.decimali = int(decimali)
+        self._traduzione = str.maketrans({",": separatore_migliaia or "", ".": separatore_decimali})
+
+    def __repr__(self):
+        return (
+            f"FormatoNumerico({self.separatore_migliaia!r}, {self.separatore_decimali!r}, "
+            f"prefisso={self.prefisso!r}, suffisso={self.suffisso!r}, decimali={self.decimali})"
+        )
+
+    def con_decimali(self, decimali):
+        """Stesso formato con un altro numero di decimali."""
+        return FormatoNumerico(self.separatore_migliaia, self.separatore_decimali, self.prefisso, self.suffisso, decimali)
+
+    def formatta(self, valore):
+        gruppi = "," if self.separatore_migliaia else ""
+        testo = f"{valore:{gruppi}.{self.decimali}f}".translate(self._traduzione)
+        return f"{self.prefisso}{testo}{self.suffisso}"
+
+    def formatta_array(self, valori):
+        valori = np.asarray(valori, dtype=np.float64)
+        forma = valori.shape
+        valori = valori.ravel()
+        if valori.size == 0:
+            return np.array([], dtype=str).reshape(forma)
+        scala = 10 ** self.decimali
+        assoluti = np.abs(valori)
+        scalati = assoluti * scala
+        arrotondati = np.rint(scalati)
+        # Vicino a ,5 l'arrotondamento del prodotto può differire da quello esatto del valore
+        with np.errstate(invalid="ignore"):
+            ambigui = np.abs(scalati - np.floor(scalati) - 0.5) <= 1e-9 + scalati * 1e-15
+        scalare = ~np.isfinite(valori) | (assoluti >= _LIMITE_ESATTO) | ambigui
+        interi = np.where(scalare, 0.0, arrotondati).astype(np.int64)
+
+        parte_intera, parte_decimale = np.divmod(interi, scala)
+        testo = self._raggruppa(parte_intera)
+        if self.decimali:
+            if self.decimali <= 4:
+                decimali = _cifre_decimali(self.decimali)[parte_decimale]
+            else:
+                decimali = np.char.zfill(parte_decimale.astype(str), self.decimali)
+            testo = np.char.add(np.char.add(testo, self.separatore_decimali), decimali)
+        testo = np.where(np.signbit(valori), np.char.add("-", testo), testo)
+        testo = np.char.add(np.char.add(self.prefisso, testo), self.suffisso) if self.prefisso or self.suffisso else testo
+
+        if scalare.any():
+            testo = testo.astype(object)
+            testo[scalare] = [self.formatta(v) for v in valori[scalare].tolist()]
+            testo = testo.astype(str)
+        return testo.reshape(forma)
+
+    def _raggruppa(self, interi):
+        """Interi non negativi → stringhe con il separatore delle migliaia (tabelle da 1000 voci)."""
+        livelli = 1
+        massimo = int(interi.max()) if interi.size else 0
+        while massimo >= 1000 ** livelli:
+            livelli += 1
+        gruppi = [(interi // 1000 ** k) % 1000 for k in range(livelli)]
+        numero_gruppi = np.ones(interi.shape, dtype=np.int64)
+        for k in range(1, livelli):
+            numero_gruppi += interi >= 1000 ** k
+        # Dal gruppo più alto al più basso: il primo senza zeri iniziali, gli altri a tre cifre
+        testo = _SENZA_ZERI[gruppi[-1]]
+        for k in range(livelli - 2, -1, -1):
+            seguito = np.char.add(np.char.add(testo, self.separatore_migliaia), _TRE_CIFRE[gruppi[k]])
+            testo = np.where(numero_gruppi > k + 1, seguito, np.where(numero_gruppi == k + 1, _SENZA_ZERI[gruppi[k]], testo))
+        return testo
+
+
+# Formati predefiniti per lingua; "it" coincide con formatta_euro / formatta_percentuale
+FORMATI_EURO = {
+    "it": FormatoNumerico(".", ",", prefisso="€ "),
+    "en": FormatoNumerico(",", ".", prefisso="€"),
+    "de": FormatoNumerico(".", ",", suffisso=" €"),
+    "fr": FormatoNumerico(" ", ",", suffisso=" €"),
+}
+FORMATI_PERCENTUALE = {
+    "it": FormatoNumerico("", ",", suffisso="%"),
+    "en": FormatoNumerico("", ".", suffisso="%"),
+    "de": FormatoNumerico("", ",", suffisso=" %"),
+    "fr": FormatoNumerico("", ",", suffisso=" %"),
+}
+
+
+def formatta_euro_array(valori, lingua="it"):
+    """Versione vettoriale di formatta_euro (identica per lingua="it")."""
+    return FORMATI_EURO[lingua].formatta_array(valori)
+
+
+def formatta_percentuale_array(valori, decimali=2, lingua="it"):
+    """Versione vettoriale di formatta_percentuale (identica per lingua="it")."""
+    return FORMATI_PERCENTUALE[lingua].con_decimali(decimali).formatta_array(valori)
@@ -0,0 +1,206 @@
+"""
+Pianificazione della stagione con simulazione Monte Carlo: compensi incerti per
+collaboratore, percentili del costo totale della società e dei contributi a suo carico.
+
+    python -m simulatore.montecarlo collaboratori.csv [--scenari 10000] [--seme 0]
+        [--anno 2025] [--processi 4] [--budget 250000]
+
+L'elenco ha una riga per collaboratore con compenso_min, compenso_atteso e compenso_max
+(distribuzione triangolare), oppure ore_min, ore_attese, ore_max e tariffa_oraria, oppure
+il solo compenso_lordo (importo certo); altra_previdenza, addizionali_reg e addizionali_com
+sono facoltative come nel file paghe.
+
+Gli scenari sono estratti a blocchi: ogni blocco ha un proprio flusso casuale derivato
+da (seme, numero del blocco) ed è calcolato in un solo passaggio vettoriale scenari ×
+collaboratori, quindi la memoria dipende dalla dimensione del blocco e i risultati non
+cambiano con il numero di processi del pool.
+"""
+import argparse
+import os
+import sys
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from .batch import calcola_cococo_sportivo_batch
+from .calcolo import ANNI_DISPONIBILI, ANNO_DEFAULT, formatta_euro, formatta_percentuale
+from .file_paghe import _colonna_booleana, _colonna_numerica, leggi_a_blocchi
+from .strumentazione import cronometra
+
+ELEMENTI_PER_BLOCCO = 1 << 18  # scenari × collaboratori calcolati insieme (~50 MB di lavoro)
+PERCENTILI = (5, 25, 50, 75, 95)
+
+# Totali per scenario, sommati su tutti i collaboratori
+COLONNE_SCENARIO = (
+    "compenso_lordo",
+    "contributi_societa",
+    "costo_totale_societa",
+    "contributi_lavoratore",
+    "totale_imposte",
+    "netto_lavoratore",
+)
+
+
+def _colonna(blocco, nome, predefinito=0.0):
+    """Colonna numerica con le regole del file paghe (anche "1.234,56"), o il valore predefinito."""
+    if nome not in blocco:
+        return np.full(len(blocco), predefinito)
+    return _colonna_numerica(blocco[nome]).to_numpy()
+
+
+def prepara_distribuzioni(elenco):
+    """
+    DataFrame dell'elenco → DataFrame con minimo, atteso, massimo, altra_previdenza,
+    addizionali_reg e addizionali_com per collaboratore (indice originale).
+    """
+    elenco = elenco.rename(columns=lambda c: str(c).strip())
+    if {"compenso_min", "compenso_atteso", "compenso_max"} <= set(elenco.columns):
+        minimo, atteso, massimo = (_colonna(elenco, c) for c in ("compenso_min", "compenso_atteso", "compenso_max"))
+    elif {"ore_min", "ore_attese", "ore_max", "tariffa_oraria"} <= set(elenco.columns):
+        tariffa = _colonna(elenco, "tariffa_oraria")
+        minimo, atteso, massimo = (_colonna(elenco, c) * tariffa for c in ("ore_min", "ore_attese", "ore_max"))
+    elif "compenso_lordo" in elenco:
+        minimo = atteso = massimo = _colonna(elenco, "compenso_lordo")
+    else:
+        raise ValueError(
+            "Colonne mancanti: compenso_min/compenso_atteso/compenso_max, "
+            "ore_min/ore_attese/ore_max/tariffa_oraria oppure compenso_lordo"
+        )
+    if np.any(minimo < 0) or np.any(~((minimo <= atteso) & (atteso <= massimo))):
+        raise ValueError("Per ogni collaboratore serve 0 ≤ minimo ≤ atteso ≤ massimo")
+
+    altra = (
+        _colonna_booleana(elenco["altra_previdenza"]).to_numpy(dtype=bool) if "altra_previdenza" in elenco
+        else np.zeros(len(elenco), dtype=bool)
+    )
+    return pd.DataFrame({
+        "minimo": minimo,
+        "atteso": atteso,
+        "massimo": massimo,
+        "altra_previdenza": altra,
+        "addizionali_reg": _colonna(elenco, "addizionali_reg"),
+        "addizionali_com": _colonna(elenco, "addizionali_com"),
+    }, index=elenco.index)
+
+
+def estrai_triangolare(uniformi, minimo, atteso, massimo):
+    """
+    Inversa della funzione di ripartizione triangolare applicata a estrazioni uniformi
+    in [0, 1); con minimo = massimo restituisce l'importo certo.
+    """
+    minimo, atteso, massimo = (np.asarray(v, dtype=np.float64) for v in (minimo, atteso, massimo))
+    ampiezza = massimo - minimo
+    with np.errstate(divide="ignore", invalid="ignore"):
+        moda = np.where(ampiezza > 0, (atteso - minimo) / ampiezza, 0.0)
+    sinistra = minimo + np.sqrt(uniformi * ampiezza * (atteso - minimo))
+    destra = massimo - np.sqrt((1.0 - uniformi) * ampiezza * (massimo - atteso))
+    return np.where(uniformi < moda, sinistra, destra)
+
+
+def simula_blocco(lavoro):
+    """
+    Scenari di un blocco: (numero blocco, scenari, seme, distribuzioni come dict di array, anno)
+    → dict di COLONNE_SCENARIO con un totale per scenario. Funzione di modulo per poter
+    essere eseguita nei processi del pool.
+    """
+    indice, scenari, seme, d, anno = lavoro
+    rng = np.random.default_rng(np.random.SeedSequence(seme, spawn_key=(indice,)))
+    uniformi = rng.random((scenari, d["minimo"].size))
+    compensi = estrai_triangolare(uniformi, d["minimo"], d["atteso"], d["massimo"]).round(2)
+    risultati = calcola_cococo_sportivo_batch(
+        compensi, d["altra_previdenza"], d["addizionali_reg"], d["addizionali_com"], anno
+    )
+    return {colonna: risultati[colonna].sum(axis=1) for colonna in COLONNE_SCENARIO}
+
+
+@cronometra()
+def simula_stagione(distribuzioni, scenari=10_000, seme=0, anno=ANNO_DEFAULT, processi=None,
+                    elementi_per_blocco=ELEMENTI_PER_BLOCCO):
+    """
+    Simula `scenari` stagioni e restituisce un DataFrame con una riga per scenario e i totali
+    della società (COLONNE_SCENARIO). A parità di seme, scenari e dimensione del blocco il
+    risultato è identico con qualunque numero di `processi` (default: numero di CPU).
+    """
+    if scenari <= 0:
+        raise ValueError("Il numero di scenari deve essere positivo")
+    if anno not in ANNI_DISPONIBILI:
+        raise KeyError(f"Anno d'imposta non configurato: {anno}")
+    persone = max(len(distribuzioni), 1)
+    per_blocco = max(1, elementi_per_blocco // persone)
+    d = {
+        "minimo": distribuzioni["minimo"].to_numpy(dtype=np.float64),
+        "atteso": distribuzioni["atteso"].to_numpy(dtype=np.float64),
+        "massimo": distribuzioni["massimo"].to_numpy(dtype=np.float64),
+        "altra_previdenza": distribuzioni["altra_previdenza"].to_numpy(dtype=bool),
+        "addizionali_reg": distribuzioni["addizionali_reg"].to_numpy(dtype=np.float64),
+        "addizionali_com": distribuzioni["addizionali_com"].to_numpy(dtype=np.float64),
+    }
+    lavori = [
+        (i, min(per_blocco, scenari - inizio), seme, d, anno)
+        for i, inizio in enumerate(range(0, scenari, per_blocco))
+    ]
+
+    processi = min(processi or os.cpu_count() or 1, len(lavori))
+    if processi > 1:
+        with Pool(processi) as pool:
+            blocchi = pool.map(simula_blocco, lavori, chunksize=1)
+    else:
+        blocchi = [simula_blocco(lavoro) for lavoro in lavori]
+    return pd.DataFrame(
+        {colonna: np.concatenate([b[colonna] for b in blocchi]) for colonna in COLONNE_SCENARIO},
+        columns=list(COLONNE_SCENARIO),
+    )
+
+
+def riepilogo_percentili(scenari, percentili=PERCENTILI):
+    """Percentili (righe "P5", "P50", ...) e media di ogni totale degli scenari."""
+    valori = np.percentile(scenari[list(COLONNE_SCENARIO)].to_numpy(), percentili, axis=0)
+    riepilogo = pd.DataFrame(valori, index=[f"P{p:g}" for p in percentili], columns=list(COLONNE_SCENARIO))
+    riepilogo.loc["media"] = scenari[list(COLONNE_SCENARIO)].mean()
+    return riepilogo
+
+
+def probabilita_entro_budget(scenari, budget):
+    """Quota degli scenari in cui il costo totale della società non supera `budget`."""
+    return float((scenari["costo_totale_societa"] <= budget).mean())
+
+
+def leggi_distribuzioni(percorso):
+    """Legge l'elenco (CSV/Excel) e ne ricava le distribuzioni per collaboratore."""
+    with open(percorso, "rb") as file:
+        parti = [prepara_distribuzioni(blocco) for blocco in leggi_a_blocchi(file, str(percorso))]
+    if not parti:
+        raise ValueError("Elenco vuoto")
+    return pd.concat(parti, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m simulatore.montecarlo",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("elenco", help="file collaboratori CSV o Excel")
+    parser.add_argument("--scenari", type=int, default=10_000)
+    parser.add_argument("--seme", type=int, default=0, help="seme del generatore casuale")
+    parser.add_argument("--anno", type=int, choices=ANNI_DISPONIBILI, default=ANNO_DEFAULT)
+    parser.add_argument("--processi", type=int, help="processi del pool (default: numero di CPU)")
+    parser.add_argument("--budget", type=float, help="stima la probabilità di restare entro il budget")
+    args = parser.parse_args(argv)
+
+    try:
+        scenari = simula_stagione(leggi_distribuzioni(args.elenco), args.scenari, args.seme, args.anno, args.processi)
+    except (ValueError, KeyError, OSError) as errore:
+        print(f"Errore: {errore}", file=sys.stderr)
+        return 1
+    riepilogo = riepilogo_percentili(scenari)
+    print(riepilogo[["costo_totale_societa", "contributi_societa", "netto_lavoratore"]].round(2).to_string())
+    if args.budget is not None:
+        quota = probabilita_entro_budget(scenari, args.budget)
+        print(f"Costo entro {formatta_euro(args.budget)} nel {formatta_percentuale(quota * 100, 1)} degli scenari")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,215 @@
+"""
+Parametri normativi per anno d'imposta.
+
+Le regole sono lette dalla sezione [regole] di config.toml (o dal file indicato dalla
+variabile d'ambiente SIMULATORE_CONFIG), validate una sola volta all'import e compilate
+in oggetti immutabili con __slots__, letti dal calcolo come semplici attributi.
+"""
+import os
+from bisect import bisect_left
+from fractions import Fraction
+from pathlib import Path
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+PERCORSO_CONFIG = Path(__file__).resolve().parent.parent / "config.toml"
+
+
+class ScaglioniIrpef:
+    """
+    Tabella degli scaglioni IRPEF come funzione lineare a tratti.
+
+    `soglie` sono i limiti superiori degli scaglioni (l'ultimo è illimitato),
+    `aliquote` le aliquote marginali in forma decimale (una in più delle soglie).
+    L'imposta cumulata a ogni soglia è calcolata una sola volta alla creazione:
+    la valutazione scalare usa bisect, quella su array numpy.searchsorted.
+    """
+
+    __slots__ = ("soglie", "aliquote", "cumulate", "_inizi", "_array")
+
+    def __init__(self, soglie, aliquote):
+        soglie = tuple(float(s) for s in soglie)
+        aliquote = tuple(float(a) for a in aliquote)
+        if len(aliquote) != len(soglie) + 1:
+            raise ValueError("Serve un'aliquota per ogni scaglione: len(aliquote) == len(soglie) + 1")
+        if any(b <= a for a, b in zip((0.0,) + soglie, soglie)):
+            raise ValueError("Le soglie degli scaglioni devono essere positive e crescenti")
+
+        inizi = (0.0,) + soglie
+        cumulate = [0.0]
+        for i in range(len(soglie)):
+            cumulate.append(cumulate[-1] + (inizi[i + 1] - inizi[i]) * aliquote[i])
+
+        self.soglie = soglie
+        self.aliquote = aliquote
+        self.cumulate = tuple(cumulate)
+        self._inizi = inizi
+        self._array = None
+
+    def __repr__(self):
+        return f"ScaglioniIrpef(soglie={self.soglie!r}, aliquote={self.aliquote!r})"
+
+    def imposta(self, reddito_imponibile):
+        """IRPEF lorda su un singolo reddito (ricerca binaria dello scaglione)."""
+        if reddito_imponibile <= 0:
+            return 0.0
+        i = bisect_left(self.soglie, reddito_imponibile)
+        return self.cumulate[i] + (reddito_imponibile - self._inizi[i]) * self.aliquote[i]
+
+    def imposta_array(self, redditi):
+        """IRPEF lorda su un array di redditi (numpy.searchsorted)."""
+        import numpy as np  # importato solo per il calcolo vettoriale
+
+        if self._array is None:
+            self._array = tuple(np.array(v) for v in (self.soglie, self._inizi, self.aliquote, self.cumulate))
+        soglie, inizi, aliquote, cumulate = self._array
+        r = np.asarray(redditi, dtype=np.float64)
+        i = np.searchsorted(soglie, r, side="left")
+        irpef = cumulate[i] + (r - inizi[i]) * aliquote[i]
+        return np.where(r <= 0, 0.0, irpef)
+
+
+class RegoleAnno:
+    """
+    Parametri di un anno d'imposta, immutabili dopo la creazione.
+
+    Le ripartizioni dei contributi sono frazioni (numeratore, denominatore) applicate come
+    `totale * numeratore / denominatore`, così 1/3 e 2/3 restano esatte.
+    """
+
+    __slots__ = (
+        "anno",
+        "franchigia_fiscale",
+        "franchigia_contributiva",
+        "riduzione_base_contributiva",
+        "aliquota_ivs",
+        "aliquota_ivs_altra_previdenza",
+        "aliquota_aggiuntiva",
+        "quota_lavoratore_num",
+        "quota_lavoratore_den",
+        "quota_societa_num",
+        "quota_societa_den",
+        "scaglioni_irpef",
+    )
+
+    def __init__(self, anno, franchigia_fiscale, franchigia_contributiva, riduzione_base_contributiva,
+                 aliquota_ivs, aliquota_ivs_altra_previdenza, aliquota_aggiuntiva,
+                 ripartizione_lavoratore, ripartizione_societa, scaglioni_irpef):
+        valori = {
+            "anno": int(anno),
+            "franchigia_fiscale": float(franchigia_fiscale),
+            "franchigia_contributiva": float(franchigia_contributiva),
+            "riduzione_base_contributiva": float(riduzione_base_contributiva),
+            "aliquota_ivs": float(aliquota_ivs),
+            "aliquota_ivs_altra_previdenza": float(aliquota_ivs_altra_previdenza),
+            "aliquota_aggiuntiva": float(aliquota_aggiuntiva),
+            "quota_lavoratore_num": float(ripartizione_lavoratore[0]),
+            "quota_lavoratore_den": float(ripartizione_lavoratore[1]),
+            "quota_societa_num": float(ripartizione_societa[0]),
+            "quota_societa_den": float(ripartizione_societa[1]),
+            "scaglioni_irpef": scaglioni_irpef,
+        }
+        for nome, valore in valori.items():
+            object.__setattr__(self, nome, valore)
+
+    def __setattr__(self, nome, valore):
+        raise AttributeError(f"RegoleAnno è immutabile: impossibile modificare {nome}")
+
+    def __repr__(self):
+        return f"RegoleAnno(anno={self.anno})"
+
+    def aliquota_ivs_per(self, altra_previdenza):
+        return self.aliquota_ivs_altra_previdenza if altra_previdenza else self.aliquota_ivs
+
+
+def _frazione(valore, contesto):
+    if not (isinstance(valore, list) and len(valore) == 2 and all(isinstance(v, int) for v in valore)):
+        raise ValueError(f"{contesto}: attesa una frazione [numeratore, denominatore] di interi")
+    if valore[1] <= 0 or valore[0] < 0:
+        raise ValueError(f"{contesto}: frazione non valida {valore}")
+    return Fraction(valore[0], valore[1])
+
+
+def compila_regole(anno, dati, origine="config.toml"):
+    """Valida il dizionario di un anno letto dal TOML e restituisce la RegoleAnno corrispondente."""
+    contesto = f"{origine}, regole.{anno}"
+    obbligatori = (
+        "franchigia_fiscale", "franchigia_contributiva", "riduzione_base_contributiva",
+        "aliquota_ivs", "aliquota_ivs_altra_previdenza", "aliquota_aggiuntiva",
+        "ripartizione_lavoratore", "ripartizione_societa", "scaglioni_irpef", "aliquote_irpef",
+    )
+    mancanti = [k for k in obbligatori if k not in dati]
+    if mancanti:
+        raise ValueError(f"{contesto}: parametri mancanti {', '.join(mancanti)}")
+    sconosciuti = sorted(set(dati) - set(obbligatori))
+    if sconosciuti:
+        raise ValueError(f"{contesto}: parametri sconosciuti {', '.join(sconosciuti)}")
+
+    numerici = obbligatori[:6]
+    for chiave in numerici:
+        if not isinstance(dati[chiave], (int, float)) or isinstance(dati[chiave], bool) or dati[chiave] < 0:
+            raise ValueError(f"{contesto}: {chiave} deve essere un numero non negativo")
+    if not 0 < dati["riduzione_base_contributiva"] <= 1:
+        raise ValueError(f"{contesto}: riduzione_base_contributiva deve essere in (0, 1]")
+    for chiave in ("aliquota_ivs", "aliquota_ivs_altra_previdenza", "aliquota_aggiuntiva"):
+        if dati[chiave] > 100:
+            raise ValueError(f"{contesto}: {chiave} è una percentuale (0–100)")
+
+    lavoratore = _frazione(dati["ripartizione_lavoratore"], f"{contesto}, ripartizione_lavoratore")
+    societa = _frazione(dati["ripartizione_societa"], f"{contesto}, ripartizione_societa")
+    if lavoratore + societa != 1:
+        raise ValueError(f"{contesto}: le quote lavoratore e società devono sommare a 1")
+
+    if any(not 0 <= a <= 1 for a in dati["aliquote_irpef"]):
+        raise ValueError(f"{contesto}: aliquote_irpef vanno in forma decimale (0–1)")
+    try:
+        scaglioni = ScaglioniIrpef(dati["scaglioni_irpef"], dati["aliquote_irpef"])
+    except ValueError as errore:
+        raise ValueError(f"{contesto}: {errore}") from None
+
+    return RegoleAnno(
+        anno,
+        dati["franchigia_fiscale"],
+        dati["franchigia_contributiva"],
+        dati["riduzione_base_contributiva"],
+        dati["aliquota_ivs"],
+        dati["aliquota_ivs_altra_previdenza"],
+        dati["aliquota_aggiuntiva"],
+        dati["ripartizione_lavoratore"],
+        dati["ripartizione_societa"],
+        scaglioni,
+    )
+
+
+def carica_regole(percorso=None):
+    """
+    Legge e compila tutte le regole di config.toml.
+    Restituisce (regole per anno, anno di default).
+    """
+    percorso = Path(percorso or os.environ.get("SIMULATORE_CONFIG") or PERCORSO_CONFIG)
+    with open(percorso, "rb") as f:
+        configurazione = tomllib.load(f)
+    sezione = configurazione.get("regole")
+    if not isinstance(sezione, dict):
+        raise ValueError(f"{percorso.name}: sezione [regole] mancante")
+
+    anno_default = sezione.get("anno_default")
+    regole = {}
+    for chiave, dati in sezione.items():
+        if chiave == "anno_default":
+            continue
+        if not chiave.isdigit() or not isinstance(dati, dict):
+            raise ValueError(f"{percorso.name}: regole.{chiave} non è un anno d'imposta")
+        regole[int(chiave)] = compila_regole(int(chiave), dati, percorso.name)
+    if not regole:
+        raise ValueError(f"{percorso.name}: nessun anno d'imposta in [regole]")
+    if anno_default not in regole:
+        raise ValueError(f"{percorso.name}: regole.anno_default deve essere uno degli anni definiti")
+    return dict(sorted(regole.items())), anno_default
+
+
+REGOLE, ANNO_DEFAULT = carica_regole()
+ANNI_DISPONIBILI = tuple(REGOLE)
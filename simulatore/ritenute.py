@@ -0,0 +1,137 @@
+"""
+Ritenute mese per mese con il metodo progressivo del sostituto d'imposta.
+
+A ogni pagamento la società ricalcola il carico sul compenso cumulato dell'anno e trattiene
+la differenza rispetto a quanto già trattenuto: le franchigie di 15.000€ e 5.000€ si
+consumano man mano che arrivano i pagamenti. Per ogni collaboratore si conserva solo uno
+stato compatto con i cumulati, quindi ogni nuovo pagamento costa O(1).
+"""
+from .calcolo import ANNO_DEFAULT, REGOLE, calcola_cococo_sportivo
+from .strumentazione import cronometra
+
+# Codici tributo F24 indicati nell'interfaccia (sezione "Obblighi fiscali e scadenze")
+CODICE_F24_RITENUTE = "1040"
+CODICE_F24_CONTRIBUTI = "4104"
+
+
+class StatoCollaboratore:
+    """Cumulati dell'anno per un collaboratore: è tutto ciò che serve per il pagamento successivo."""
+
+    __slots__ = (
+        "regole",
+        "altra_previdenza",
+        "addizionali_reg",
+        "addizionali_com",
+        "compenso",
+        "contributi_lavoratore",
+        "contributi_societa",
+        "irpef",
+        "addizionali",
+    )
+
+    def __init__(self, regole, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0):
+        self.regole = regole
+        self.altra_previdenza = altra_previdenza
+        self.addizionali_reg = addizionali_reg
+        self.addizionali_com = addizionali_com
+        self.compenso = 0.0
+        self.contributi_lavoratore = 0.0
+        self.contributi_societa = 0.0
+        self.irpef = 0.0
+        self.addizionali = 0.0
+
+    @property
+    def franchigia_fiscale_residua(self):
+        return max(0.0, self.regole.franchigia_fiscale - self.compenso)
+
+    @property
+    def franchigia_contributiva_residua(self):
+        return max(0.0, self.regole.franchigia_contributiva - self.compenso)
+
+
+class RitenuteProgressive:
+    """
+    Motore incrementale per un anno d'imposta: uno stato per collaboratore, aggiornato
+    a ogni pagamento con registra_pagamento().
+    """
+
+    def __init__(self, anno=ANNO_DEFAULT):
+        self.anno = anno
+        self.regole = REGOLE[anno]
+        self.stati = {}
+
+    def stato(self, codice, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0):
+        """Stato del collaboratore, creato al primo pagamento con i parametri indicati."""
+        stato = self.stati.get(codice)
+        if stato is None:
+            stato = self.stati[codice] = StatoCollaboratore(
+                self.regole, altra_previdenza, addizionali_reg, addizionali_com
+            )
+        return stato
+
+    def registra_pagamento(self, codice, importo, mese=None, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0):
+        """
+        Registra un pagamento lordo e restituisce le trattenute di quel pagamento, gli
+        importi F24 da versare (ritenute 1040, contributi INPS 4104) e le franchigie residue.
+        I parametri previdenziali e le addizionali sono quelli del primo pagamento dell'anno.
+        """
+        stato = self.stato(codice, altra_previdenza, addizionali_reg, addizionali_com)
+        cumulato = calcola_cococo_sportivo(
+            stato.compenso + importo, stato.altra_previdenza, stato.addizionali_reg, stato.addizionali_com, self.anno
+        )
+        addizionali = cumulato["addizionale_regionale"] + cumulato["addizionale_comunale"]
+
+        contributi_lavoratore = cumulato["contributi_lavoratore"] - stato.contributi_lavoratore
+        contributi_societa = cumulato["contributi_societa"] - stato.contributi_societa
+        irpef = cumulato["irpef"] - stato.irpef
+        ritenuta_addizionali = addizionali - stato.addizionali
+
+        stato.compenso = cumulato["compenso_lordo"]
+        stato.contributi_lavoratore = cumulato["contributi_lavoratore"]
+        stato.contributi_societa = cumulato["contributi_societa"]
+        stato.irpef = cumulato["irpef"]
+        stato.addizionali = addizionali
+
+        return {
+            "codice": codice,
+            "mese": mese,
+            "compenso_lordo": importo,
+            "contributi_lavoratore": contributi_lavoratore,
+            "contributi_societa": contributi_societa,
+            "irpef": irpef,
+            "addizionali": ritenuta_addizionali,
+            "netto_pagamento": importo - contributi_lavoratore - irpef - ritenuta_addizionali,
+            f"f24_{CODICE_F24_RITENUTE}": irpef,
+            f"f24_{CODICE_F24_CONTRIBUTI}": contributi_lavoratore + contributi_societa,
+            "compenso_cumulato": stato.compenso,
+            "franchigia_fiscale_residua": stato.franchigia_fiscale_residua,
+            "franchigia_contributiva_residua": stato.franchigia_contributiva_residua,
+        }
+
+
+@cronometra()
+def piano_mensile(compenso_annuo, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0, mensilita=12,
+                  anno=ANNO_DEFAULT):
+    """Ritenute mese per mese per un compenso annuo pagato in rate uguali."""
+    motore = RitenuteProgressive(anno)
+    rata = compenso_annuo / mensilita
+    return [
+        motore.registra_pagamento(None, rata, mese, altra_previdenza, addizionali_reg, addizionali_com)
+        for mese in range(1, mensilita + 1)
+    ]
+
+
+def versamenti_f24(ritenute):
+    """Totali F24 per mese (da versare entro il 16 del mese successivo) da un elenco di ritenute."""
+    totali = {}
+    for r in ritenute:
+        mese = totali.setdefault(r["mese"], {
+            "mese": r["mese"],
+            f"f24_{CODICE_F24_RITENUTE}": 0.0,
+            f"f24_{CODICE_F24_CONTRIBUTI}": 0.0,
+            "addizionali": 0.0,
+        })
+        mese[f"f24_{CODICE_F24_RITENUTE}"] += r[f"f24_{CODICE_F24_RITENUTE}"]
+        mese[f"f24_{CODICE_F24_CONTRIBUTI}"] += r[f"f24_{CODICE_F24_CONTRIBUTI}"]
+        mese["addizionali"] += r["addizionali"]
+    return list(totali.values())
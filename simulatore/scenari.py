@@ -0,0 +1,167 @@
+"""
+Confronto tra regimi: Co.Co.Co sportivo, Partita IVA forfettaria e lavoro sportivo subordinato.
+
+Tutti e tre i regimi sono calcolati in un unico passaggio vettoriale sugli stessi array:
+il compenso, le franchigie e la base contributiva del Co.Co.Co sono riusati dal lavoro
+subordinato, quindi confrontare un intero elenco costa poco più di un solo regime.
+
+Semplificazioni (come nel resto del simulatore): nessuna detrazione IRPEF, contributi
+forfettari dedotti nello stesso anno, nessuna rivalsa INPS del 4% in fattura.
+"""
+import numpy as np
+
+from .batch import calcola_cococo_sportivo_batch, calcola_irpef_batch
+from .calcolo import ANNO_DEFAULT, COLONNE_CODICI
+
+REGIMI = ("cococo", "forfettario", "subordinato")
+ETICHETTE_REGIMI = {
+    "cococo": "Co.Co.Co sportivo",
+    "forfettario": "Partita IVA forfettaria",
+    "subordinato": "Lavoro sportivo subordinato",
+}
+
+# Partita IVA forfettaria: nessuna franchigia sportiva (tabella di confronto dell'app),
+# contributi INPS gestione separata interamente a carico del collaboratore
+FORFETTARIO = {
+    "coefficiente_redditivita": 78.0,   # %, attività professionali
+    "aliquota_sostitutiva": 15.0,
+    "aliquota_sostitutiva_avvio": 5.0,  # primi 5 anni di attività
+    "aliquota_gestione_separata": 26.07,
+}
+
+# Lavoro sportivo subordinato nell'area del dilettantismo: stesse franchigie (15.000€ fiscale,
+# 5.000€ contributiva) e stessa base dimezzata del Co.Co.Co, aliquote IVS del lavoro dipendente
+SUBORDINATO = {
+    "aliquota_ivs_lavoratore": 9.19,
+    "aliquota_ivs_datore": 23.81,
+    "aliquota_minori_datore": 0.0,      # malattia, maternità, NASpI: dipendono dal CCNL
+    "quota_tfr": 6.91,                  # accantonamento TFR, costo della società
+}
+
+COLONNE_REGIME = (
+    "compenso_lordo",
+    "contributi_lavoratore",
+    "contributi_societa",
+    "altri_costi_societa",
+    "imposte",
+    "netto_lavoratore",
+    "costo_totale_societa",
+    "tax_rate",
+)
+
+
+def _tax_rate(trattenute, compenso):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tax_rate = np.clip(trattenute / compenso * 100.0, 0.0, 100.0)
+    return np.where(compenso > 0, tax_rate, 0.0)
+
+
+def confronta_regimi_batch(compenso_lordo, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0,
+                           anno=ANNO_DEFAULT, avvio_forfettario=False):
+    """
+    Calcola i tre regimi sugli stessi input (array o scalari, con broadcasting).
+    Restituisce {regime: {colonna: array}} con le colonne di COLONNE_REGIME per ogni regime in REGIMI.
+    """
+    cococo = calcola_cococo_sportivo_batch(compenso_lordo, altra_previdenza, addizionali_reg, addizionali_com, anno)
+    compenso = cococo["compenso_lordo"]
+    add_reg = np.asarray(addizionali_reg, dtype=np.float64)
+    add_com = np.asarray(addizionali_com, dtype=np.float64)
+    zeri = np.zeros(compenso.shape)
+
+    # PARTITA IVA FORFETTARIA: imposta sostitutiva al posto di IRPEF e addizionali
+    f = FORFETTARIO
+    reddito_forfettario = compenso * (f["coefficiente_redditivita"] / 100.0)
+    contributi_forfettario = reddito_forfettario * (f["aliquota_gestione_separata"] / 100.0)
+    aliquota_sostitutiva = np.where(avvio_forfettario, f["aliquota_sostitutiva_avvio"], f["aliquota_sostitutiva"])
+    imposta_sostitutiva = np.maximum(0.0, reddito_forfettario - contributi_forfettario) * (aliquota_sostitutiva / 100.0)
+    trattenute_forfettario = contributi_forfettario + imposta_sostitutiva
+
+    # SUBORDINATO: franchigie e base contributiva condivise con il Co.Co.Co
+    s = SUBORDINATO
+    base_piena = cococo["base_contrib_grezza"]
+    base_ridotta = cococo["base_contrib_ridotta"]
+    contributi_dipendente = base_ridotta * (s["aliquota_ivs_lavoratore"] / 100.0)
+    contributi_datore = (
+        base_ridotta * (s["aliquota_ivs_datore"] / 100.0) + base_piena * (s["aliquota_minori_datore"] / 100.0)
+    )
+    tfr = compenso * (s["quota_tfr"] / 100.0)
+    imponibile_subordinato = np.maximum(0.0, cococo["reddito_imponibile"] - contributi_dipendente)
+    imposte_subordinato = (
+        calcola_irpef_batch(imponibile_subordinato, anno)
+        + imponibile_subordinato * (add_reg / 100.0)
+        + imponibile_subordinato * (add_com / 100.0)
+    )
+    trattenute_subordinato = contributi_dipendente + imposte_subordinato
+
+    return {
+        "cococo": {
+            "compenso_lordo": compenso,
+            "contributi_lavoratore": cococo["contributi_lavoratore"],
+            "contributi_societa": cococo["contributi_societa"],
+            "altri_costi_societa": zeri,
+            "imposte": cococo["totale_imposte"],
+            "netto_lavoratore": cococo["netto_lavoratore"],
+            "costo_totale_societa": cococo["costo_totale_societa"],
+            "tax_rate": cococo["tax_rate"],
+        },
+        "forfettario": {
+            "compenso_lordo": compenso,
+            "contributi_lavoratore": contributi_forfettario,
+            "contributi_societa": zeri,
+            "altri_costi_societa": zeri,
+            "imposte": imposta_sostitutiva,
+            "netto_lavoratore": compenso - trattenute_forfettario,
+            "costo_totale_societa": compenso,
+            "tax_rate": _tax_rate(trattenute_forfettario, compenso),
+        },
+        "subordinato": {
+            "compenso_lordo": compenso,
+            "contributi_lavoratore": contributi_dipendente,
+            "contributi_societa": contributi_datore,
+            "altri_costi_societa": tfr,
+            "imposte": imposte_subordinato,
+            "netto_lavoratore": compenso - trattenute_subordinato,
+            "costo_totale_societa": compenso + contributi_datore + tfr,
+            "tax_rate": _tax_rate(trattenute_subordinato, compenso),
+        },
+    }
+
+
+def confronta_regimi(compenso_lordo, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0,
+                     anno=ANNO_DEFAULT, avvio_forfettario=False):
+    """Confronto per un singolo compenso: {regime: {colonna: float}}."""
+    risultati = confronta_regimi_batch(
+        compenso_lordo, altra_previdenza, addizionali_reg, addizionali_com, anno, avvio_forfettario
+    )
+    return {regime: {k: float(v) for k, v in colonne.items()} for regime, colonne in risultati.items()}
+
+
+def confronta_regimi_df(df, anno=ANNO_DEFAULT, avvio_forfettario=False):
+    """
+    Confronto per un intero elenco (colonne come calcola_cococo_sportivo_df). Restituisce un
+    DataFrame lungo con la colonna `regime` e l'indice originale ripetuto per ciascun regime.
+    Con codice_comune e/o codice_regione le addizionali vengono dalle tabelle a scaglioni.
+    """
+    import pandas as pd
+
+    if any(colonna in df for colonna in COLONNE_CODICI):
+        # Stesse aliquote da tabella di batch.calcola_cococo_sportivo_df
+        from .addizionali import risolvi_addizionali_df
+
+        df = risolvi_addizionali_df(df, anno)
+
+    n = len(df)
+    risultati = confronta_regimi_batch(
+        df["compenso_lordo"].to_numpy(dtype=np.float64),
+        df["altra_previdenza"].to_numpy(dtype=bool) if "altra_previdenza" in df else np.zeros(n, dtype=bool),
+        df["addizionali_reg"].to_numpy(dtype=np.float64) if "addizionali_reg" in df else np.zeros(n),
+        df["addizionali_com"].to_numpy(dtype=np.float64) if "addizionali_com" in df else np.zeros(n),
+        df["anno"].to_numpy(dtype=np.int64) if "anno" in df else anno,
+        avvio_forfettario,
+    )
+    confronto = pd.DataFrame(
+        {colonna: np.concatenate([risultati[r][colonna] for r in REGIMI]) for colonna in COLONNE_REGIME},
+        index=np.tile(df.index.to_numpy(), len(REGIMI)),
+    )
+    confronto.insert(0, "regime", np.repeat(REGIMI, n))
+    return confronto
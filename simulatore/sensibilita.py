@@ -0,0 +1,87 @@
+"""
+Analisi di sensibilità: netto, costo società, tax rate e aliquota marginale su una griglia
+fitta di compensi lordi, per entrambe le situazioni previdenziali, in un unico calcolo vettoriale.
+"""
+import numpy as np
+import pandas as pd
+
+from .batch import calcola_cococo_sportivo_batch
+from .calcolo import ANNO_DEFAULT, REGOLE
+
+COLONNE_SENSIBILITA = (
+    "compenso_lordo",
+    "altra_previdenza",
+    "netto_lavoratore",
+    "costo_totale_societa",
+    "tax_rate",
+    "aliquota_marginale",
+    "reddito_imponibile_netto",
+)
+
+
+def griglia_sensibilita(minimo=0.0, massimo=200000.0, passo=1.0, addizionali_reg=0.0, addizionali_com=0.0,
+                        anno=ANNO_DEFAULT):
+    """
+    Calcola la griglia di compensi [minimo, massimo] con il passo indicato per
+    altra_previdenza False e True (broadcasting 2 × N, nessun ciclo Python).
+
+    `aliquota_marginale` è l'incidenza percentuale di contributi e imposte sull'ultimo
+    euro di compenso: differenza delle trattenute tra due punti consecutivi della griglia.
+    """
+    if passo <= 0 or massimo < minimo:
+        raise ValueError("Intervallo della griglia non valido")
+    compensi = np.arange(minimo, massimo + passo / 2.0, passo)
+    altra_previdenza = np.array([[False], [True]])
+    risultati = calcola_cococo_sportivo_batch(
+        compensi[np.newaxis, :], altra_previdenza, addizionali_reg, addizionali_com, anno
+    )
+
+    trattenute = risultati["totale_trattenute_lavoratore"]
+    marginale = np.zeros_like(trattenute)
+    if compensi.size > 1:
+        marginale[:, 1:] = np.diff(trattenute, axis=1) / passo * 100.0
+        marginale[:, 0] = marginale[:, 1]
+
+    return pd.DataFrame({
+        "compenso_lordo": np.tile(compensi, 2),
+        "altra_previdenza": np.repeat([False, True], compensi.size),
+        "netto_lavoratore": risultati["netto_lavoratore"].ravel(),
+        "costo_totale_societa": risultati["costo_totale_societa"].ravel(),
+        "tax_rate": risultati["tax_rate"].ravel(),
+        "aliquota_marginale": marginale.ravel(),
+        "reddito_imponibile_netto": risultati["reddito_imponibile_netto"].ravel(),
+    }, columns=list(COLONNE_SENSIBILITA))
+
+
+def punti_critici(griglia, anno=ANNO_DEFAULT):
+    """
+    Compensi in cui cambia il regime: le due franchigie (5.000€ e 15.000€ nel 2025) e, per ciascuna
+    situazione previdenziale, il primo compenso della griglia il cui reddito imponibile netto
+    supera una soglia IRPEF (28.000€, 50.000€ per il 2025).
+    """
+    regole = REGOLE[anno]
+    punti = [
+        {
+            "compenso_lordo": regole.franchigia_contributiva,
+            "descrizione": f"Franchigia contributiva {regole.franchigia_contributiva:,.0f}€".replace(",", "."),
+            "altra_previdenza": None,
+        },
+        {
+            "compenso_lordo": regole.franchigia_fiscale,
+            "descrizione": f"Franchigia fiscale {regole.franchigia_fiscale:,.0f}€".replace(",", "."),
+            "altra_previdenza": None,
+        },
+    ]
+    for altra_previdenza, serie in griglia.groupby("altra_previdenza", sort=True):
+        reddito = serie["reddito_imponibile_netto"].to_numpy()
+        compensi = serie["compenso_lordo"].to_numpy()
+        for soglia in regole.scaglioni_irpef.soglie:
+            i = np.searchsorted(reddito, soglia, side="right")
+            if i < len(compensi):
+                etichetta = f"{soglia:,.0f}".replace(",", ".")
+                punti.append({
+                    "compenso_lordo": float(compensi[i]),
+                    "descrizione": f"Scaglione IRPEF oltre {etichetta}€",
+                    "altra_previdenza": bool(altra_previdenza),
+                })
+    return pd.DataFrame(punti, columns=["compenso_lordo", "descrizione", "altra_previdenza"])
@@ -0,0 +1,114 @@
+"""
+Calcolo inverso: compenso lordo che produce un netto o un costo società obiettivo.
+
+Il modello è lineare a tratti nel compenso lordo. I nodi (franchigie, azzeramento del
+reddito imponibile netto, soglie IRPEF) si ricavano dal modello stesso; tra due nodi
+l'obiettivo è una retta e il compenso si ottiene per interpolazione esatta, senza
+bisezioni né calcoli ripetuti.
+"""
+import numpy as np
+
+from .batch import calcola_cococo_sportivo_batch
+from .calcolo import ANNO_DEFAULT, SCAGLIONI_IRPEF, calcola_cococo_sportivo
+from .strumentazione import cronometra
+
+OBIETTIVI = ("netto_lavoratore", "costo_totale_societa")
+
+
+def nodi_modello(altra_previdenza=False, anno=ANNO_DEFAULT):
+    """
+    Compensi lordi in cui cambia la pendenza del modello, in ordine crescente, da 0 compreso.
+    L'ultimo nodo è un punto aggiuntivo nell'ultimo tratto, usato per la pendenza finale.
+    """
+    riferimento = calcola_cococo_sportivo(1e9, altra_previdenza, anno=anno)
+    franchigia_fiscale = riferimento["franchigia_fiscale"]
+    franchigia_contributiva = riferimento["franchigia_contributiva"]
+
+    # Oltre entrambe le franchigie reddito_imponibile - contributi_lavoratore è lineare nel compenso
+    def reddito_netto_lineare(compenso):
+        r = calcola_cococo_sportivo(compenso, altra_previdenza, anno=anno)
+        return r["reddito_imponibile"] - r["contributi_lavoratore"]
+
+    c1 = max(franchigia_fiscale, franchigia_contributiva) + 1000.0
+    c2 = c1 + 10000.0
+    r1, r2 = reddito_netto_lineare(c1), reddito_netto_lineare(c2)
+    pendenza = (r2 - r1) / (c2 - c1)
+
+    nodi = {0.0, franchigia_contributiva, franchigia_fiscale}
+    for soglia in (0.0,) + SCAGLIONI_IRPEF[anno].soglie:
+        nodi.add(c1 + (soglia - r1) / pendenza)
+    nodi = sorted(n for n in nodi if n >= 0.0)
+    nodi.append(nodi[-1] + 10000.0)
+    return tuple(nodi)
+
+
+def _interpola(nodi, valori_nodi, obiettivo):
+    """Compenso sul tratto che contiene l'obiettivo (l'ultimo tratto è esteso all'infinito)."""
+    for i in range(1, len(nodi)):
+        if obiettivo <= valori_nodi[i] or i == len(nodi) - 1:
+            break
+    x0, x1 = nodi[i - 1], nodi[i]
+    y0, y1 = valori_nodi[i - 1], valori_nodi[i]
+    return x0 + (obiettivo - y0) * (x1 - x0) / (y1 - y0)
+
+
+def compenso_da_obiettivo(obiettivo, valore, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0,
+                          anno=ANNO_DEFAULT):
+    """
+    Compenso lordo annuo per cui `obiettivo` ("netto_lavoratore" o "costo_totale_societa")
+    vale `valore`. Un obiettivo nullo o negativo restituisce 0.
+    """
+    if obiettivo not in OBIETTIVI:
+        raise ValueError(f"Obiettivo non supportato: {obiettivo} (ammessi: {', '.join(OBIETTIVI)})")
+    if valore <= 0:
+        return 0.0
+    nodi = nodi_modello(altra_previdenza, anno)
+    valori_nodi = [
+        calcola_cococo_sportivo(n, altra_previdenza, addizionali_reg, addizionali_com, anno)[obiettivo] for n in nodi
+    ]
+    return _interpola(nodi, valori_nodi, valore)
+
+
+def compenso_da_netto(netto, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0, anno=ANNO_DEFAULT):
+    """Compenso lordo annuo che produce il netto lavoratore indicato."""
+    return compenso_da_obiettivo("netto_lavoratore", netto, altra_previdenza, addizionali_reg, addizionali_com, anno)
+
+
+def compenso_da_costo(costo, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0, anno=ANNO_DEFAULT):
+    """Compenso lordo annuo che produce il costo totale società indicato."""
+    return compenso_da_obiettivo("costo_totale_societa", costo, altra_previdenza, addizionali_reg, addizionali_com, anno)
+
+
+@cronometra()
+def compenso_da_obiettivo_batch(obiettivo, valori, altra_previdenza=False, addizionali_reg=0.0, addizionali_com=0.0,
+                                anno=ANNO_DEFAULT):
+    """
+    Versione vettoriale di compenso_da_obiettivo per interi elenchi di collaboratori.
+    I nodi dipendono solo dalla situazione previdenziale, quindi il modello viene valutato
+    una volta su una matrice righe × nodi e ogni riga viene interpolata sul proprio tratto.
+    """
+    if obiettivo not in OBIETTIVI:
+        raise ValueError(f"Obiettivo non supportato: {obiettivo} (ammessi: {', '.join(OBIETTIVI)})")
+    valori = np.asarray(valori, dtype=np.float64)
+    altra_prev = np.asarray(altra_previdenza, dtype=bool)
+    add_reg = np.asarray(addizionali_reg, dtype=np.float64)
+    add_com = np.asarray(addizionali_com, dtype=np.float64)
+    valori, altra_prev, add_reg, add_com = np.broadcast_arrays(valori, altra_prev, add_reg, add_com)
+
+    nodi_senza, nodi_con = nodi_modello(False, anno), nodi_modello(True, anno)
+    if len(nodi_senza) != len(nodi_con):
+        raise ValueError("Nodi del modello non allineati tra le due situazioni previdenziali")
+    nodi = np.where(altra_prev[..., np.newaxis], np.array(nodi_con), np.array(nodi_senza))
+    valori_nodi = calcola_cococo_sportivo_batch(
+        nodi, altra_prev[..., np.newaxis], add_reg[..., np.newaxis], add_com[..., np.newaxis], anno
+    )[obiettivo]
+
+    # Indice del nodo finale del tratto: primo nodo con valore >= obiettivo, limitato all'ultimo tratto
+    fine = np.clip((valori_nodi < valori[..., np.newaxis]).sum(axis=-1), 1, nodi.shape[-1] - 1)
+    inizio = fine - 1
+    x0 = np.take_along_axis(nodi, inizio[..., np.newaxis], axis=-1)[..., 0]
+    x1 = np.take_along_axis(nodi, fine[..., np.newaxis], axis=-1)[..., 0]
+    y0 = np.take_along_axis(valori_nodi, inizio[..., np.newaxis], axis=-1)[..., 0]
+    y1 = np.take_along_axis(valori_nodi, fine[..., np.newaxis], axis=-1)[..., 0]
+    compenso = x0 + (valori - y0) * (x1 - x0) / (y1 - y0)
+    return np.where(valori <= 0, 0.0, compenso)
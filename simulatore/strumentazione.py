@@ -0,0 +1,272 @@
+"""
+Strumentazione facoltativa dei tempi: sezioni dell'interfaccia e funzioni di calcolo.
+
+Si attiva con la variabile d'ambiente SIMULATORE_STRUMENTAZIONE=1 oppure con
+`attiva = true` nella sezione [strumentazione] di config.toml. Per ogni nome misurato
+restano in memoria conteggio, totale, massimo e gli ultimi `campioni` tempi (buffer
+circolare) da cui si ricavano i percentili; il riepilogo si esporta in JSON o nel formato
+testo di Prometheus, anche su file per il textfile collector di node_exporter
+(SIMULATORE_STRUMENTAZIONE_FILE o `file_prometheus`).
+
+Disattivata, `cronometra` restituisce la funzione decorata senza modifiche e `sezione` /
+`tappe` restituiscono oggetti vuoti condivisi: il costo è una chiamata a vuoto per sezione.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+from .regole import PERCORSO_CONFIG
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+PERCENTILI = (50, 90, 99)
+CAMPIONI_DEFAULT = 2048        # tempi conservati per ogni nome
+INTERVALLO_FILE_DEFAULT = 15.0  # secondi tra due scritture del file Prometheus
+VALORI_ATTIVA = {"1", "true", "vero", "si", "sì", "on", "yes"}
+METRICA = "simulatore_sezione_secondi"
+
+
+def leggi_configurazione(percorso=None):
+    """Sezione [strumentazione] di config.toml (dizionario vuoto se manca) con gli override d'ambiente."""
+    percorso = percorso or os.environ.get("SIMULATORE_CONFIG") or PERCORSO_CONFIG
+    try:
+        with open(percorso, "rb") as f:
+            testo = f.read().decode("utf-8")
+    except OSError:
+        testo = ""
+    # Il file è già validato da simulatore.regole: lo si rilegge solo se ha la sezione
+    sezione = tomllib.loads(testo).get("strumentazione", {}) if "[strumentazione]" in testo else {}
+    configurazione = {
+        "attiva": bool(sezione.get("attiva", False)),
+        "campioni": int(sezione.get("campioni", CAMPIONI_DEFAULT)),
+        "file_prometheus": sezione.get("file_prometheus") or None,
+        "intervallo_file": float(sezione.get("intervallo_file", INTERVALLO_FILE_DEFAULT)),
+    }
+    if "SIMULATORE_STRUMENTAZIONE" in os.environ:
+        configurazione["attiva"] = os.environ["SIMULATORE_STRUMENTAZIONE"].strip().lower() in VALORI_ATTIVA
+    if os.environ.get("SIMULATORE_STRUMENTAZIONE_FILE"):
+        configurazione["file_prometheus"] = os.environ["SIMULATORE_STRUMENTAZIONE_FILE"]
+    if configurazione["campioni"] <= 0:
+        raise ValueError("strumentazione.campioni deve essere positivo")
+    return configurazione
+
+
+def percentile(ordinati, p):
+    """Percentile `p` di una lista ordinata, con interpolazione lineare come numpy.percentile."""
+    posizione = (len(ordinati) - 1) * p / 100.0
+    sotto = int(posizione)
+    sopra = min(sotto + 1, len(ordinati) - 1)
+    return ordinati[sotto] + (ordinati[sopra] - ordinati[sotto]) * (posizione - sotto)
+
+
+def _etichetta(valore):
+    return str(valore).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class Serie:
+    """Tempi di un nome: totali esatti e ultimi campioni in un buffer circolare."""
+
+    __slots__ = ("campioni", "conteggio", "totale", "massimo")
+
+    def __init__(self, dimensione):
+        self.campioni = [0.0] * dimensione
+        self.conteggio = 0
+        self.totale = 0.0
+        self.massimo = 0.0
+
+    def aggiungi(self, secondi):
+        self.campioni[self.conteggio % len(self.campioni)] = secondi
+        self.conteggio += 1
+        self.totale += secondi
+        if secondi > self.massimo:
+            self.massimo = secondi
+
+    def recenti(self):
+        return self.campioni[:min(self.conteggio, len(self.campioni))]
+
+
+class Sezione:
+    """Context manager che registra la durata del blocco (anche se termina con un'eccezione)."""
+
+    __slots__ = ("registro", "nome", "_inizio")
+
+    def __init__(self, registro, nome):
+        self.registro = registro
+        self.nome = nome
+        self._inizio = 0.0
+
+    def __enter__(self):
+        self._inizio = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.registro.registra(self.nome, time.perf_counter() - self._inizio)
+        return False
+
+
+class Tappe:
+    """
+    Cronometro a tappe per uno script lineare come app.py: `tappa(nome)` registra il tempo
+    trascorso dalla tappa precedente, `fine()` il totale dall'avvio sotto `prefisso.totale`.
+    """
+
+    __slots__ = ("registro", "prefisso", "_avvio", "_ultima")
+
+    def __init__(self, registro, prefisso, avvio=None):
+        self.registro = registro
+        self.prefisso = prefisso
+        self._avvio = self._ultima = time.perf_counter() if avvio is None else avvio
+
+    def tappa(self, nome):
+        adesso = time.perf_counter()
+        self.registro.registra(f"{self.prefisso}.{nome}", adesso - self._ultima)
+        self._ultima = adesso
+
+    def fine(self):
+        self.registro.registra(f"{self.prefisso}.totale", time.perf_counter() - self._avvio)
+        self.registro.esporta_se_scaduto()
+
+
+class _TappeVuote:
+    __slots__ = ()
+
+    def tappa(self, nome):
+        pass
+
+    def fine(self):
+        pass
+
+
+class Registro:
+    """Serie dei tempi per nome, condivise tra i thread (una per sessione Streamlit)."""
+
+    __slots__ = ("dimensione", "file_prometheus", "intervallo_file", "_serie", "_lock", "_ultima_scrittura")
+
+    def __init__(self, campioni=CAMPIONI_DEFAULT, file_prometheus=None, intervallo_file=INTERVALLO_FILE_DEFAULT):
+        self.dimensione = campioni
+        self.file_prometheus = file_prometheus
+        self.intervallo_file = intervallo_file
+        self._serie = {}
+        self._lock = threading.Lock()
+        self._ultima_scrittura = None
+
+    def registra(self, nome, secondi):
+        with self._lock:
+            serie = self._serie.get(nome)
+            if serie is None:
+                serie = self._serie[nome] = Serie(self.dimensione)
+            serie.aggiungi(secondi)
+
+    def sezione(self, nome):
+        return Sezione(self, nome)
+
+    def tappe(self, prefisso, avvio=None):
+        return Tappe(self, prefisso, avvio)
+
+    def cronometra(self, nome=None):
+        """Decoratore che registra ogni chiamata sotto `nome` (default: modulo.funzione)."""
+        def decoratore(funzione):
+            etichetta = nome or f"{funzione.__module__.rsplit('.', 1)[-1]}.{funzione.__qualname__}"
+
+            @wraps(funzione)
+            def cronometrata(*args, **kwargs):
+                inizio = time.perf_counter()
+                try:
+                    return funzione(*args, **kwargs)
+                finally:
+                    self.registra(etichetta, time.perf_counter() - inizio)
+            return cronometrata
+        return decoratore
+
+    def azzera(self):
+        with self._lock:
+            self._serie.clear()
+
+    def riepilogo(self, percentili=PERCENTILI):
+        """
+        {nome: {conteggio, totale_s, media_s, massimo_s, p50_s, ...}} in ordine di nome;
+        i percentili sono calcolati sugli ultimi campioni.
+        """
+        with self._lock:
+            copie = {
+                nome: (s.conteggio, s.totale, s.massimo, s.recenti())
+                for nome, s in sorted(self._serie.items())
+            }
+        riepilogo = {}
+        for nome, (conteggio, totale, massimo, recenti) in copie.items():
+            recenti.sort()
+            riepilogo[nome] = {
+                "conteggio": conteggio,
+                "totale_s": totale,
+                "media_s": totale / conteggio,
+                "massimo_s": massimo,
+                **{f"p{p:g}_s": percentile(recenti, p) for p in percentili},
+            }
+        return riepilogo
+
+    def json(self, percentili=PERCENTILI):
+        return json.dumps({"percentili": list(percentili), "sezioni": self.riepilogo(percentili)}, indent=2)
+
+    def prometheus(self, percentili=PERCENTILI):
+        """Riepilogo come metrica summary nel formato testo di Prometheus (quantili, _sum, _count)."""
+        righe = [
+            f"# HELP {METRICA} Durata delle sezioni dell'app e delle funzioni di calcolo.",
+            f"# TYPE {METRICA} summary",
+        ]
+        for nome, valori in self.riepilogo(percentili).items():
+            sezione = _etichetta(nome)
+            for p in percentili:
+                righe.append(f'{METRICA}{{sezione="{sezione}",quantile="{p / 100:g}"}} {valori[f"p{p:g}_s"]:.9g}')
+            righe.append(f'{METRICA}_sum{{sezione="{sezione}"}} {valori["totale_s"]:.9g}')
+            righe.append(f'{METRICA}_count{{sezione="{sezione}"}} {valori["conteggio"]}')
+        return "\n".join(righe) + "\n"
+
+    def scrivi_prometheus(self, percorso):
+        """Scrive l'export Prometheus in modo atomico (file temporaneo + rename)."""
+        temporaneo = f"{percorso}.{os.getpid()}.tmp"
+        with open(temporaneo, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(temporaneo, percorso)
+
+    def esporta_se_scaduto(self):
+        """Riscrive il file Prometheus configurato se è passato `intervallo_file` dall'ultima volta."""
+        if self.file_prometheus is None:
+            return
+        adesso = time.monotonic()
+        with self._lock:
+            if self._ultima_scrittura is not None and adesso - self._ultima_scrittura < self.intervallo_file:
+                return
+            self._ultima_scrittura = adesso
+        self.scrivi_prometheus(self.file_prometheus)
+
+
+_CONFIGURAZIONE = leggi_configurazione()
+ATTIVA = _CONFIGURAZIONE["attiva"]
+REGISTRO = Registro(
+    _CONFIGURAZIONE["campioni"], _CONFIGURAZIONE["file_prometheus"], _CONFIGURAZIONE["intervallo_file"]
+)
+_SEZIONE_VUOTA = nullcontext()
+_TAPPE_VUOTE = _TappeVuote()
+
+
+def sezione(nome):
+    """`with sezione("nome"):` misura il blocco se la strumentazione è attiva."""
+    return REGISTRO.sezione(nome) if ATTIVA else _SEZIONE_VUOTA
+
+
+def tappe(prefisso, avvio=None):
+    """Cronometro a tappe del registro globale (oggetto vuoto se la strumentazione è spenta)."""
+    return REGISTRO.tappe(prefisso, avvio) if ATTIVA else _TAPPE_VUOTE
+
+
+def cronometra(nome=None):
+    """Decoratore: con la strumentazione spenta restituisce la funzione originale."""
+    if not ATTIVA:
+        return lambda funzione: funzione
+    return REGISTRO.cronometra(nome)
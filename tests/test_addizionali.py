@@ -0,0 +1,92 @@
+"""Addizionali da tabella: scaglioni, esenzioni, normalizzazione dei codici e join vettoriale."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulatore.addizionali import aliquote_effettive, normalizza_codici, risolvi_addizionali_df, tabella_addizionali
+from simulatore.batch import calcola_cococo_sportivo_df
+from simulatore.centesimi import calcola_cococo_sportivo_centesimi_df
+from simulatore.scenari import confronta_regimi_df
+
+
+def test_scaglioni_regionali():
+    # Lombardia: 15000 × 1,23% + 13000 × 1,58% + 12000 × 1,72% = 596,30 € su 40000 €
+    reg, com = aliquote_effettive(40000.0, codice_regione="03")
+    assert reg == pytest.approx(1.49075)
+    assert np.isnan(com)
+
+
+def test_esenzione_comunale_e_regione_del_comune():
+    # Milano: esenzione fino a 23000 €, oltre 0,8% sull'intero reddito
+    reg, com = aliquote_effettive(20000.0, codice_comune="015146")
+    assert com == 0.0
+    assert reg > 0.0
+    assert aliquote_effettive(30000.0, codice_comune="15146")[1] == pytest.approx(0.8)
+
+
+def test_normalizzazione_codici():
+    codici = normalizza_codici([1272, "015146", 15146.0, None, " 58091 "], 6)
+    assert codici.tolist() == ["001272", "015146", "015146", "", "058091"]
+
+
+def test_codice_sconosciuto():
+    with pytest.raises(KeyError):
+        aliquote_effettive(30000.0, codice_comune="999999")
+
+
+def test_tabella_anno_senza_dati_usa_la_piu_vicina():
+    assert len(tabella_addizionali(2024)) == len(tabella_addizionali(2025))
+
+
+def test_join_uguale_al_calcolo_scalare():
+    rng = np.random.default_rng(0)
+    comuni = np.array(["015146", "058091", "022205", ""], dtype=object)
+    n = 2000
+    df = pd.DataFrame({
+        "compenso_lordo": rng.uniform(0, 120000.0, n).round(2),
+        "altra_previdenza": rng.random(n) < 0.3,
+        "addizionali_reg": 1.0,
+        "addizionali_com": 0.5,
+        "codice_comune": comuni[rng.integers(0, comuni.size, n)],
+    })
+    risolto = risolvi_addizionali_df(df, 2025)
+    senza = df["codice_comune"] == ""
+    assert (risolto.loc[senza, "addizionali_reg"] == 1.0).all()
+    assert (risolto.loc[senza, "addizionali_com"] == 0.5).all()
+
+    netti = calcola_cococo_sportivo_df(df.drop(columns="codice_comune").assign(addizionali_reg=0.0, addizionali_com=0.0))
+    for i in rng.choice(np.flatnonzero(~senza.to_numpy()), 50, replace=False):
+        attese = aliquote_effettive(netti["reddito_imponibile_netto"].iloc[i], df["codice_comune"].iloc[i], anno=2025)
+        assert (risolto["addizionali_reg"].iloc[i], risolto["addizionali_com"].iloc[i]) == pytest.approx(attese)
+
+
+def test_calcolo_df_con_codice_comune():
+    df = pd.DataFrame({"compenso_lordo": [40000.0], "codice_comune": ["58091"], "anno": [2025]})
+    risultato = calcola_cococo_sportivo_df(df)
+    reddito = risultato["reddito_imponibile_netto"].iloc[0]
+    reg, com = aliquote_effettive(reddito, codice_comune="058091", anno=2025)
+    assert risultato["addizionale_comunale"].iloc[0] == pytest.approx(reddito * com / 100, abs=0.01)
+    assert risultato["addizionale_regionale"].iloc[0] == pytest.approx(reddito * reg / 100, abs=0.01)
+
+
+def test_province_autonome_e_trentino_alto_adige():
+    # Codici numerici da Excel: 21 → "021" (Bolzano), 4 → provincia del comune (Trento)
+    bolzano = aliquote_effettive(30000.0, codice_regione=21)
+    assert aliquote_effettive(30000.0, codice_regione="021") == pytest.approx(bolzano, nan_ok=True)
+    df = pd.DataFrame({"compenso_lordo": [30000.0, 30000.0], "codice_regione": [22.0, 4.0], "codice_comune": ["", "22205"]})
+    risolto = risolvi_addizionali_df(df, 2025)
+    assert risolto["addizionali_reg"].iloc[0] == risolto["addizionali_reg"].iloc[1]
+    with pytest.raises(KeyError, match="province autonome"):
+        aliquote_effettive(30000.0, codice_regione="04")
+
+
+def test_stessi_codici_in_tutti_i_motori():
+    # Solo codici, niente aliquote: batch, confronto regimi e centesimi usano le stesse tabelle
+    df = pd.DataFrame({"compenso_lordo": [40000.0, 25000.0], "codice_regione": ["03", ""], "codice_comune": ["", "058091"]})
+    batch = calcola_cococo_sportivo_df(df)
+    confronto = confronta_regimi_df(df)
+    cococo = confronto[confronto["regime"] == "cococo"]
+    centesimi = calcola_cococo_sportivo_centesimi_df(df)
+    assert batch["totale_imposte"].iloc[0] == pytest.approx(5675.83, abs=0.01)
+    np.testing.assert_allclose(cococo["imposte"], batch["totale_imposte"], atol=0.01)
+    np.testing.assert_allclose(centesimi["totale_imposte"] / 100, batch["totale_imposte"], atol=0.02)
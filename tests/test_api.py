@@ -0,0 +1,117 @@
+"""Endpoint del servizio HTTP, micro-batch e ETag (senza aprire socket)."""
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from simulatore.api import ServizioApi
+from simulatore.calcolo import calcola_cococo_sportivo, calcola_irpef
+
+
+def _esegui(*richieste):
+    """Invia le richieste (metodo, destinazione, corpo) in concorrenza e restituisce le risposte."""
+    async def principale():
+        servizio = ServizioApi(finestra=0.005)
+        servizio.calcolo.avvia()
+        servizio.irpef.avvia()
+        try:
+            risposte = await asyncio.gather(*(servizio.instrada(*r) for r in richieste))
+            return risposte, servizio.calcolo.lotti
+        finally:
+            await servizio.ferma()
+    return asyncio.run(principale())
+
+
+def test_calcola_accorpa_le_richieste_concorrenti():
+    compensi = [0, 5000, 15000, 43000, 65000, 200000]
+    richieste = [("POST", "/calcola", json.dumps({"compenso_lordo": c}).encode()) for c in compensi]
+    risposte, lotti = _esegui(*richieste)
+    assert lotti == 1
+    for compenso, (stato, corpo) in zip(compensi, risposte):
+        assert stato == 200
+        assert corpo["netto_lavoratore"] == pytest.approx(calcola_cococo_sportivo(compenso)["netto_lavoratore"])
+
+
+def test_batch_e_irpef():
+    (stato_b, batch), (stato_i, irpef) = _esegui(
+        ("POST", "/batch", b'{"compenso_lordo": [18000, 43000], "anno": 2026}'),
+        ("GET", "/irpef?reddito=40000&anno=2023", b""),
+    )[0]
+    assert stato_b == stato_i == 200
+    assert batch["irpef"][1] == pytest.approx(calcola_cococo_sportivo(43000, anno=2026)["irpef"])
+    assert irpef["irpef"] == pytest.approx(calcola_irpef(40000, 2023))
+
+
+def test_batch_interpreta_i_campi_come_calcola():
+    corpo = {
+        "compenso_lordo": ["18.000,00", 43000, "25000.5"],
+        "altra_previdenza": ["no", "si", False],
+        "addizionali_reg": "1,23",
+        "anno": ["2025", 2024, 2025.0],
+    }
+    oggetti = [dict(zip(corpo, valori)) for valori in zip(
+        corpo["compenso_lordo"], corpo["altra_previdenza"], ["1,23"] * 3, corpo["anno"],
+    )]
+    (stato_b, batch), (stato_c, calcola) = _esegui(
+        ("POST", "/batch", json.dumps(corpo).encode()),
+        ("POST", "/calcola", json.dumps(oggetti).encode()),
+    )[0]
+    assert stato_b == stato_c == 200
+    assert batch["aliquota_ivs"] == [25.0, 24.0, 25.0]
+    for i, riga in enumerate(calcola):
+        assert {k: batch[k][i] for k in riga} == pytest.approx(riga)
+
+
+@pytest.mark.parametrize("richiesta, stato", [
+    (("POST", "/calcola", b"{non json"), 400),
+    (("POST", "/calcola", b'{"compenso_lordo": 1000, "anno": 1999}'), 400),
+    (("POST", "/irpef", b"[1, 2]"), 400),
+    (("DELETE", "/calcola", b""), 405),
+    (("GET", "/inesistente", b""), 404),
+    (("POST", "/calcola", b'{"compenso_lordo": 1000, "anno": Infinity}'), 400),
+    (("POST", "/batch", b'{"compenso_lordo": [1000], "anno": [1e30]}'), 400),
+    (("POST", "/batch", b'{"compenso_lordo": [1000], "anno": [Infinity]}'), 400),
+    (("POST", "/calcola", b'{"compenso_lordo": "nan"}'), 400),
+    (("GET", "/calcola?compenso_lordo=inf", b""), 400),
+    (("POST", "/calcola", b'{"compenso_lordo": 1000, "addizionali_reg": NaN}'), 400),
+    (("POST", "/batch", b'{"compenso_lordo": [1000, NaN]}'), 400),
+    (("POST", "/batch", b'{"compenso_lordo": [1000, "inf"]}'), 400),
+    (("POST", "/batch", b'{"compenso_lordo": [1000], "addizionali_com": "-inf"}'), 400),
+    (("GET", "/irpef?reddito=nan", b""), 400),
+])
+def test_errori(richiesta, stato):
+    assert _esegui(richiesta)[0][0][0] == stato
+
+
+def test_errore_interno_risponde_500(monkeypatch, caplog):
+    def guasto(self, _dati):
+        raise RuntimeError("guasto")
+    monkeypatch.setattr(ServizioApi, "_salute", guasto)
+    stato, corpo = _esegui(("GET", "/salute", b""))[0][0]
+    assert stato == 500
+    assert "guasto" not in corpo["errore"]
+    assert "guasto" in caplog.text
+
+
+def test_risposta_non_finita_diventa_500(caplog):
+    assert ServizioApi.risposta(200, {"irpef": float("nan")}).startswith(b"HTTP/1.1 500")
+    assert "non finiti" in caplog.text
+
+
+def test_etag_e_304():
+    risposta = ServizioApi.risposta(200, {"irpef": 1.0})
+    etag = next(r for r in risposta.split(b"\r\n") if r.startswith(b"ETag:")).split(b": ", 1)[1].decode()
+    assert b"Cache-Control: public" in risposta
+    assert ServizioApi.risposta(200, {"irpef": 1.0}, se_diverso=etag).startswith(b"HTTP/1.1 304")
+    assert ServizioApi.risposta(200, {"irpef": 2.0}, se_diverso=etag).startswith(b"HTTP/1.1 200")
+
+
+def test_servizio_senza_pandas():
+    # Il servizio usa solo libreria standard e NumPy: avvio rapido
+    codice = "import sys, simulatore.api; print('pandas' in sys.modules)"
+    uscita = subprocess.run([sys.executable, "-c", codice], capture_output=True, text=True, check=True,
+                            cwd=Path(__file__).resolve().parent.parent)
+    assert uscita.stdout.strip() == "False"
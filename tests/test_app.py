@@ -0,0 +1,72 @@
+"""Lo script Streamlit gira senza eccezioni in ogni modalità (harness AppTest)."""
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.testing.v1 import AppTest
+
+from pagine import prestazioni
+
+APP = str(Path(__file__).resolve().parent.parent / "app.py")
+MODALITA = ("🧮 Simulazione singola", "🎯 Calcolo inverso", "⚖️ Confronto regimi", "🎲 Pianificazione stagione",
+            "📈 Analisi di sensibilità", "📂 Elaborazione file paghe")
+
+
+def _avvia(**query):
+    at = AppTest.from_file(APP, default_timeout=60)
+    for chiave, valore in query.items():
+        at.query_params[chiave] = valore
+    at.run()
+    assert not at.exception
+    return at
+
+
+def test_simulazione_singola():
+    at = _avvia()
+    at.number_input(key="compenso_cococo").set_value(43000).run()
+    assert not at.exception
+    netto = next(m for m in at.metric if m.label == "Netto Lavoratore")
+    assert netto.value == "€ 34.690,28"
+
+
+@pytest.mark.parametrize("modalita", MODALITA[1:])
+def test_modalita(modalita):
+    at = _avvia()
+    at.sidebar.radio(key="modalita").set_value(modalita).run()
+    assert not at.exception
+
+
+def test_visualizzazione_compatta_e_debug():
+    at = _avvia(compatta="1", debug="1")
+    at.run()
+    assert not at.exception
+    assert at.session_state["misura_fragment"]["byte"] > 0
+
+
+def test_calcolo_con_pulsante():
+    at = _avvia(aggiornamento="pulsante")
+    at.number_input(key="compenso_cococo").set_value(43000).run()
+    netto = lambda: next(m for m in at.metric if m.label == "Netto Lavoratore").value  # noqa: E731
+    assert netto() == "€ 16.784,17"  # invariato finché non si preme "Calcola"
+    at.number_input(key="compenso_cococo").set_value(43000)
+    at.button[0].click().run()
+    assert not at.exception
+    assert netto() == "€ 34.690,28"
+    assert "misura_rerun" not in at.session_state
+
+
+def test_misura_interrotta_non_si_accumula(monkeypatch):
+    inviati = []
+    contesto = SimpleNamespace(_enqueue=inviati.append)
+    monkeypatch.setattr(prestazioni, "get_script_run_ctx", lambda: contesto)
+    # Tre rerun interrotti prima di termina(): ognuno riparte dalla coda originale
+    for _ in range(3):
+        prestazioni.ripristina_invio()
+        misura = prestazioni.MisuraRerun("misura_prova").avvia()
+    contesto._enqueue(ForwardMsg())
+    assert misura.messaggi == 1
+    assert len(inviati) == 1
+    # Senza debug il rerun successivo toglie comunque l'intercettazione
+    prestazioni.ripristina_invio()
+    assert contesto._enqueue == inviati.append
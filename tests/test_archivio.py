@@ -0,0 +1,116 @@
+"""Archivio dei risultati: ricalcolo incrementale, persistenza, storico e confronto tra caricamenti."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulatore.aggregazione import aggrega_collaboratori
+from simulatore.archivio import ArchivioRisultati, main
+from simulatore.file_paghe import leggi_elenco
+
+
+def _elenco(n=500, seme=0):
+    rng = np.random.default_rng(seme)
+    return pd.DataFrame({
+        "codice_fiscale": [f"CF{i:05d}" for i in range(n)],
+        "compenso_lordo": rng.uniform(0, 60000.0, n).round(2),
+        "altra_previdenza": rng.random(n) < 0.3,
+        "addizionali_reg": 1.23,
+        "addizionali_com": 0.5,
+    })
+
+
+def test_ricalcola_solo_righe_nuove_o_cambiate(tmp_path):
+    elenco = _elenco()
+    archivio = ArchivioRisultati(tmp_path)
+    _, primo = archivio.carica(elenco, 2025, "gennaio")
+    assert primo["calcolate"] == 500
+
+    successivo = elenco.iloc[10:].copy()
+    successivo.loc[successivo.index[:5], "compenso_lordo"] += 100.0
+    successivo = pd.concat([successivo, elenco.iloc[[20]].assign(codice_fiscale="NUOVO")], ignore_index=True)
+    # Riapertura: l'archivio si legge dal disco
+    risultati, secondo = ArchivioRisultati(tmp_path).carica(successivo, 2025, "febbraio")
+    assert secondo["righe"] == 491
+    assert secondo["calcolate"] == 6
+
+    _, per_persona = aggrega_collaboratori(successivo, "codice_fiscale", 2025)
+    attesi = per_persona.loc[risultati.index, risultati.columns]
+    np.testing.assert_allclose(risultati.to_numpy(), attesi.to_numpy(), equal_nan=True)
+
+
+def test_anno_diverso_ricalcola(tmp_path):
+    archivio = ArchivioRisultati(tmp_path)
+    archivio.carica(_elenco(50), 2024)
+    _, voce = archivio.carica(_elenco(50), 2025)
+    assert voce["calcolate"] == 50
+    _, voce = archivio.carica(_elenco(50), 2024)
+    assert voce["calcolate"] == 0
+
+
+def test_contratti_della_stessa_persona_sommati(tmp_path):
+    contratti = pd.DataFrame({"codice_fiscale": ["A", "A", "B"], "compenso_lordo": [10000.0, 8000.0, 3000.0]})
+    risultati, _ = ArchivioRisultati(tmp_path).carica(contratti)
+    assert risultati.loc["A", "compenso_lordo"] == 18000.0
+    assert risultati.loc["B", "reddito_imponibile"] == 0.0
+
+
+def test_storico_e_confronto(tmp_path):
+    elenco = _elenco(20)
+    archivio = ArchivioRisultati(tmp_path)
+    archivio.carica(elenco, 2025)
+    variato = elenco.iloc[1:].copy()
+    variato.loc[variato.index[0], "compenso_lordo"] += 1000.0
+    archivio.carica(pd.concat([variato, elenco.iloc[[2]].assign(codice_fiscale="NUOVO")], ignore_index=True), 2025)
+
+    confronto = archivio.confronta(1, 2)
+    assert confronto.loc["CF00000", "stato"] == "uscito"
+    assert confronto.loc["CF00001", "stato"] == "variato"
+    assert confronto.loc["CF00001", "compenso_lordo_differenza"] == pytest.approx(1000.0)
+    assert confronto.loc["NUOVO", "stato"] == "nuovo"
+    assert (confronto["stato"] == "invariato").sum() == 18
+
+    storico = archivio.storico("CF00001")
+    assert storico["caricamento"].tolist() == [1, 2]
+    assert storico["compenso_lordo"].diff().iloc[1] == pytest.approx(1000.0)
+
+
+def test_riga_di_comando(tmp_path, capsys):
+    percorso = tmp_path / "elenco.csv"
+    _elenco(30).to_csv(percorso, index=False)
+    cartella = tmp_path / "archivio"
+    assert main(["--archivio", str(cartella), "carica", str(percorso)]) == 0
+    assert main(["--archivio", str(cartella), "carica", str(percorso), "--uscita", str(tmp_path / "r.csv")]) == 0
+    assert "0 calcolati" in capsys.readouterr().out
+    assert len(pd.read_csv(tmp_path / "r.csv")) == 30
+    assert main(["--archivio", str(cartella), "confronta", "1", "2"]) == 0
+    assert "invariato" in capsys.readouterr().out
+
+
+def test_caricamento_interrotto(tmp_path, monkeypatch):
+    archivio = ArchivioRisultati(tmp_path)
+    archivio.carica(_elenco(20), 2025)
+
+    # Interruzione dopo il rename del segmento, prima della scrittura del catalogo
+    def interrotto(self):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(ArchivioRisultati, "_salva_catalogo", interrotto)
+    with pytest.raises(KeyboardInterrupt):
+        ArchivioRisultati(tmp_path).carica(_elenco(20, seme=1), 2025)
+    (tmp_path / "segmenti" / ".000003.1.tmp").mkdir()
+    monkeypatch.undo()
+
+    archivio = ArchivioRisultati(tmp_path)
+    assert sorted(c.name for c in (tmp_path / "segmenti").iterdir()) == ["000001"]
+    _, voce = archivio.carica(_elenco(20, seme=1), 2025)
+    assert voce["id"] == 2
+    assert voce["calcolate"] == 20
+    assert len(archivio.risultati()) == 20
+
+
+def test_chiave_mancante(tmp_path, capsys):
+    percorso = tmp_path / "elenco.csv"
+    percorso.write_text("codice_fiscale,compenso_lordo\nRSSMRA80A01H501U,1000\n,2000\n")
+    with pytest.raises(ValueError, match="mancante"):
+        ArchivioRisultati(tmp_path / "archivio").carica(leggi_elenco(percorso))
+    assert main(["--archivio", str(tmp_path / "archivio"), "carica", str(percorso)]) == 1
+    assert "codice_fiscale mancante nelle righe 1" in capsys.readouterr().err
@@ -0,0 +1,55 @@
+"""Il calcolo vettoriale deve coincidere con quello scalare, anche su più anni d'imposta."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulatore.batch import calcola_cococo_sportivo_batch, calcola_irpef_batch, confronta_anni
+from simulatore.calcolo import ANNI_DISPONIBILI, COLONNE_RISULTATO, calcola_cococo_sportivo, calcola_irpef
+
+BORDI = np.array([-1.0, 0.0, 5000.0, 15000.0, 43000.0, 65000.0, 200000.0])
+
+
+def _input(n, seme=0):
+    rng = np.random.default_rng(seme)
+    compenso = np.concatenate([BORDI, rng.uniform(-1000.0, 200000.0, n).round(2)])
+    m = compenso.size
+    return compenso, rng.random(m) < 0.3, rng.uniform(0, 3.33, m).round(2), rng.uniform(0, 0.8, m).round(2)
+
+
+@pytest.mark.parametrize("anno", ANNI_DISPONIBILI)
+def test_batch_uguale_allo_scalare(anno):
+    compenso, altra, reg, com = _input(500)
+    batch = calcola_cococo_sportivo_batch(compenso, altra, reg, com, anno)
+    for i in range(compenso.size):
+        scalare = calcola_cococo_sportivo(float(compenso[i]), bool(altra[i]), float(reg[i]), float(com[i]), anno)
+        for colonna in COLONNE_RISULTATO:
+            assert batch[colonna][i] == pytest.approx(scalare[colonna], abs=1e-9), (i, colonna)
+
+
+def test_batch_con_anno_per_riga():
+    compenso, altra, reg, com = _input(200, seme=1)
+    anni = np.resize(np.array(ANNI_DISPONIBILI), compenso.size)
+    batch = calcola_cococo_sportivo_batch(compenso, altra, reg, com, anni)
+    for i in range(compenso.size):
+        scalare = calcola_cococo_sportivo(float(compenso[i]), bool(altra[i]), float(reg[i]), float(com[i]), int(anni[i]))
+        assert batch["netto_lavoratore"][i] == pytest.approx(scalare["netto_lavoratore"], abs=1e-9)
+
+
+def test_irpef_batch_uguale_allo_scalare():
+    redditi = np.array([-5.0, 0.0, 15000.0, 28000.0, 28000.01, 50000.0, 50000.01, 1e6])
+    for anno in ANNI_DISPONIBILI:
+        attesi = [calcola_irpef(float(r), anno) for r in redditi]
+        assert calcola_irpef_batch(redditi, anno).tolist() == pytest.approx(attesi, abs=1e-9)
+
+
+def test_anno_non_configurato():
+    with pytest.raises(KeyError):
+        calcola_cococo_sportivo_batch(np.array([1000.0, 2000.0]), anno=np.array([2025, 1999]))
+
+
+def test_confronta_anni():
+    df = pd.DataFrame({"compenso_lordo": [10000.0, 60000.0]}, index=["a", "b"])
+    confronto = confronta_anni(df)
+    assert len(confronto) == 2 * len(ANNI_DISPONIBILI)
+    riga = confronto[(confronto["anno"] == 2026) & (confronto.index == "b")].iloc[0]
+    assert riga["irpef"] == pytest.approx(calcola_cococo_sportivo(60000.0, anno=2026)["irpef"])
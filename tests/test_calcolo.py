@@ -0,0 +1,86 @@
+"""Valori di riferimento del calcolo scalare ai bordi di franchigie e scaglioni IRPEF (anno 2025)."""
+import pytest
+
+from simulatore.calcolo import calcola_cococo_sportivo, calcola_irpef, formatta_euro, formatta_percentuale
+
+COLONNE = (
+    "contributi_lavoratore",
+    "contributi_societa",
+    "reddito_imponibile_netto",
+    "irpef",
+    "totale_imposte",
+    "netto_lavoratore",
+    "costo_totale_societa",
+    "tax_rate",
+)
+
+# compenso, altra_previdenza, valori di COLONNE con addizionali 1,23% e 0,5%
+ATTESI = [
+    (0, False, (0.00, 0.00, 0.00, 0.00, 0.00, 0.00, 0.00, 0.00)),
+    (0, True, (0.00, 0.00, 0.00, 0.00, 0.00, 0.00, 0.00, 0.00)),
+    (5000, False, (0.00, 0.00, 0.00, 0.00, 0.00, 5000.00, 5000.00, 0.00)),
+    (5000, True, (0.00, 0.00, 0.00, 0.00, 0.00, 5000.00, 5000.00, 0.00)),
+    (15000, False, (484.33, 968.67, 0.00, 0.00, 0.00, 14515.67, 15968.67, 3.23)),
+    (15000, True, (467.67, 935.33, 0.00, 0.00, 0.00, 14532.33, 15935.33, 3.12)),
+    (43000, False, (1840.47, 3680.93, 26159.53, 6016.69, 6469.25, 34690.28, 46680.93, 19.32)),
+    (43000, True, (1777.13, 3554.27, 26222.87, 6031.26, 6484.91, 34737.95, 46554.27, 19.21)),
+    (65000, False, (2906.00, 5812.00, 47094.00, 13122.90, 13937.63, 48156.37, 70812.00, 25.91)),
+    (65000, True, (2806.00, 5612.00, 47194.00, 13157.90, 13974.36, 48219.64, 70612.00, 25.82)),
+    (200000, False, (9444.50, 18889.00, 175555.50, 68128.86, 71165.98, 119389.52, 218889.00, 40.31)),
+    (200000, True, (9119.50, 18239.00, 175880.50, 68268.61, 71311.35, 119569.15, 218239.00, 40.22)),
+]
+
+
+@pytest.mark.parametrize("compenso, altra_previdenza, attesi", ATTESI)
+def test_calcola_cococo_sportivo_valori_di_riferimento(compenso, altra_previdenza, attesi):
+    risultato = calcola_cococo_sportivo(compenso, altra_previdenza, 1.23, 0.5, anno=2025)
+    assert tuple(round(risultato[c], 2) for c in COLONNE) == attesi
+
+
+@pytest.mark.parametrize("compenso", [0, 5000, 15000, 43000, 65000, 200000])
+def test_identita_del_calcolo(compenso):
+    r = calcola_cococo_sportivo(compenso, False, 1.23, 0.5)
+    assert r["contributi_lavoratore"] + r["contributi_societa"] == pytest.approx(r["totale_contributi"])
+    assert r["netto_lavoratore"] == pytest.approx(compenso - r["contributi_lavoratore"] - r["totale_imposte"])
+    assert r["costo_totale_societa"] == pytest.approx(compenso + r["contributi_societa"])
+
+
+def test_compenso_negativo_come_zero():
+    assert calcola_cococo_sportivo(-1000) == calcola_cococo_sportivo(0)
+
+
+@pytest.mark.parametrize("anno, attesi", [
+    (2023, (0.0, 3450.0, 6700.0, 14400.0, 78900.0)),
+    (2024, (0.0, 3450.0, 6440.0, 14140.0, 78640.0)),
+    (2025, (0.0, 3450.0, 6440.0, 14140.0, 78640.0)),
+    (2026, (0.0, 3450.0, 6440.0, 13700.0, 78200.0)),
+])
+def test_calcola_irpef_alle_soglie(anno, attesi):
+    redditi = (0, 15000, 28000, 50000, 200000)
+    assert tuple(round(calcola_irpef(r, anno), 2) for r in redditi) == attesi
+
+
+def test_calcola_irpef_reddito_negativo():
+    assert calcola_irpef(-500) == 0.0
+
+
+@pytest.mark.parametrize("valore, atteso", [
+    (0, "€ 0,00"),
+    (1234.5, "€ 1.234,50"),
+    (-1234.567, "€ -1.234,57"),
+    (1000000, "€ 1.000.000,00"),
+    (1e9, "€ 1.000.000.000,00"),
+])
+def test_formatta_euro(valore, atteso):
+    assert formatta_euro(valore) == atteso
+
+
+@pytest.mark.parametrize("valore, decimali, atteso", [
+    (0, 2, "0,00%"),
+    (6.6887, 2, "6,69%"),
+    (25, 0, "25%"),
+    (100, 1, "100,0%"),
+    (-3.14159, 3, "-3,142%"),
+])
+def test_formatta_percentuale(valore, decimali, atteso):
+    assert formatta_percentuale(valore, decimali) == atteso
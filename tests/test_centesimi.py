@@ -0,0 +1,117 @@
+"""Calcolo in centesimi interi: quote che sommano esatte e scarto massimo dal calcolo float."""
+import json
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulatore.batch import calcola_cococo_sportivo_batch
+from simulatore.calcolo import ANNI_DISPONIBILI, COLONNE_RISULTATO, REGOLE
+from simulatore.centesimi import (
+    _ParametriCentesimi,
+    calcola_cococo_sportivo_centesimi,
+    calcola_cococo_sportivo_centesimi_df,
+    calcola_cococo_sportivo_esatto,
+    in_centesimi,
+    in_euro,
+)
+
+COLONNE_IMPORTO = [c for c in COLONNE_RISULTATO if c not in ("aliquota_ivs", "aliquota_aggiuntiva", "tax_rate")]
+
+
+def _input(n, seme=0):
+    rng = np.random.default_rng(seme)
+    compenso = np.concatenate([[0.0, 5000.0, 5000.01, 15000.0, 43000.0, 200000.0], rng.uniform(0, 300000.0, n).round(2)])
+    m = compenso.size
+    return compenso, rng.random(m) < 0.3, rng.uniform(0, 3.33, m).round(2), rng.uniform(0, 0.8, m).round(2)
+
+
+@pytest.mark.parametrize("anno", ANNI_DISPONIBILI)
+def test_quote_e_totali_esatti(anno):
+    r = calcola_cococo_sportivo_centesimi(*_input(20_000), anno=anno)
+    for colonna in COLONNE_IMPORTO:
+        assert r[colonna].dtype == np.int64, colonna
+    assert np.array_equal(r["contributi_lavoratore"] + r["contributi_societa"], r["totale_contributi"])
+    assert np.array_equal(r["contributi_ivs"] + r["contributi_aggiuntivi"], r["totale_contributi"])
+    assert np.array_equal(r["netto_lavoratore"] + r["totale_trattenute_lavoratore"], r["compenso_lordo"])
+    assert np.array_equal(r["costo_totale_societa"] - r["contributi_societa"], r["compenso_lordo"])
+
+
+@pytest.mark.parametrize("anno", ANNI_DISPONIBILI)
+def test_scarto_dal_calcolo_float(anno):
+    compenso, altra, reg, com = _input(20_000, seme=1)
+    esatto = in_euro(calcola_cococo_sportivo_centesimi(compenso, altra, reg, com, anno))
+    approssimato = calcola_cococo_sportivo_batch(compenso, altra, reg, com, anno)
+    for colonna in COLONNE_RISULTATO:
+        # Al più mezzo centesimo per ciascuno dei quattro arrotondamenti che confluiscono nel netto
+        assert np.abs(esatto[colonna] - approssimato[colonna]).max() <= 0.02 + 1e-9, colonna
+
+
+def test_valori_di_riferimento():
+    r = calcola_cococo_sportivo_esatto(30000, False, 1.23, 0.5, 2025)
+    assert r["contributi_aggiuntivi"] == 507.50  # 25.000 × 2,03% = 507,4999… in float
+    assert r["contributi_lavoratore"] == 1210.83
+    assert r["contributi_societa"] == 2421.67
+    assert r["irpef"] == 3171.51
+    assert r["netto_lavoratore"] == 25379.10
+
+
+def test_anno_per_riga_e_dataframe():
+    compenso, altra, reg, com = _input(300, seme=2)
+    anni = np.resize(np.array(ANNI_DISPONIBILI), compenso.size)
+    insieme = calcola_cococo_sportivo_centesimi(compenso, altra, reg, com, anni)
+    for anno in ANNI_DISPONIBILI:
+        riga = anni == anno
+        singolo = calcola_cococo_sportivo_centesimi(compenso[riga], altra[riga], reg[riga], com[riga], anno)
+        for colonna in COLONNE_RISULTATO:
+            assert np.array_equal(insieme[colonna][riga], singolo[colonna]), (anno, colonna)
+
+    df = pd.DataFrame({"compenso_lordo": compenso, "altra_previdenza": altra, "addizionali_reg": reg, "anno": anni})
+    risultato = calcola_cococo_sportivo_centesimi_df(df)
+    assert risultato["netto_lavoratore"].dtype == np.int64
+    atteso = calcola_cococo_sportivo_centesimi(compenso, altra, reg, 0.0, anni)["netto_lavoratore"]
+    assert risultato["netto_lavoratore"].sum() == atteso.sum()
+
+
+def test_conversioni_e_limiti():
+    assert in_centesimi([0.005, 1234.565, -0.015]).tolist() == [1, 123457, -2]
+    assert calcola_cococo_sportivo_esatto(-100.0)["netto_lavoratore"] == 0.0
+    with pytest.raises(ValueError):
+        in_centesimi(1e9)
+    with pytest.raises(KeyError):
+        calcola_cococo_sportivo_centesimi(10000.0, anno=1999)
+
+
+def test_ingresso_vuoto():
+    risultati = calcola_cococo_sportivo_centesimi(np.array([]), anno=2024)
+    assert all(v.shape == (0,) for v in risultati.values())
+    df = calcola_cococo_sportivo_centesimi_df(pd.DataFrame({"compenso_lordo": []}))
+    assert df.empty and list(df.columns) == list(COLONNE_RISULTATO)
+    assert df["irpef"].dtype == np.int64
+
+
+def test_riga_di_comando_carica_numpy_solo_con_esatto():
+    codice = (
+        "import sys; from simulatore.cli import main; main(sys.argv[1:]); "
+        "print('numpy' in sys.modules, file=sys.stderr)"
+    )
+    radice = Path(__file__).resolve().parent.parent
+    for opzioni, numpy_caricato in (([], "False"), (["--esatto"], "True")):
+        uscita = subprocess.run([sys.executable, "-c", codice, "--compenso", "30000", *opzioni],
+                                capture_output=True, text=True, check=True, cwd=radice)
+        assert uscita.stderr.strip() == numpy_caricato
+        assert json.loads(uscita.stdout)["netto_lavoratore"] == pytest.approx(
+            calcola_cococo_sportivo_esatto(30000)["netto_lavoratore"], abs=0.02)
+
+
+def test_regole_non_esatte_errore_chiaro():
+    regole = REGOLE[2025]
+    campi = {campo: getattr(regole, campo) for campo in regole.__slots__}
+    with pytest.raises(ValueError, match=r"franchigia_fiscale: 5000.005 € non è un importo in centesimi interi"):
+        _ParametriCentesimi(SimpleNamespace(**{**campi, "franchigia_fiscale": 5000.005}))
+    with pytest.raises(ValueError, match=r"aliquota_ivs: 25.005% non è esprimibile in punti base"):
+        _ParametriCentesimi(SimpleNamespace(**{**campi, "aliquota_ivs": 25.005}))
@@ -0,0 +1,83 @@
+"""Prospetti per collaboratore nello zip, riepilogo e rigenerazione dei soli collaboratori cambiati."""
+import io
+import json
+import zipfile
+
+import pandas as pd
+import pytest
+
+from simulatore import certificazioni
+from simulatore.calcolo import calcola_cococo_sportivo
+from simulatore.certificazioni import FORMATI, genera_archivio, impronta, pdf_semplice
+from simulatore.file_paghe import leggi_elenco
+
+CONTRATTI = pd.DataFrame({
+    "codice_fiscale": ["RSSMRA80A01H501U", "RSSMRA80A01H501U", "VRDLGU90B02F205X"],
+    "nome": ["Mario Rossi", "Mario Rossi", "Luigi Verdi"],
+    "compenso_lordo": [12000.0, 9000.0, 4000.0],
+})
+
+
+def _archivio(contratti, **opzioni):
+    uscita = io.BytesIO()
+    esito = genera_archivio(contratti, uscita, anno=2025, processi=1, **opzioni)
+    return esito, zipfile.ZipFile(uscita)
+
+
+def test_documenti_e_riepilogo():
+    (generati, saltati), archivio = _archivio(CONTRATTI, societa="ASD Prova")
+    assert (generati, saltati) == (2, 0)
+    nomi = set(archivio.namelist())
+    assert {"RSSMRA80A01H501U_2025.pdf", "RSSMRA80A01H501U_2025.csv", "riepilogo.csv", "riepilogo.pdf", "indice.json"} <= nomi
+    voci = dict(r.split(";") for r in archivio.read("RSSMRA80A01H501U_2025.csv").decode().splitlines()[1:])
+    # Franchigie sul totale della persona (21.000€), non sui singoli contratti
+    assert float(voci["irpef"]) == pytest.approx(round(calcola_cococo_sportivo(21000.0)["irpef"], 2))
+    assert archivio.read("RSSMRA80A01H501U_2025.pdf").startswith(b"%PDF-1.4")
+
+
+def test_salta_collaboratori_invariati():
+    _, archivio = _archivio(CONTRATTI)
+    indice = json.loads(archivio.read("indice.json"))
+    modificati = CONTRATTI.copy()
+    modificati.loc[2, "compenso_lordo"] = 4500.0
+    (generati, saltati), nuovo = _archivio(modificati, precedente=archivio.fp)
+    assert (generati, saltati) == (1, 1)
+    # I documenti dei collaboratori invariati sono copiati dallo zip precedente
+    assert "RSSMRA80A01H501U_2025.pdf" in nuovo.namelist()
+    assert nuovo.read("RSSMRA80A01H501U_2025.pdf") == archivio.read("RSSMRA80A01H501U_2025.pdf")
+    assert nuovo.read("VRDLGU90B02F205X_2025.csv") != archivio.read("VRDLGU90B02F205X_2025.csv")
+    assert json.loads(nuovo.read("indice.json"))["RSSMRA80A01H501U"] == indice["RSSMRA80A01H501U"]
+
+
+def test_nome_mancante(tmp_path):
+    percorso = tmp_path / "elenco.csv"
+    percorso.write_text("codice_fiscale,nome,compenso_lordo\nRSSMRA80A01H501U,,1000\n")
+    diretto = pd.DataFrame({"codice_fiscale": ["RSSMRA80A01H501U"], "nome": [None], "compenso_lordo": [1000.0]})
+    for contratti in (leggi_elenco(percorso), diretto):
+        _, archivio = _archivio(contratti)
+        pdf = archivio.read("RSSMRA80A01H501U_2025.pdf")
+        riga = pdf.split(b"(Percipiente) Tj\n", 1)[1].split(b"\n", 1)[0]
+        assert riga.endswith(b"(-) Tj")
+        assert b"nan" not in pdf
+
+
+def test_societa_diversa_rigenera_tutto():
+    _, archivio = _archivio(CONTRATTI, societa="ASD Prova")
+    (generati, saltati), nuovo = _archivio(CONTRATTI, societa="ASD Nuova", precedente=archivio.fp)
+    assert (generati, saltati) == (2, 0)
+    assert b"ASD Nuova" in nuovo.read("RSSMRA80A01H501U_2025.pdf")
+
+
+def test_impronta_dipende_dalle_addizionali(monkeypatch):
+    persona = {"chiave": "RSSMRA80A01H501U", "nome": "", "numero_contratti": 1, "contratti": 1}
+    prima = impronta(persona, 2025, FORMATI)
+    monkeypatch.setattr(certificazioni, "impronta_dati", lambda: 1)
+    assert impronta(persona, 2025, FORMATI) != prima
+
+
+def test_pdf_deterministico_con_xref_corretta():
+    pdf = pdf_semplice([("Compenso (lordo)", True, "€ 1.000,00")])
+    assert pdf == pdf_semplice([("Compenso (lordo)", True, "€ 1.000,00")])
+    assert b"\\(lordo\\)" in pdf and b"\x80 1.000,00" in pdf
+    inizio_xref = int(pdf.rsplit(b"startxref\n", 1)[1].split(b"\n")[0])
+    assert pdf[inizio_xref:].startswith(b"xref")
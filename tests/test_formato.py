@@ -0,0 +1,47 @@
+"""La formattazione vettoriale deve coincidere byte per byte con formatta_euro e formatta_percentuale."""
+import numpy as np
+import pytest
+
+from simulatore.calcolo import formatta_euro, formatta_percentuale
+from simulatore.formato import FORMATI_EURO, formatta_euro_array, formatta_percentuale_array
+
+SPECIALI = [0.0, -0.0, 0.005, 0.015, 1.005, 2.675, -0.001, 999.995, 999999.995, 1e12, 9.99e12, 1e13, -1e16,
+            float("nan"), float("inf"), float("-inf"), 1e-300, 0.125]
+
+
+def _valori():
+    rng = np.random.default_rng(0)
+    return np.concatenate([
+        SPECIALI,
+        rng.uniform(-1e7, 1e7, 20000),
+        rng.uniform(-10, 10, 5000).round(3),
+        np.arange(-2000, 2000) / 200,
+        rng.uniform(0, 1e6, 5000).round(2) + 0.005,
+    ])
+
+
+def test_formatta_euro_array_identico():
+    valori = _valori()
+    assert formatta_euro_array(valori).tolist() == [formatta_euro(v) for v in valori.tolist()]
+
+
+@pytest.mark.parametrize("decimali", [0, 1, 2, 3, 6])
+def test_formatta_percentuale_array_identico(decimali):
+    valori = _valori()
+    attesi = [formatta_percentuale(v, decimali) for v in valori.tolist()]
+    assert formatta_percentuale_array(valori, decimali).tolist() == attesi
+
+
+def test_forma_e_array_vuoto():
+    assert formatta_euro_array(np.ones((2, 3))).shape == (2, 3)
+    assert formatta_euro_array([]).tolist() == []
+
+
+@pytest.mark.parametrize("lingua, atteso", [
+    ("it", "€ 1.234.567,89"),
+    ("en", "€1,234,567.89"),
+    ("de", "1.234.567,89 €"),
+])
+def test_altre_lingue(lingua, atteso):
+    assert formatta_euro_array([1234567.891], lingua)[0] == atteso
+    assert FORMATI_EURO[lingua].formatta(1234567.891) == atteso
@@ -0,0 +1,75 @@
+"""Calcolo inverso, contratti multipli, ritenute mensili, confronto regimi e regole da config."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulatore.aggregazione import aggrega_collaboratori
+from simulatore.calcolo import REGOLE, calcola_cococo_sportivo
+from simulatore.regole import compila_regole
+from simulatore.ritenute import piano_mensile
+from simulatore.scenari import confronta_regimi, confronta_regimi_df
+from simulatore.solutore import compenso_da_costo, compenso_da_netto, compenso_da_obiettivo_batch
+
+
+@pytest.mark.parametrize("compenso", [0.0, 3000.0, 5000.0, 15000.0, 43000.0, 65000.0, 200000.0])
+def test_calcolo_inverso_andata_e_ritorno(compenso):
+    r = calcola_cococo_sportivo(compenso, False, 1.23, 0.5)
+    assert compenso_da_netto(r["netto_lavoratore"], False, 1.23, 0.5) == pytest.approx(compenso, abs=1e-6)
+    assert compenso_da_costo(r["costo_totale_societa"], False, 1.23, 0.5) == pytest.approx(compenso, abs=1e-6)
+
+
+def test_calcolo_inverso_batch_uguale_allo_scalare():
+    netti = np.array([0.0, 4000.0, 14000.0, 30000.0, 90000.0])
+    attesi = [compenso_da_netto(n, True) for n in netti]
+    assert compenso_da_obiettivo_batch("netto_lavoratore", netti, True).tolist() == pytest.approx(attesi)
+
+
+def test_aggregazione_franchigie_sul_totale():
+    contratti = pd.DataFrame({"codice_fiscale": ["A", "A", "B"], "compenso_lordo": [10000.0, 10000.0, 8000.0]})
+    per_contratto, per_persona = aggrega_collaboratori(contratti)
+    assert per_persona.loc["A", "irpef"] == pytest.approx(calcola_cococo_sportivo(20000.0)["irpef"])
+    assert per_contratto.groupby("codice_fiscale")["netto_lavoratore"].sum().to_dict() == pytest.approx(
+        per_persona["netto_lavoratore"].to_dict()
+    )
+
+
+def test_aggregazione_chiave_mancante():
+    contratti = pd.DataFrame({"codice_fiscale": ["A", None, " "], "compenso_lordo": [10000.0, 5000.0, 1000.0]})
+    with pytest.raises(ValueError, match="righe 1, 2"):
+        aggrega_collaboratori(contratti)
+
+
+def test_piano_mensile_somma_al_calcolo_annuo():
+    annuo = calcola_cococo_sportivo(36000.0, False, 1.23, 0.5)
+    piano = piano_mensile(36000.0, False, 1.23, 0.5)
+    assert sum(r["irpef"] for r in piano) == pytest.approx(annuo["irpef"])
+    assert sum(r["netto_pagamento"] for r in piano) == pytest.approx(annuo["netto_lavoratore"])
+    assert piano[0]["irpef"] == 0.0  # primi mesi dentro la franchigia fiscale
+
+
+def test_confronto_regimi():
+    confronto = confronta_regimi(30000.0, False, 1.23, 0.5)
+    cococo = calcola_cococo_sportivo(30000.0, False, 1.23, 0.5)
+    assert confronto["cococo"]["netto_lavoratore"] == pytest.approx(cococo["netto_lavoratore"])
+    assert confronto["forfettario"]["costo_totale_societa"] == 30000.0
+    df = confronta_regimi_df(pd.DataFrame({"compenso_lordo": [30000.0, 0.0]}), 2025)
+    assert df.groupby("regime").size().to_dict() == {"cococo": 2, "forfettario": 2, "subordinato": 2}
+
+
+def test_regole_immutabili():
+    with pytest.raises(AttributeError):
+        REGOLE[2025].franchigia_fiscale = 0.0
+
+
+def test_regole_non_valide():
+    dati = {
+        "franchigia_fiscale": 15000.0, "franchigia_contributiva": 5000.0, "riduzione_base_contributiva": 0.5,
+        "aliquota_ivs": 25.0, "aliquota_ivs_altra_previdenza": 24.0, "aliquota_aggiuntiva": 2.03,
+        "ripartizione_lavoratore": [1, 3], "ripartizione_societa": [2, 3],
+        "scaglioni_irpef": [28000.0, 50000.0], "aliquote_irpef": [0.23, 0.35, 0.43],
+    }
+    assert compila_regole(2030, dati).anno == 2030
+    with pytest.raises(ValueError, match="sommare a 1"):
+        compila_regole(2030, {**dati, "ripartizione_societa": [1, 3]})
+    with pytest.raises(ValueError, match="crescenti"):
+        compila_regole(2030, {**dati, "scaglioni_irpef": [50000.0, 28000.0]})
@@ -0,0 +1,64 @@
+"""Simulazione Monte Carlo: riproducibilità a parità di seme e coerenza con il calcolo diretto."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulatore.batch import calcola_cococo_sportivo_batch
+from simulatore.montecarlo import (
+    estrai_triangolare,
+    prepara_distribuzioni,
+    probabilita_entro_budget,
+    riepilogo_percentili,
+    simula_stagione,
+)
+
+ELENCO = pd.DataFrame({
+    "compenso_min": [1000.0, 10000.0, 20000.0],
+    "compenso_atteso": [3000.0, 15000.0, 30000.0],
+    "compenso_max": [6000.0, 22000.0, 30000.0],
+    "altra_previdenza": ["no", "si", "no"],
+    "addizionali_reg": [1.23, 1.23, 1.23],
+})
+
+
+def test_stesso_seme_stessi_risultati_a_blocchi_e_processi():
+    distribuzioni = prepara_distribuzioni(ELENCO)
+    primo = simula_stagione(distribuzioni, 3000, seme=5, processi=1, elementi_per_blocco=900)
+    secondo = simula_stagione(distribuzioni, 3000, seme=5, processi=2, elementi_per_blocco=900)
+    pd.testing.assert_frame_equal(primo, secondo)
+    assert not primo.equals(simula_stagione(distribuzioni, 3000, seme=6, processi=1, elementi_per_blocco=900))
+
+
+def test_importi_certi_coincidono_con_il_calcolo_diretto():
+    distribuzioni = prepara_distribuzioni(pd.DataFrame({"compenso_lordo": ["12.000,00", "30000"]}))
+    esiti = simula_stagione(distribuzioni, 50, processi=1)
+    atteso = calcola_cococo_sportivo_batch(np.array([12000.0, 30000.0]))
+    assert esiti["costo_totale_societa"].nunique() == 1
+    assert esiti["costo_totale_societa"].iloc[0] == pytest.approx(atteso["costo_totale_societa"].sum())
+
+
+def test_percentili_e_budget():
+    esiti = simula_stagione(prepara_distribuzioni(ELENCO), 5000, seme=1, processi=1)
+    riepilogo = riepilogo_percentili(esiti)
+    costo = riepilogo["costo_totale_societa"]
+    assert costo["P5"] <= costo["P50"] <= costo["P95"]
+    assert probabilita_entro_budget(esiti, costo["P50"]) == pytest.approx(0.5, abs=0.01)
+    assert probabilita_entro_budget(esiti, 0.0) == 0.0
+
+
+def test_distribuzione_triangolare():
+    uniformi = np.random.default_rng(0).random(200_000)
+    estratti = estrai_triangolare(uniformi, 1.0, 2.0, 4.0)
+    assert estratti.min() >= 1.0 and estratti.max() <= 4.0
+    assert estratti.mean() == pytest.approx(7.0 / 3.0, abs=0.01)
+
+
+def test_ore_per_tariffa_ed_errori():
+    distribuzioni = prepara_distribuzioni(
+        pd.DataFrame({"ore_min": [100], "ore_attese": [150], "ore_max": [200], "tariffa_oraria": [20]})
+    )
+    assert distribuzioni.loc[0, ["minimo", "atteso", "massimo"]].tolist() == [2000.0, 3000.0, 4000.0]
+    with pytest.raises(ValueError):
+        prepara_distribuzioni(pd.DataFrame({"compenso_min": [5], "compenso_atteso": [1], "compenso_max": [9]}))
+    with pytest.raises(ValueError):
+        prepara_distribuzioni(pd.DataFrame({"nome": ["x"]}))
@@ -0,0 +1,86 @@
+"""Strumentazione dei tempi: percentili, export JSON/Prometheus e costo nullo da spenta."""
+import json
+
+import numpy as np
+import pytest
+
+from simulatore import strumentazione
+from simulatore.calcolo import calcola_cococo_sportivo
+from simulatore.strumentazione import Registro, leggi_configurazione, percentile
+
+
+def test_percentili_come_numpy():
+    valori = sorted(np.random.default_rng(0).random(101).tolist())
+    for p in (0, 50, 90, 99, 100):
+        assert percentile(valori, p) == pytest.approx(np.percentile(valori, p))
+
+
+def test_buffer_circolare_e_totali():
+    registro = Registro(campioni=4)
+    for secondi in (1.0, 2.0, 3.0, 4.0, 5.0, 6.0):
+        registro.registra("x", secondi)
+    riepilogo = registro.riepilogo()["x"]
+    assert riepilogo["conteggio"] == 6
+    assert riepilogo["totale_s"] == 21.0
+    assert riepilogo["massimo_s"] == 6.0
+    # Percentili sugli ultimi 4 campioni: 3, 4, 5, 6
+    assert riepilogo["p50_s"] == 4.5
+
+
+def test_sezioni_tappe_e_decoratore():
+    registro = Registro()
+
+    @registro.cronometra("doppio")
+    def doppio(x):
+        return 2 * x
+
+    assert doppio(21) == 42
+    with registro.sezione("blocco"):
+        pass
+    with pytest.raises(ZeroDivisionError), registro.sezione("errore"):
+        1 / 0
+    tappe = registro.tappe("app")
+    tappe.tappa("prima")
+    tappe.fine()
+    assert set(registro.riepilogo()) == {
+        "doppio", "blocco", "errore", "app.prima", "app.totale",
+    }
+
+
+def test_export_json_e_prometheus():
+    registro = Registro()
+    registro.registra('sezione "strana"', 0.25)
+    dati = json.loads(registro.json())
+    assert dati["sezioni"]['sezione "strana"']["p99_s"] == 0.25
+    testo = registro.prometheus()
+    assert "# TYPE simulatore_sezione_secondi summary" in testo
+    assert 'simulatore_sezione_secondi{sezione="sezione \\"strana\\"",quantile="0.5"} 0.25' in testo
+    assert 'simulatore_sezione_secondi_count{sezione="sezione \\"strana\\""} 1' in testo
+
+
+def test_file_prometheus(tmp_path):
+    percorso = tmp_path / "simulatore.prom"
+    registro = Registro(file_prometheus=str(percorso), intervallo_file=3600.0)
+    registro.registra("a", 0.1)
+    registro.esporta_se_scaduto()
+    registro.registra("b", 0.1)
+    registro.esporta_se_scaduto()  # entro l'intervallo: il file non cambia
+    assert 'sezione="a"' in percorso.read_text()
+    assert 'sezione="b"' not in percorso.read_text()
+    assert list(tmp_path.iterdir()) == [percorso]
+
+
+def test_configurazione(tmp_path, monkeypatch):
+    config = tmp_path / "config.toml"
+    config.write_text("[strumentazione]\nattiva = true\ncampioni = 16\n")
+    monkeypatch.delenv("SIMULATORE_STRUMENTAZIONE", raising=False)
+    assert leggi_configurazione(config)["attiva"] is True
+    assert leggi_configurazione(config)["campioni"] == 16
+    monkeypatch.setenv("SIMULATORE_STRUMENTAZIONE", "0")
+    assert leggi_configurazione(config)["attiva"] is False
+
+
+@pytest.mark.skipif(strumentazione.ATTIVA, reason="strumentazione attiva nell'ambiente dei test")
+def test_spenta_non_decora():
+    assert not hasattr(calcola_cococo_sportivo, "__wrapped__")
+    assert strumentazione.sezione("a") is strumentazione.sezione("b")